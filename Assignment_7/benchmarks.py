@@ -0,0 +1,474 @@
+"""
+benchmarks.py
+
+Performance benchmarks for the Assignment_7 routing simulators.
+
+Usage:
+    python benchmarks.py spf [--sizes 1000 10000] [--sources 10]
+    python benchmarks.py ispf [--sizes 1000 10000] [--trees 50] [--events 20] [--sim-size 300]
+    python benchmarks.py flooding [--sizes 100 300 1000] [--degree 8] [--snapshot-limit 300] [--loss 0.0]
+    python benchmarks.py snapshots [--size 1000] [--churn 0.01]
+    python benchmarks.py headless [--repeat 3]
+    python benchmarks.py rip [--sizes 500 5000] [--degree 4] [--dict-limit 500] [--dict-rounds 2]
+
+spf -> OSPF SPF per router: networkx graph rebuilt from the LSDB plus
+       nx.single_source_dijkstra vs the shared CSR LinkStateGraph and its
+       heap Dijkstra (graph build time and memory, time per router, and
+       whether the tables match; next hops can differ on equal-cost ties)
+ispf -> reconvergence CPU time after link failures / repairs: incremental
+        ShortestPathTree.update_link vs a full Dijkstra per router, and
+        inject_link_change end to end (flooding + SPF) on a converged
+        simulation
+flooding -> LSA flooding from a cold start: delta flooding (flood_lsas,
+            only newly accepted LSAs, per-adjacency acks) vs the snapshot
+            model (flood_lsas_snapshot, whole LSDB to every neighbor every
+            round); transmissions, rounds and wall time, LSDBs checked to
+            agree. The snapshot model is skipped above --snapshot-limit.
+snapshots -> per-round table snapshots of all four simulators (OSPF/IS-IS
+             LSDBs, RIP distance vectors, BGP RIBs) in a converged n-node
+             network: deepcopy of every table vs VersionedTable.snapshot(),
+             then a round that rewrites --churn of the entries and reads
+             every snapshot back
+headless -> startup and per-run overhead of the four simulators' scripts:
+            interpreter + module import with and without the (now lazy)
+            matplotlib / tabulate imports, a default run (pacing, plots,
+            per-router tables) vs --headless, and main() in-process
+rip -> synchronous RIP rounds: dict distance vectors (simulate_rip) vs
+       NumPy matrices (simulate_rip_vectorized); rounds per second and
+       whether the tables match. Above --dict-limit routers the dict
+       version only runs --dict-rounds rounds, compared against the
+       vectorized tables after as many rounds.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from copy import deepcopy
+
+import networkx as nx
+
+import bgp_sim
+import isis_sim
+import ospf_sim
+import rip_sim
+from sim_common import set_headless
+
+
+# -----------------------------
+# Synthetic workloads
+# -----------------------------
+def random_lsdb(n, degree=4, seed=7, max_cost=20):
+    """
+    LSDB of a connected small-world topology with `n` routers R0..R{n-1}
+    of average degree `degree` and random integer link costs.
+    """
+    rng = random.Random(seed)
+    G = nx.connected_watts_strogatz_graph(n, degree, 0.2, seed=seed)
+    lsdb = {}
+    for u, v in G.edges():
+        link = tuple(sorted((f"R{u}", f"R{v}")))
+        lsdb[link] = {"cost": rng.randint(1, max_cost), "seq": 1, "origin": link[0]}
+    return lsdb
+
+
+def random_mesh(n, degree=8, seed=7, max_cost=20):
+    """The random_lsdb topology as a networkx Graph with 'cost' edge attributes."""
+    G = nx.Graph()
+    for (u, v), info in random_lsdb(n, degree, seed, max_cost).items():
+        G.add_edge(u, v, cost=info["cost"])
+    return G
+
+
+def cold_start(G):
+    """OSPFRouters for G with their own LSAs originated: (routers, initial_lsas)."""
+    routers = {node: ospf_sim.OSPFRouter(node, list(G.neighbors(node))) for node in G.nodes()}
+    initial_lsas = {name: r.originate_lsas(G) for name, r in routers.items()}
+    return routers, initial_lsas
+
+
+def lsdb_costs(router):
+    """A router's LSDB as link -> (cost, seq)."""
+    return {link: (info["cost"], info["seq"]) for link, info in router.lsdb.items()}
+
+
+def lsdb_router(name, lsdb):
+    """An OSPFRouter holding a copy of `lsdb` (digest included)."""
+    r = ospf_sim.OSPFRouter(name, [])
+    for link, info in lsdb.items():
+        r.store_lsa(link, info["cost"], info["seq"], info["origin"])
+    return r
+
+
+def best_time(build, repeat=3):
+    """Fastest of `repeat` calls of build(), in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def retained_bytes(build):
+    """Memory still allocated by the object build() returns (tracemalloc)."""
+    tracemalloc.start()
+    result = build()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+def bench_spf(sizes, sources):
+    """
+    Per-router routing table computation (compute_routing_tables) for
+    `sources` routers of each topology size. The networkx engine rebuilds a
+    Graph from the LSDB for every router; the CSR engine builds one
+    LinkStateGraph per LSDB version, so the per-router cost is its SPF plus
+    the build spread over the n routers that share the converged LSDB.
+    """
+    print(f"{sources} routers per topology (average degree 4)")
+    print(f"{'routers':>8} {'engine':>9} {'build (ms)':>11} {'graph MB':>9} {'SPF+table (ms)':>15} "
+          f"{'per router (ms)':>16} {'tables':>10}")
+    for n in sizes:
+        ospf_sim.clear_graph_cache()                 # no graphs kept from the last size
+        lsdb = random_lsdb(n)
+        names = [f"R{i}" for i in random.Random(n).sample(range(n), sources)]
+        routers = {name: lsdb_router(name, lsdb) for name in names}
+
+        nx_build = best_time(lambda: ospf_sim.build_graph_from_lsdb(lsdb))
+        nx_bytes = retained_bytes(lambda: ospf_sim.build_graph_from_lsdb(lsdb))
+        start = time.perf_counter()
+        expected = {name: ospf_sim.compute_routing_tables({name: routers[name]}, engine="networkx")[name]
+                    for name in names}
+        nx_total = (time.perf_counter() - start) / sources
+
+        csr_build = best_time(lambda: ospf_sim.LinkStateGraph(lsdb))
+        csr_bytes = retained_bytes(lambda: ospf_sim.LinkStateGraph(lsdb))
+        ospf_sim.lsdb_graph(routers[names[0]])        # built once, shared by all
+        start = time.perf_counter()
+        tables = {name: ospf_sim.compute_routing_tables({name: routers[name]})[name] for name in names}
+        csr_spf = (time.perf_counter() - start) / sources
+
+        # costs must match exactly; next hops may differ only between equal-cost paths
+        hop_ties = 0
+        for name in names:
+            for dest, (cost, hop) in tables[name].items():
+                assert cost == expected[name][dest][0], f"SPF cost mismatch {name} -> {dest}"
+                hop_ties += hop != expected[name][dest][1]
+        print(f"{n:>8} {'networkx':>9} {nx_build * 1e3:>11.1f} {nx_bytes / 2**20:>9.1f} "
+              f"{(nx_total - nx_build) * 1e3:>15.1f} {nx_total * 1e3:>16.1f} {'-':>10}")
+        print(f"{n:>8} {'csr':>9} {csr_build * 1e3:>11.1f} {csr_bytes / 2**20:>9.1f} "
+              f"{csr_spf * 1e3:>15.1f} {(csr_spf + csr_build / n) * 1e3:>16.1f} "
+              f"{'same' if not hop_ties else f'{hop_ties} ties':>10}")
+
+
+def bench_ispf(sizes, trees, events, sim_size):
+    """
+    SPF part: `trees` routers' shortest-path trees over an n-router graph;
+    each event fails a random link and later restores it, and both changes
+    are applied to every tree incrementally and, for comparison, by a full
+    Dijkstra (time.process_time; distances are checked to agree).
+    Simulation part: a converged `sim_size`-router OSPF simulation gets the
+    same kind of events through ospf_sim.inject_link_change.
+    """
+    print(f"{trees} trees per topology, {events} failures + repairs (average degree 4)")
+    print(f"{'routers':>8} {'full SPF (ms)':>14} {'iSPF (ms)':>10} {'speedup':>8} {'routes touched':>15}")
+    for n in sizes:
+        graph = ospf_sim.LinkStateGraph(random_lsdb(n))
+        rng = random.Random(n)
+        sources = rng.sample(range(n), min(trees, n))
+        spts = [ospf_sim.ShortestPathTree(graph, graph.names[i]) for i in sources]
+        links = [(a, graph.targets[i]) for a in range(n)
+                 for i in range(graph.offsets[a], graph.offsets[a + 1]) if a < graph.targets[i]]
+        full_cpu = inc_cpu = 0.0
+        touched = 0
+        for a, b in rng.sample(links, min(events, len(links))):
+            cost = graph.link_cost(a, b)
+            for old, new in ((cost, None), (None, cost)):
+                changed = graph.with_link_cost(a, b, new)
+                start = time.process_time()
+                for spt in spts:
+                    touched += len(spt.update_link(changed, a, b, old, new))
+                inc_cpu += time.process_time() - start
+                start = time.process_time()
+                full = [changed.spf(i)[0] for i in sources]
+                full_cpu += time.process_time() - start
+                assert all(spt.dist == dist for spt, dist in zip(spts, full)), "iSPF distance mismatch"
+                graph = changed
+        runs = 2 * min(events, len(links)) * len(spts)
+        print(f"{n:>8} {full_cpu / runs * 1e3:>14.3f} {inc_cpu / runs * 1e3:>10.3f} "
+              f"{full_cpu / inc_cpu:>7.0f}x {touched / runs / n:>15.2%}")
+
+    # converged simulation: flooding + incremental SPF in every router
+    lsdb = random_lsdb(sim_size)
+    routers = {}
+    for (u, v) in lsdb:
+        for a, b in ((u, v), (v, u)):
+            routers.setdefault(a, ospf_sim.OSPFRouter(a, [])).neighbors.append(b)
+    for r in routers.values():
+        for link, info in lsdb.items():
+            r.store_lsa(link, info["cost"], info["seq"], info["origin"])
+    ospf_sim.compute_routing_tables(routers)
+    rng = random.Random(sim_size)
+    totals = dict.fromkeys(("transmissions", "routers_updated", "routes_recomputed",
+                            "flood_cpu", "spf_cpu"), 0)
+    for link in rng.sample(sorted(lsdb), min(events, len(lsdb))):
+        cost = lsdb[link]["cost"]
+        for new in (None, cost):
+            for key, value in ospf_sim.inject_link_change(routers, link, new).items():
+                totals[key] += value
+    start = time.process_time()
+    ospf_sim.compute_routing_tables(routers)
+    full_cpu = time.process_time() - start
+    count = 2 * min(events, len(lsdb))
+    print(f"\ninject_link_change on a converged {sim_size}-router simulation, per event:")
+    print(f"  {totals['transmissions'] / count:.0f} LSA transmissions, "
+          f"{totals['routers_updated'] / count:.0f} routers updated, "
+          f"{totals['routes_recomputed'] / count:.0f} routes recomputed")
+    print(f"  flooding {totals['flood_cpu'] / count * 1e3:.2f} ms CPU, iSPF {totals['spf_cpu'] / count * 1e3:.2f} ms CPU "
+          f"(full SPF in every router: {full_cpu * 1e3:.1f} ms)")
+
+
+def bench_flooding(sizes, degree, snapshot_limit, loss):
+    """
+    Flood every router's originated LSAs over an n-router mesh until the
+    LSDBs converge, with both flooding models (headless, no pacing).
+    """
+    set_headless()
+    print(f"average degree {degree}" + (f", {loss:.0%} loss on every transmission" if loss else ""))
+    print(f"{'routers':>8} {'LSAs':>7} {'model':>9} {'rounds':>7} {'transmissions':>14} "
+          f"{'retransmits':>12} {'wall (s)':>9} {'LSDBs':>6}")
+    for n in sizes:
+        G = random_mesh(n, degree)
+        routers, initial_lsas = cold_start(G)
+        delta = {}
+        ospf_sim.flood_lsas(routers, initial_lsas, stats=delta, loss=loss, seed=n)
+        # both ends originate an LSA per link and their sequence numbers can
+        # tie, so which origin a router keeps depends on arrival order
+        reference = {name: lsdb_costs(r) for name, r in routers.items()}
+        converged = delta["converged"] and all(len(lsdb) == G.number_of_edges()
+                                               for lsdb in reference.values())
+        rows = [("delta", delta, converged)]
+        if n <= snapshot_limit:
+            routers, initial_lsas = cold_start(G)
+            snapshot = {}
+            ospf_sim.flood_lsas_snapshot(routers, initial_lsas, stats=snapshot)
+            same = all(lsdb_costs(r) == reference[name] for name, r in routers.items())
+            rows.append(("snapshot", snapshot, same))
+        for model, stats, ok in rows:
+            print(f"{n:>8} {G.number_of_edges():>7} {model:>9} {stats['rounds']:>7} "
+                  f"{stats['transmissions']:>14,} {stats.get('retransmissions', 0):>12,} "
+                  f"{stats['wall_seconds']:>9.2f} {'same' if ok else 'DIFFER':>6}")
+        if len(rows) == 2:
+            print(f"{'':>8} snapshot/delta: {snapshot['transmissions'] / delta['transmissions']:.0f}x transmissions, "
+                  f"{snapshot['wall_seconds'] / delta['wall_seconds']:.0f}x wall time")
+
+
+def converged_tables(n):
+    """
+    Converged routing state of an n-node network (average degree 4) for
+    every simulator: name -> (tables, rewrite) where tables maps router ->
+    VersionedTable and rewrite(value) returns a fresh, updated value.
+    """
+    G = random_mesh(n, 4)
+    lsdb = random_lsdb(n, 4)
+    paths = {src: nx.single_source_shortest_path(G, src) for src in G.nodes()}
+    ospf = {name: ospf_sim.OSPFRouter(name, list(G.neighbors(name))) for name in G.nodes()}
+    isis = {name: isis_sim.ISISRouter(name, list(G.neighbors(name))) for name in G.nodes()}
+    rip = {name: rip_sim.Router(name, list(G.neighbors(name))) for name in G.nodes()}
+    bgp = {name: bgp_sim.ASNode(name, list(G.neighbors(name)), [f"P{name}"]) for name in G.nodes()}
+    for name in G.nodes():
+        ospf[name].lsdb.update(lsdb)
+        isis[name].lsdb.update(lsdb)
+        rip[name].dv.update((dest, (len(path) - 1, path[1] if len(path) > 1 else name))
+                            for dest, path in paths[name].items())
+        bgp[name].local_rib.update((f"P{dest}", path[1:] or [name]) for dest, path in paths[name].items())
+    return {
+        "ospf": ({name: r.lsdb for name, r in ospf.items()}, lambda info: dict(info, seq=info["seq"] + 1)),
+        "isis": ({name: r.lsdb for name, r in isis.items()}, lambda info: dict(info, seq=info["seq"] + 1)),
+        "rip": ({name: r.dv for name, r in rip.items()}, lambda entry: (entry[0] + 1, entry[1])),
+        "bgp": ({name: r.local_rib for name, r in bgp.items()}, lambda path: list(path)),
+    }
+
+
+def bench_snapshots(size, churn):
+    """
+    For each simulator, the cost of one round's snapshots: the old
+    {name: deepcopy(table)} against {name: table.snapshot()} (time and
+    memory retained by the snapshots), then `churn` of every table's
+    entries rewritten (write time, undo-log entries) and every snapshot
+    read back in full (time, against reading the deep copies).
+    """
+    print(f"{size}-node network, average degree 4, {churn:.0%} of entries rewritten per round")
+    print(f"{'sim':>5} {'entries':>10} {'deepcopy (ms)':>14} {'copies MB':>10} {'snapshot (ms)':>14} "
+          f"{'views MB':>9} {'writes (ms)':>15} {'undo log':>9} {'read (ms)':>15}")
+    for sim, (tables, rewrite) in converged_tables(size).items():
+        entries = sum(len(t) for t in tables.values())
+        plain = {name: dict(t) for name, t in tables.items()}
+        copy_time = best_time(lambda: {name: deepcopy(t) for name, t in plain.items()}, repeat=1)
+        copy_bytes = retained_bytes(lambda: {name: deepcopy(t) for name, t in plain.items()})
+        copies = {name: deepcopy(t) for name, t in plain.items()}
+        snap_time = best_time(lambda: {name: t.snapshot() for name, t in tables.items()})
+        snap_bytes = retained_bytes(lambda: {name: t.snapshot() for name, t in tables.items()})
+        views = {name: t.snapshot() for name, t in tables.items()}
+
+        rng = random.Random(size)
+        writes = {name: [(key, rewrite(t[key])) for key in rng.sample(sorted(t), int(len(t) * churn))]
+                  for name, t in tables.items()}
+
+        def apply(targets):
+            gc.collect()
+            start = time.perf_counter()
+            for name, updates in writes.items():
+                table = targets[name]
+                for key, value in updates:
+                    table[key] = value
+            return time.perf_counter() - start
+
+        write_dict = apply(plain)
+        write_versioned = apply(tables)
+        undo = sum(t.changed_since_snapshot() for t in tables.values())
+
+        def read(snapshots):
+            start = time.perf_counter()
+            for snapshot in snapshots.values():
+                for _ in snapshot.items():
+                    pass
+            return time.perf_counter() - start
+
+        read_copies = read(copies)
+        read_views = read(views)
+        assert all(dict(views[name].items()) == copies[name] for name in tables), f"{sim}: snapshot differs"
+        print(f"{sim:>5} {entries:>10,} {copy_time * 1e3:>14.0f} {copy_bytes / 2**20:>10.1f} "
+              f"{snap_time * 1e3:>14.2f} {snap_bytes / 2**20:>9.2f} "
+              f"{write_versioned * 1e3:>6.1f} (dict {write_dict * 1e3:>4.1f}) {undo:>9,} "
+              f"{read_views * 1e3:>6.0f} (copy {read_copies * 1e3:>4.0f})")
+
+
+def process_seconds(cmd, cwd=None, repeat=3):
+    """Fastest wall time of `repeat` runs of a child process."""
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, env=env, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_headless(repeat):
+    """
+    Child-process wall times (best of `repeat`) for each simulator script,
+    run in a scratch directory so the committed outputs stay untouched.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    python = sys.executable
+    bare = process_seconds([python, "-c", "pass"], repeat=repeat)
+    print(f"interpreter alone: {bare * 1e3:.0f} ms; best of {repeat}, all times in ms")
+    print(f"{'sim':>5} {'import':>8} {'+plot libs':>11} {'default run':>12} {'--headless':>11} {'main() only':>12}")
+    for sim in ("ospf", "isis", "rip", "bgp"):
+        module = f"{sim}_sim"
+        lazy = process_seconds([python, "-c", f"import {module}"], repeat=repeat)
+        eager = process_seconds([python, "-c", f"import {module}, matplotlib.pyplot, tabulate"], repeat=repeat)
+        script = os.path.join(here, f"{module}.py")
+        with tempfile.TemporaryDirectory() as scratch:
+            default_run = process_seconds([python, script], cwd=scratch, repeat=1)
+            headless_run = process_seconds([python, script, "--headless"], cwd=scratch, repeat=repeat)
+            set_headless()
+            mod = __import__(module)
+            cwd = os.getcwd()
+            os.chdir(scratch)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    in_process = best_time(lambda: mod.main(["--headless"]), repeat=repeat)
+            finally:
+                os.chdir(cwd)
+        print(f"{sim:>5} {lazy * 1e3:>8.0f} {eager * 1e3:>11.0f} {default_run * 1e3:>12.0f} "
+              f"{headless_run * 1e3:>11.0f} {in_process * 1e3:>12.2f}")
+
+
+def bench_rip(sizes, degree, dict_limit, dict_rounds):
+    """Rounds per second of the dict and matrix RIP cores on n-router meshes (weighted)."""
+    set_headless()
+    print(f"average degree {degree}, weighted links")
+    print(f"{'routers':>8} {'core':>7} {'rounds':>7} {'wall (s)':>9} {'rounds/s':>9} {'tables':>7}")
+    for n in sizes:
+        G = random_mesh(n, degree)
+        full = {}
+        matrix, rounds, _ = rip_sim.simulate_rip_vectorized(G, weighted=True, stats=full)
+        dict_max = rounds if n <= dict_limit else min(rounds, dict_rounds)
+        if dict_max < rounds:
+            matrix, _, _ = rip_sim.simulate_rip_vectorized(G, weighted=True, max_rounds=dict_max)
+        # the last (quiet) round costs the same as any other
+        partial = {}
+        routers, _, _ = rip_sim.simulate_rip(G, weighted=True, max_rounds=dict_max, verbose=False, stats=partial)
+        same = all(dict(r.dv) == matrix.dv(name) for name, r in routers.items())
+        del routers, matrix
+        for core, stats in (("dict", partial), ("numpy", full)):
+            print(f"{n:>8} {core:>7} {stats['rounds']:>7} {stats['wall_seconds']:>9.2f} "
+                  f"{stats['rounds'] / stats['wall_seconds']:>9.2f} {'same' if same else 'DIFFER':>7}")
+        print(f"{'':>8} numpy/dict: {partial['wall_seconds'] / partial['rounds'] / (full['wall_seconds'] / full['rounds']):.0f}x "
+              f"rounds per second")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assignment_7 routing simulator benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    p = sub.add_parser("spf", help="networkx vs CSR shortest-path-first")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    p.add_argument("--sources", type=int, default=10)
+    p = sub.add_parser("ispf", help="incremental vs full SPF after link failures")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    p.add_argument("--trees", type=int, default=50)
+    p.add_argument("--events", type=int, default=20)
+    p.add_argument("--sim-size", type=int, default=300)
+    p = sub.add_parser("flooding", help="delta vs snapshot LSA flooding")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1_000])
+    p.add_argument("--degree", type=int, default=8)
+    p.add_argument("--snapshot-limit", type=int, default=300,
+                   help="largest mesh to run the snapshot model on")
+    p.add_argument("--loss", type=float, default=0.0,
+                   help="drop probability per transmission in delta flooding")
+    p = sub.add_parser("snapshots", help="deepcopy vs versioned round snapshots")
+    p.add_argument("--size", type=int, default=1_000)
+    p.add_argument("--churn", type=float, default=0.01,
+                   help="share of each table rewritten during the round")
+    p = sub.add_parser("headless", help="startup and per-run overhead, default vs headless")
+    p.add_argument("--repeat", type=int, default=3)
+    p = sub.add_parser("rip", help="dict vs NumPy matrix RIP rounds")
+    p.add_argument("--sizes", type=int, nargs="+", default=[500, 5_000])
+    p.add_argument("--degree", type=int, default=4)
+    p.add_argument("--dict-limit", type=int, default=500,
+                   help="largest mesh to run the dict version to convergence on")
+    p.add_argument("--dict-rounds", type=int, default=2,
+                   help="rounds of the dict version above --dict-limit")
+    args = parser.parse_args()
+
+    if args.bench == "spf":
+        bench_spf(args.sizes, args.sources)
+    elif args.bench == "ispf":
+        bench_ispf(args.sizes, args.trees, args.events, args.sim_size)
+    elif args.bench == "flooding":
+        bench_flooding(args.sizes, args.degree, args.snapshot_limit, args.loss)
+    elif args.bench == "snapshots":
+        bench_snapshots(args.size, args.churn)
+    elif args.bench == "headless":
+        bench_headless(args.repeat)
+    elif args.bench == "rip":
+        bench_rip(args.sizes, args.degree, args.dict_limit, args.dict_rounds)
+
+
+if __name__ == "__main__":
+    main()
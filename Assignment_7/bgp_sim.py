@@ -9,15 +9,16 @@ Simplified BGP path-vector simulation.
 - Route selection: shortest AS-path (fewer AS hops). Tie-breaker: lexicographically smaller path.
 - Loop prevention: a router rejects any advertised path containing its own AS.
 - Convergence: when a full round causes no route changes.
+- Run with --headless (or ROUTING_SIM_HEADLESS=1) for no pacing, plots or per-router tables:
+  all routing tables go to one JSON Lines file (--output, .parquet with pyarrow).
 
 """
 
 import os
 import time
-from copy import deepcopy
 import networkx as nx
-import matplotlib.pyplot as plt
-from tabulate import tabulate
+
+from sim_common import VersionedTable, pace, parse_cli, pyplot, tabulate, write_records
 
 # ----------------------------
 # Config / Paths
@@ -68,7 +69,7 @@ class ASNode:
         self.asn = asn
         self.neighbors = neighbors if neighbors else []
         # local routing information base (prefix -> AS-path)
-        self.local_rib = {}
+        self.local_rib = VersionedTable()
         # origin prefixes: if this AS originates prefix P, it initially installs path [asn] for that prefix
         self.orig_prefixes = set(orig_prefixes) if orig_prefixes else set()
         for p in self.orig_prefixes:
@@ -79,7 +80,7 @@ class ASNode:
         Returns a dict of prefix -> as_path that this AS will advertise (its current local_rib).
         In real BGP, AS prepends itself when sending; in this sim we will prepend at send time.
         """
-        return deepcopy(self.local_rib)
+        return {prefix: list(path) for prefix, path in self.local_rib.items()}
 
     def receive_update(self, from_asn, prefix, path):
         """
@@ -154,6 +155,7 @@ def create_as_topology():
     return nodes, edges
 
 def draw_as_topology(edges, filename=None):
+    plt = pyplot()
     G = nx.Graph()
     # add edges; nodes will be derived
     G.add_edges_from(edges)
@@ -171,7 +173,7 @@ def draw_as_topology(edges, filename=None):
 # ----------------------------
 # BGP propagation simulation
 # ----------------------------
-def bgp_propagate(as_nodes, max_rounds=MAX_ROUNDS, pause=PAUSE, verbose=True):
+def bgp_propagate(as_nodes, max_rounds=MAX_ROUNDS, pause=PAUSE, verbose=True, stats=None):
     """
     Simulate rounds of UPDATE propagation:
     Synchronous rounds: in each round, every AS advertises all prefixes it knows (local_rib) to all neighbors.
@@ -180,13 +182,18 @@ def bgp_propagate(as_nodes, max_rounds=MAX_ROUNDS, pause=PAUSE, verbose=True):
     When sending to neighbor, we will advertise: advertised_path = [sender_asn] + best_path_without_self if best_path exists and DOES NOT already start with sender_asn.
     The neighbor will receive that advertised_path and decide whether to accept (loop prevention + path selection).
     Continue until a round produces no updates.
+    stats: optional dict filled with "messages" (UPDATEs sent, one prefix
+    each), "rounds" and "wall_seconds".
     """
+    start = time.perf_counter()
+    messages = 0
     rounds = 0
     for r in range(1, max_rounds+1):
         rounds += 1
         if verbose:
             print(f"\n--- BGP ROUND {r} ---")
-        snapshots = {asn: deepcopy(node.local_rib) for asn, node in as_nodes.items()}
+        # O(1) snapshots; paths are replaced on update, never mutated (see sim_common.VersionedTable)
+        snapshots = {asn: node.local_rib.snapshot() for asn, node in as_nodes.items()}
         any_change = False
         for asn, node in as_nodes.items():
             # for each prefix this AS knows, prepare an advertisement to neighbors
@@ -199,6 +206,7 @@ def bgp_propagate(as_nodes, max_rounds=MAX_ROUNDS, pause=PAUSE, verbose=True):
                 # Force the advertised form to start with asn:
                 # Remove any leading duplicates and ensure first element is asn
                 advertised = [asn] + [p for p in path if p != asn]
+                messages += len(node.neighbors)
                 # send to neighbors
                 for nb in node.neighbors:
                     # Avoid immediate reflection: the neighbor will receive 'advertised'
@@ -212,11 +220,13 @@ def bgp_propagate(as_nodes, max_rounds=MAX_ROUNDS, pause=PAUSE, verbose=True):
             # print brief summary
             for asn, node in as_nodes.items():
                 print(f"AS{asn} knows prefixes: {list(node.local_rib.keys())}")
-        time.sleep(pause)
+        pace(pause)
         if not any_change:
             if verbose:
                 print("\nNo changes this round — converged.")
             break
+    if stats is not None:
+        stats.update(messages=messages, rounds=rounds, wall_seconds=time.perf_counter() - start)
     return rounds
 
 # ----------------------------
@@ -247,6 +257,14 @@ def build_as_nodes(nodes_def, edges):
 # ----------------------------
 # Output helpers: save tables and print final state
 # ----------------------------
+def rib_records(as_nodes):
+    """One record per (AS, prefix) with the columns of the printed tables, for write_records."""
+    for asn, node in sorted(as_nodes.items()):
+        for prefix, path in sorted(node.local_rib.items()):
+            yield {"sim": "bgp", "asn": asn, "prefix": prefix, "as_path": list(path),
+                   "as_path_length": len(path) - 1 if path else None,
+                   "next_hop": path[1] if len(path) > 1 else None}
+
 def save_and_print_all(as_nodes):
     for asn, node in sorted(as_nodes.items()):
         print_table(asn, node.local_rib)
@@ -275,16 +293,25 @@ def simulate_withdrawal(as_nodes, withdrawing_asn, prefix):
 # ----------------------------
 # Main
 # ----------------------------
-def main():
+def main(argv=None):
+    args = parse_cli("BGP path-vector simulation", os.path.join(OUTPUT_DIR, "bgp_routing_tables.jsonl"), argv)
+    start = time.perf_counter()
     ensure_dirs()
     # Create topology and nodes
     nodes_def, edges = create_as_topology()
-    topo_file = os.path.join(SCREENSHOT_DIR, "topology_bgp.png")
-    draw_as_topology(edges, filename=topo_file)
-    print(f"AS-level topology saved to: {topo_file}")
+    if not args.headless:
+        topo_file = os.path.join(SCREENSHOT_DIR, "topology_bgp.png")
+        draw_as_topology(edges, filename=topo_file)
+        print(f"AS-level topology saved to: {topo_file}")
 
     # Build ASNode objects
     as_nodes = build_as_nodes(nodes_def, edges)
+    if args.headless:
+        rounds = bgp_propagate(as_nodes, max_rounds=MAX_ROUNDS, pause=PAUSE, verbose=False)
+        count = write_records(args.output, rib_records(as_nodes))
+        print(f"BGP: {len(as_nodes)} ASes, {rounds} rounds, {count} routes -> {args.output} "
+              f"({time.perf_counter() - start:.3f} s)")
+        return
 
     # Initial state: each AS has its locally originated prefixes already (set in constructor)
     print("\nInitial local RIBs (origins):")
@@ -7,16 +7,18 @@ IS-IS Simulation (Link-State style) for lab assignment.
 - LSPs are flooded reliably until all routers have identical LSDBs.
 - Each router computes shortest-path tree (Dijkstra) from its LSDB and generates routing table.
 - Outputs saved under outputs/screenshots and outputs/routing_tables.
+- Run with --headless (or ROUTING_SIM_HEADLESS=1) for no pacing, plots or per-router tables:
+  all routing tables go to one JSON Lines file (--output, .parquet with pyarrow).
 
 """
 
 import os
 import time
-from copy import deepcopy
 import itertools
 import networkx as nx
-import matplotlib.pyplot as plt
-from tabulate import tabulate
+
+from sim_common import (VersionedTable, pace, parse_cli, pyplot, routing_table_records, tabulate,
+                        write_records)
 
 # -----------------------------
 # Configuration
@@ -92,7 +94,7 @@ class ISISRouter:
         self.name = name
         self.neighbors = neighbors  # list of neighbor names
         # LSDB: link_id -> {"cost":..., "seq":..., "origin":...}
-        self.lsdb = {}
+        self.lsdb = VersionedTable()
         # local sequence counter to originate LSPs
         self.seq_counter = itertools.count(start=1)
 
@@ -126,13 +128,17 @@ class ISISRouter:
 # -----------------------------
 # Flooding logic (reliable synchronous rounds)
 # -----------------------------
-def flood_lsps(routers: dict, initial_lsps: dict):
+def flood_lsps(routers: dict, initial_lsps: dict, stats=None):
     """
     Flood LSPs until no LSDB changes occur.
     routers: name -> ISISRouter
     initial_lsps: name -> list of LSPs originated by that router
+    stats: optional dict filled with "transmissions" (LSPs sent), "rounds"
+    and "wall_seconds"
     Returns (rounds, lsp_advs_per_round_list)
     """
+    start = time.perf_counter()
+    transmissions = 0
     # preload origin LSPs into routers' own LSDBs
     for name, lsps in initial_lsps.items():
         for lsp in lsps:
@@ -144,13 +150,15 @@ def flood_lsps(routers: dict, initial_lsps: dict):
         rounds += 1
         any_change = False
         advs = 0
-        snapshots = {name: deepcopy(r.lsdb) for name, r in routers.items()}
+        snapshots = {name: r.lsdb.snapshot() for name, r in routers.items()}
         # each router sends its LSDB snapshot to neighbors
         for name, r in routers.items():
+            lsps = [LSP(link, info.get("origin"), info.get("seq"), info.get("cost"))
+                    for link, info in snapshots[name].items()]
             for nb in r.neighbors:
                 # neighbor processes every LSP in sender's snapshot
-                for link, info in snapshots[name].items():
-                    lsp = LSP(link, info.get("origin"), info.get("seq"), info.get("cost"))
+                transmissions += len(lsps)
+                for lsp in lsps:
                     changed = routers[nb].receive_lsp(lsp)
                     if changed:
                         any_change = True
@@ -158,7 +166,10 @@ def flood_lsps(routers: dict, initial_lsps: dict):
         advs_per_round.append(advs)
         if not any_change or rounds >= MAX_FLOOD_ROUNDS:
             break
-        time.sleep(PAUSE)
+        pace(PAUSE)
+    if stats is not None:
+        stats.update(transmissions=transmissions, rounds=rounds,
+                     wall_seconds=time.perf_counter() - start)
     return rounds, advs_per_round
 
 # -----------------------------
@@ -208,6 +219,7 @@ def compute_routing_tables(routers: dict):
 # Visualization helpers
 # -----------------------------
 def draw_topology(G, filename=None):
+    plt = pyplot()
     pos = nx.spring_layout(G, seed=42)
     plt.figure(figsize=(8,6))
     nx.draw_networkx_nodes(G, pos, node_size=700)
@@ -222,6 +234,7 @@ def draw_topology(G, filename=None):
     plt.close()
 
 def draw_spt(router_name, lsdb, routing_table, filename=None):
+    plt = pyplot()
     H = build_graph_from_lsdb(lsdb)
     pos = nx.spring_layout(H, seed=42)
     plt.figure(figsize=(8,6))
@@ -268,13 +281,16 @@ def print_and_save_tables(routing_tables, rounds):
 # -----------------------------
 # Main simulation flow
 # -----------------------------
-def main():
+def main(argv=None):
+    args = parse_cli("IS-IS link-state simulation", os.path.join(OUTPUT_DIR, "isis_routing_tables.jsonl"), argv)
+    start = time.perf_counter()
     ensure_dirs()
     # Build ground-truth topology
     G = create_isis_topology()
-    topo_file = os.path.join(SCREENSHOT_DIR, "topology_isis.png")
-    draw_topology(G, filename=topo_file)
-    print(f"Topology image saved to: {topo_file}")
+    if not args.headless:
+        topo_file = os.path.join(SCREENSHOT_DIR, "topology_isis.png")
+        draw_topology(G, filename=topo_file)
+        print(f"Topology image saved to: {topo_file}")
 
     # Create routers and originate LSPs
     routers = {}
@@ -288,14 +304,21 @@ def main():
         lsps = r.originate_lsps(G)
         initial_lsps[name] = lsps
 
-    print("Starting LSP flooding (IS-IS style)...")
+    if not args.headless:
+        print("Starting LSP flooding (IS-IS style)...")
     rounds, advs_per_round = flood_lsps(routers, initial_lsps)
-    print(f"Flooding converged after {rounds} rounds.")
-    for name, r in routers.items():
-        print(f"Router {name} LSDB size: {len(r.lsdb)}")
 
     # Compute routing tables
     routing_tables = compute_routing_tables(routers)
+    if args.headless:
+        count = write_records(args.output, routing_table_records("isis", routing_tables))
+        print(f"IS-IS: {len(routers)} routers, {rounds} flooding rounds, {count} routes -> {args.output} "
+              f"({time.perf_counter() - start:.3f} s)")
+        return
+
+    print(f"Flooding converged after {rounds} rounds.")
+    for name, r in routers.items():
+        print(f"Router {name} LSDB size: {len(r.lsdb)}")
     print_and_save_tables(routing_tables, rounds)
 
     # Save per-router SPT images
@@ -307,7 +330,7 @@ def main():
     # Optionally plot flooding activity (advs per round)
     conv_file = os.path.join(SCREENSHOT_DIR, "isis_flooding_activity.png")
     try:
-        import matplotlib.pyplot as plt
+        plt = pyplot()
         rounds_x = list(range(1, len(advs_per_round)+1))
         plt.figure(figsize=(8,4))
         plt.plot(rounds_x, advs_per_round, marker='o')
@@ -4,21 +4,36 @@ ospf_sim.py
 OSPF Simulation (Link-State) with LSDB flooding and Dijkstra SPT computation.
 
 - Each router originates LSAs for its directly-connected links (with sequence numbers).
-- LSAs are reliably flooded until all routers have identical LSDBs (link-state databases).
+- LSAs are reliably flooded until all routers have identical LSDBs (link-state databases): each router
+  forwards only newly accepted LSAs, with per-adjacency acknowledgements and retransmission
+  (flood_lsas_snapshot keeps the original full-LSDB-per-round model for comparison).
 - Each router builds a local graph from its LSDB and runs Dijkstra to compute the shortest-path tree
-  and routing table (destination -> cost, next_hop).
+  and routing table (destination -> cost, next_hop). The graph is a compact CSR adjacency
+  (LinkStateGraph) built once per LSDB content and shared by every router holding that LSDB;
+  the original networkx path is kept as compute_routing_tables(..., engine="networkx").
+- inject_link_change fails, repairs or re-costs a link in a converged simulation: the new LSA is
+  flooded and every router updates its shortest-path tree incrementally (iSPF), recomputing only
+  the routers below the changed link.
 - Visualizes topology and per-router SPTs and saves routing tables to files.
+- Run with --headless (or ROUTING_SIM_HEADLESS=1) for no pacing, plots or per-router tables:
+  all routing tables go to one JSON Lines file (--output, .parquet with pyarrow).
 
 """
 
+import functools
+import math
+import hashlib
 import os
 import time
-from copy import deepcopy
+import heapq
+import random
+from array import array
 import networkx as nx
-import matplotlib.pyplot as plt
-from tabulate import tabulate
 import itertools
 
+from sim_common import (VersionedTable, pace, parse_cli, pyplot, routing_table_records, tabulate,
+                        write_records)
+
 # -----------------------------
 # Configuration
 # -----------------------------
@@ -26,7 +41,9 @@ OUTPUT_DIR = "ospf_outputs"
 SCREENSHOT_DIR = os.path.join(OUTPUT_DIR, "screenshots")
 RT_DIR = os.path.join(OUTPUT_DIR, "routing_tables")
 PAUSE = 0.1
-MAX_FLOOD_ROUNDS = 50
+MAX_FLOOD_ROUNDS = 50  # floor of the flooding round limit, see flood_round_limit
+GRAPH_CACHE_SIZE = 8   # distinct LSDB versions whose CSR graphs are kept
+LINK_DOWN = -1         # cost of a failed link inside LinkStateGraph
 
 def ensure_dirs():
     os.makedirs(SCREENSHOT_DIR, exist_ok=True)
@@ -85,6 +102,13 @@ class LSA:
     def __repr__(self):
         return f"LSA(link={self.link_id}, origin={self.origin}, seq={self.seq}, cost={self.cost})"
 
+_DIGEST_MASK = (1 << 128) - 1
+
+@functools.lru_cache(maxsize=1 << 16)     # every router stores the same entries
+def _entry_digest(link, cost):
+    """128-bit hash of one LSDB entry; an LSDB digest is their sum mod 2**128."""
+    return int.from_bytes(hashlib.blake2b(repr((link, cost)).encode(), digest_size=16).digest(), "little")
+
 class OSPFRouter:
     """
     Router that keeps an LSDB (mapping link_id -> (cost, seq, origin)).
@@ -94,9 +118,27 @@ class OSPFRouter:
         self.name = name
         self.neighbors = neighbors  # neighbor names list
         # LSDB: link_id -> {"cost":..., "seq":..., "origin":...}
-        self.lsdb = {}
+        self.lsdb = VersionedTable()
+        # order-independent 128-bit digest of the (link, cost) pairs in the
+        # LSDB; kept up to date by store_lsa, used to share SPF graphs
+        self.lsdb_digest = 0
         # LSA sequence number counter for LSAs originated by this router
         self.seq_counter = itertools.count(start=1)
+        # shortest-path tree from the last SPF (see compute_routing_tables)
+        self.spt = None
+
+    def store_lsa(self, link, cost, seq, origin):
+        """
+        Write an LSDB entry. All LSDB writes should go through here so that
+        lsdb_digest stays in step with the contents.
+        """
+        old = self.lsdb.get(link)
+        digest = self.lsdb_digest
+        if old is not None:
+            digest -= _entry_digest(link, old["cost"])
+        self.lsdb[link] = {"cost": cost, "seq": seq, "origin": origin}
+        self.lsdb_digest = (digest + _entry_digest(link, cost)) & _DIGEST_MASK
+
     def originate_lsas(self, graph):
         """
         Create LSAs for each adjacent link (u, v) where this router is u or v.
@@ -109,7 +151,7 @@ class OSPFRouter:
             cost = data.get("cost", 1)
             lsa = LSA(link, self.name, seq, cost)
             # store immediately in local LSDB (originated by self)
-            self.lsdb[link] = {"cost": cost, "seq": seq, "origin": self.name}
+            self.store_lsa(link, cost, seq, self.name)
             created_lsas.append(lsa)
         return created_lsas
 
@@ -122,27 +164,126 @@ class OSPFRouter:
         existing = self.lsdb.get(key)
         if existing is None or lsa.seq > existing.get("seq", 0):
             # accept and store
-            self.lsdb[key] = {"cost": lsa.cost, "seq": lsa.seq, "origin": lsa.origin}
+            self.store_lsa(key, lsa.cost, lsa.seq, lsa.origin)
             return True
         return False
 
 # -----------------------------
 # Flooding simulation (reliable)
 # -----------------------------
-def flood_lsas(routers: dict, initial_lsas: dict):
+def flood_round_limit(routers: dict, loss=0.0):
+    """
+    Round limit for flooding over `routers`: an LSA is accepted at most once
+    per router, so lossless flooding settles within len(routers) + 1
+    rounds; with `loss` a hop needs 1 / (1 - loss)^2 tries on average (LSA
+    and ack must both get through). Twice that, and never below
+    MAX_FLOOD_ROUNDS.
+    """
+    if not 0.0 <= loss < 1.0:
+        raise ValueError(f"loss must be in [0, 1), got {loss}")
+    return max(MAX_FLOOD_ROUNDS, math.ceil(2 * (len(routers) + 1) / (1.0 - loss) ** 2))
+
+def flood_lsas(routers: dict, initial_lsas: dict, stats=None, loss=0.0, seed=None,
+               max_rounds=None):
     """
-    Simulate reliable flooding of LSAs until no router updates its LSDB.
+    Simulate reliable flooding of LSAs in synchronous rounds until every
+    LSA has been delivered and acknowledged.
     routers: name -> OSPFRouter
     initial_lsas: name -> list of LSAs originated by that router
+    Each round a router sends the LSAs it newly accepted in the previous
+    round (its own originations in the first) to every neighbor except the
+    one it learned them from. Every LSA received is acknowledged, duplicates
+    included; per adjacency the sender keeps a retransmission list of LSAs
+    not yet acknowledged and resends them the next round. `loss` drops
+    each transmission (LSA or ack) with that probability, to exercise
+    retransmission (random.Random(seed)).
+    max_rounds: stop after this many rounds (default flood_round_limit).
+    stats: optional dict filled with "transmissions" (LSAs sent, resends
+    included), "retransmissions", "acks", "duplicates", "rounds",
+    "converged" (False if max_rounds cut flooding short) and "wall_seconds"
     Returns number_of_rounds and total_advertisements_per_round list for plotting (optional)
     """
+    if max_rounds is None:
+        max_rounds = flood_round_limit(routers, loss)
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    # name -> [(lsa, neighbor it came from)] to send this round
+    pending = {}
+    for name, lsas in initial_lsas.items():
+        for lsa in lsas:
+            routers[name].store_lsa(lsa.key(), lsa.cost, lsa.seq, lsa.origin)
+        if lsas:
+            pending[name] = [(lsa, None) for lsa in lsas]
+    # (sender, neighbor) -> {link: LSA sent but not acknowledged yet}
+    unacked = {}
+
+    rounds = 0
+    advs_per_round = []
+    transmissions = retransmissions = acks = duplicates = 0
+    while pending or unacked:
+        rounds += 1
+        advs = 0
+        next_pending = {}
+        # LSAs not acknowledged last round are resent first, then the new ones
+        sends = [(name, nb, [(lsa, None) for lsa in waiting.values()])
+                 for (name, nb), waiting in unacked.items()]
+        unacked = {}
+        retransmissions += sum(len(items) for _, _, items in sends)
+        sends.extend((name, nb, items) for name, items in pending.items()
+                     for nb in routers[name].neighbors)
+        for name, nb, items in sends:
+            receiver = routers[nb]
+            for lsa, source in items:
+                if nb == source:
+                    continue
+                transmissions += 1
+                # the LSA stays on the (name, nb) retransmission list until
+                # nb's acknowledgement gets back; without loss that is this round
+                if loss and rng.random() < loss:
+                    unacked.setdefault((name, nb), {})[lsa.key()] = lsa
+                    continue
+                if receiver.receive_lsa(lsa):
+                    advs += 1
+                    next_pending.setdefault(nb, []).append((lsa, name))
+                else:
+                    duplicates += 1
+                acks += 1
+                if loss and rng.random() < loss:
+                    unacked.setdefault((name, nb), {})[lsa.key()] = lsa
+        pending = next_pending
+        advs_per_round.append(advs)
+        if rounds >= max_rounds:
+            break
+        if pending or unacked:
+            pace(PAUSE)
+    if stats is not None:
+        stats.update(transmissions=transmissions, retransmissions=retransmissions, acks=acks,
+                     duplicates=duplicates, rounds=rounds, converged=not (pending or unacked),
+                     wall_seconds=time.perf_counter() - start)
+    return rounds, advs_per_round
+
+def flood_lsas_snapshot(routers: dict, initial_lsas: dict, stats=None, max_rounds=None):
+    """
+    The original flooding model, kept for comparison with flood_lsas: every
+    round each router sends a snapshot of its whole LSDB to every neighbor.
+    routers: name -> OSPFRouter
+    initial_lsas: name -> list of LSAs originated by that router
+    max_rounds: stop after this many rounds (default flood_round_limit).
+    stats: optional dict filled with "transmissions" (LSAs sent), "rounds",
+    "converged" and "wall_seconds"
+    Returns number_of_rounds and total_advertisements_per_round list for plotting (optional)
+    """
+    if max_rounds is None:
+        max_rounds = flood_round_limit(routers)
+    start = time.perf_counter()
+    transmissions = 0
     # Each router maintains an 'inbox' (LSAs newly received this round) to avoid immediate re-flood loops.
     # We'll do synchronous rounds: in each round, every router sends its new/known LSAs to neighbors, neighbors process them next round.
     # For simplicity we initially give each router the LSAs it originated (local), then flood until quiescent.
     # Prepare initial known LSAs based on originations
     for name, lsas in initial_lsas.items():
         for lsa in lsas:
-            routers[name].lsdb[lsa.key()] = {"cost": lsa.cost, "seq": lsa.seq, "origin": lsa.origin}
+            routers[name].store_lsa(lsa.key(), lsa.cost, lsa.seq, lsa.origin)
 
     rounds = 0
     advs_per_round = []
@@ -150,23 +291,28 @@ def flood_lsas(routers: dict, initial_lsas: dict):
         rounds += 1
         any_change = False
         advs = 0
-        # snapshots to simulate atomic sending
-        snapshots = {name: deepcopy(r.lsdb) for name, r in routers.items()}
+        # snapshots to simulate atomic sending (O(1) each, see sim_common.VersionedTable)
+        snapshots = {name: r.lsdb.snapshot() for name, r in routers.items()}
         # each router sends their full LSDB to neighbors (in practice routers send only new LSAs; here we simplify)
         for name, r in routers.items():
+            lsas = [LSA(link, info.get("origin"), info.get("seq"), info.get("cost"))
+                    for link, info in snapshots[name].items()]
             for nb in r.neighbors:
                 # neighbor processes each LSA that the sender knows
-                for link, info in snapshots[name].items():
-                    lsa = LSA(link, info.get("origin"), info.get("seq"), info.get("cost"))
+                for lsa in lsas:
+                    transmissions += 1
                     changed = routers[nb].receive_lsa(lsa)
                     if changed:
                         any_change = True
                         advs += 1
         advs_per_round.append(advs)
         # stop when no change occurred in this round
-        if not any_change or rounds >= MAX_FLOOD_ROUNDS:
+        if not any_change or rounds >= max_rounds:
             break
-        time.sleep(PAUSE)
+        pace(PAUSE)
+    if stats is not None:
+        stats.update(transmissions=transmissions, rounds=rounds, converged=not any_change,
+                     wall_seconds=time.perf_counter() - start)
     return rounds, advs_per_round
 
 # -----------------------------
@@ -180,18 +326,337 @@ def build_graph_from_lsdb(lsdb):
     H = nx.Graph()
     for (u,v), info in lsdb.items():
         cost = info.get("cost", 1)
+        if cost is None:
+            continue  # failed link
         H.add_edge(u, v, cost=cost)
     return H
 
+# -----------------------------
+# Compact link-state graph (CSR) and Dijkstra
+# -----------------------------
+class LinkStateGraph:
+    """
+    Read-only adjacency of an LSDB in CSR form: routers are numbered in
+    name order, and the neighbours of router i are targets[offsets[i]:offsets[i+1]]
+    with the link costs at the same positions. Integer costs are stored in
+    an array('q'), anything else in an array('d'). Failed links (cost None
+    in the LSDB) keep their slots with cost LINK_DOWN, so with_link_cost can
+    bring them back without rebuilding.
+    """
+    def __init__(self, lsdb):
+        self.names = sorted({node for link in lsdb for node in link})
+        self.index = {name: i for i, name in enumerate(self.names)}
+        index = self.index
+        directed = []
+        for (u, v), info in lsdb.items():
+            i, j = index[u], index[v]
+            cost = info.get("cost", 1)
+            if cost is None:
+                cost = LINK_DOWN
+            directed.append((i, j, cost))
+            directed.append((j, i, cost))
+        directed.sort()
+        counts = [0] * (len(self.names) + 1)
+        for i, _, _ in directed:
+            counts[i + 1] += 1
+        self.offsets = array("l", itertools.accumulate(counts))
+        self.targets = array("l", [j for _, j, _ in directed])
+        costs = [cost for _, _, cost in directed]
+        self.costs = array("q" if all(type(c) is int for c in costs) else "d", costs)
+
+    def with_link_cost(self, a, b, cost):
+        """
+        Copy of the graph with the link between router indices a and b set
+        to `cost` (None = failed). Names and adjacency are shared, only the
+        cost array is copied. Returns None if the link is not in the graph.
+        """
+        slots = [i for i in range(self.offsets[a], self.offsets[a + 1]) if self.targets[i] == b]
+        slots += [i for i in range(self.offsets[b], self.offsets[b + 1]) if self.targets[i] == a]
+        if not slots:
+            return None
+        graph = LinkStateGraph.__new__(LinkStateGraph)
+        graph.names, graph.index = self.names, self.index
+        graph.offsets, graph.targets = self.offsets, self.targets
+        if cost is None:
+            cost = LINK_DOWN
+        typecode = self.costs.typecode if type(cost) is int else "d"
+        graph.costs = array(typecode, self.costs)
+        for i in slots:
+            graph.costs[i] = cost
+        return graph
+
+    def link_cost(self, a, b):
+        """Cost of the link between router indices a and b (None if failed or absent)."""
+        for i in range(self.offsets[a], self.offsets[a + 1]):
+            if self.targets[i] == b and self.costs[i] >= 0:
+                return self.costs[i]
+        return None
+
+    def spf(self, source):
+        """
+        Dijkstra from router index `source` with a binary heap of (cost, index).
+        Returns (dist, next_hop, parent) lists indexed by router: cost (inf
+        when unreachable), index of the first hop and of the predecessor in
+        the shortest-path tree (-1 for the source and unreachable routers).
+        Equal-cost paths keep the one found first, with heap ties going to
+        the lower router index. networkx explores in another order, so on
+        equal-cost paths the next hop may differ from the "networkx" engine
+        of compute_routing_tables; costs are always the same.
+        """
+        offsets, targets, costs = self.offsets, self.targets, self.costs
+        inf = float("inf")
+        dist = [inf] * len(self.names)
+        next_hop = [-1] * len(self.names)
+        parent = [-1] * len(self.names)
+        done = bytearray(len(self.names))
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if done[v]:
+                continue
+            done[v] = 1
+            hop = next_hop[v]
+            for i in range(offsets[v], offsets[v + 1]):
+                c = costs[i]
+                if c < 0:
+                    continue  # failed link
+                u = targets[i]
+                nd = d + c
+                if nd < dist[u] and not done[u]:
+                    dist[u] = nd
+                    next_hop[u] = u if v == source else hop
+                    parent[u] = v
+                    heapq.heappush(heap, (nd, u))
+        return dist, next_hop, parent
+
+    def routing_table(self, name):
+        """dest -> (cost, next_hop) for router `name`, in the format of compute_routing_tables."""
+        return ShortestPathTree(self, name).table()
+
+
+class ShortestPathTree:
+    """
+    One router's shortest-path tree over a LinkStateGraph, kept so that a
+    single link change can be applied incrementally (iSPF) instead of
+    rerunning Dijkstra: update_link only recomputes the routers whose
+    distance can actually change.
+    """
+    def __init__(self, graph, name):
+        self.graph = graph
+        self.name = name
+        self.source = graph.index.get(name)
+        if self.source is None:
+            self.dist, self.next_hop, self.parent = [], [], []
+        else:
+            self.dist, self.next_hop, self.parent = graph.spf(self.source)
+
+    def table(self):
+        """dest -> (cost, next_hop), unreachable routers as (inf, None)."""
+        names = self.graph.names
+        name = self.name
+        rt = {}
+        if self.source is None:
+            # a router without links of its own still lists the others, unreachable
+            for dest in sorted(names + [name]):
+                rt[dest] = (0, name) if dest == name else (float('inf'), None)
+            return rt
+        for dest, cost, hop in zip(names, self.dist, self.next_hop):
+            if dest == name:
+                rt[dest] = (0, name)
+            elif hop >= 0:
+                rt[dest] = (cost, names[hop])
+            else:
+                rt[dest] = (float('inf'), None)
+        return rt
+
+    def update_link(self, graph, a, b, old_cost, new_cost):
+        """
+        Move the tree onto `graph`, in which only the link between router
+        indices a and b changed from old_cost to new_cost (None = failed).
+        Returns the list of router indices whose distance or next hop was
+        recomputed.
+        - cost decrease / link up: Dijkstra seeded from the end that gets
+          closer, relaxing only distances that strictly improve;
+        - cost increase / failure: nothing to do unless the link is in the
+          tree; otherwise the subtree below it is detached and re-attached
+          from its best neighbours outside the subtree.
+        """
+        self.graph = graph
+        if self.source is None:
+            return []
+        inf = float("inf")
+        old = inf if old_cost is None else old_cost
+        new = inf if new_cost is None else new_cost
+        if new < old:
+            return self._decrease(a, b, new)
+        if new > old:
+            return self._increase(a, b)
+        return []
+
+    def _settle(self, heap, members=None):
+        """Dijkstra over the entries in heap; relaxes only routers in `members` (None = all)."""
+        graph, dist, parent, next_hop = self.graph, self.dist, self.parent, self.next_hop
+        offsets, targets, costs = graph.offsets, graph.targets, graph.costs
+        source = self.source
+        touched = []
+        done = set()
+        while heap:
+            d, v = heapq.heappop(heap)
+            if v in done or d > dist[v]:
+                continue
+            done.add(v)
+            touched.append(v)
+            p = parent[v]
+            next_hop[v] = v if p == source else next_hop[p]
+            for i in range(offsets[v], offsets[v + 1]):
+                c = costs[i]
+                if c < 0:
+                    continue
+                u = targets[i]
+                if members is not None and u not in members:
+                    continue
+                nd = d + c
+                if nd < dist[u] and u not in done:
+                    dist[u] = nd
+                    parent[u] = v
+                    heapq.heappush(heap, (nd, u))
+        return touched
+
+    def _decrease(self, a, b, cost):
+        dist, parent = self.dist, self.parent
+        heap = []
+        for u, v in ((a, b), (b, a)):
+            if dist[u] + cost < dist[v]:
+                dist[v] = dist[u] + cost
+                parent[v] = u
+                heap.append((dist[v], v))
+        return self._settle(heap)
+
+    def _increase(self, a, b):
+        dist, parent, next_hop = self.dist, self.parent, self.next_hop
+        if parent[b] == a:
+            root = b
+        elif parent[a] == b:
+            root = a
+        else:
+            return []  # not a tree link: no path used it
+        graph = self.graph
+        offsets, targets, costs = graph.offsets, graph.targets, graph.costs
+        # the subtree hanging below the link: routers whose tree parent is in it
+        subtree = [root]
+        members = {root}
+        for x in subtree:
+            for i in range(offsets[x], offsets[x + 1]):
+                y = targets[i]
+                if parent[y] == x and y not in members:
+                    members.add(y)
+                    subtree.append(y)
+        inf = float("inf")
+        for x in subtree:
+            dist[x] = inf
+            parent[x] = next_hop[x] = -1
+        # best attachment of each detached router to the rest of the tree
+        heap = []
+        for x in subtree:
+            for i in range(offsets[x], offsets[x + 1]):
+                c = costs[i]
+                w = targets[i]
+                if c < 0 or w in members:
+                    continue
+                nd = dist[w] + c
+                if nd < dist[x]:
+                    dist[x] = nd
+                    parent[x] = w
+            if parent[x] >= 0:
+                heap.append((dist[x], x))
+        heapq.heapify(heap)
+        self._settle(heap, members)
+        return subtree
+
+
+_graph_cache = {}   # (lsdb_digest, size) -> ({link: cost} the graph was built from, graph)
+
+
+def clear_graph_cache():
+    """Drop every cached LSDB graph (e.g. between independent simulations)."""
+    _graph_cache.clear()
+
+
+def _cached_graph(router, key):
+    """
+    The cached graph for the router's LSDB, or None. A hit is confirmed
+    link by link (the key fixes the size), so a digest collision costs a
+    rebuild, never a wrong graph.
+    """
+    entry = _graph_cache.get(key)
+    if entry is None:
+        return None
+    costs, graph = entry
+    lsdb = router.lsdb
+    for link, cost in costs.items():
+        info = lsdb.get(link)
+        if info is None or info["cost"] != cost:
+            return None
+    return graph
+
+
+def lsdb_graph(router, confirmed=None):
+    """
+    CSR graph of the router's LSDB, built once per LSDB content: routers
+    whose LSDBs hold the same links and costs share one graph.
+    confirmed: optional set of digests already checked link by link during
+    the current computation; routers with such a digest take the cached
+    graph in O(1) (the 128-bit digest stands in for the full comparison),
+    so a pass over N routers checks each distinct LSDB once, not N times.
+    """
+    key = (router.lsdb_digest, len(router.lsdb))
+    if confirmed is not None and key in confirmed:
+        entry = _graph_cache.get(key)
+        if entry is not None:
+            return entry[1]
+    graph = _cached_graph(router, key)
+    if graph is None:
+        graph = LinkStateGraph(router.lsdb)
+        _remember_graph(router, graph)
+    if confirmed is not None:
+        confirmed.add(key)
+    return graph
+
+
+def _remember_graph(router, graph):
+    """Cache `graph` as the one for the router's current LSDB contents."""
+    key = (router.lsdb_digest, len(router.lsdb))
+    entry = _graph_cache.get(key)
+    if entry is not None and (entry[1] is graph or _cached_graph(router, key) is not None):
+        return
+    if entry is None and len(_graph_cache) >= GRAPH_CACHE_SIZE:
+        _graph_cache.clear()
+    _graph_cache[key] = ({link: info["cost"] for link, info in router.lsdb.items()}, graph)
+
 # -----------------------------
 # Compute routing table for each router using Dijkstra
 # -----------------------------
-def compute_routing_tables(routers: dict):
+def compute_routing_tables(routers: dict, engine="csr"):
     """
-    For each router, build Graph from its LSDB and run Dijkstra to obtain
-    cost and next-hop to every destination.
+    For each router, run Dijkstra over its LSDB to obtain cost and
+    next-hop to every destination. engine "csr" uses the shared
+    LinkStateGraph of the LSDB and keeps each router's ShortestPathTree in
+    r.spt; "networkx" builds a networkx Graph per router and calls
+    nx.single_source_dijkstra. Both give the same costs; where several
+    paths tie for the lowest cost they may pick different next hops.
     Returns a mapping: router_name -> routing_table (dest -> (cost, next_hop))
     """
+    if engine == "csr":
+        routing_tables = {}
+        confirmed = set()
+        for name, r in routers.items():
+            # keep the tree: inject_link_change updates it incrementally
+            r.spt = ShortestPathTree(lsdb_graph(r, confirmed), name)
+            routing_tables[name] = r.spt.table()
+        return routing_tables
+    if engine != "networkx":
+        raise ValueError(f"Unknown SPF engine: {engine}")
     routing_tables = {}
     for name, r in routers.items():
         H = build_graph_from_lsdb(r.lsdb)
@@ -219,10 +684,113 @@ def compute_routing_tables(routers: dict):
         routing_tables[name] = rt
     return routing_tables
 
+# -----------------------------
+# Link changes in a converged network (iSPF)
+# -----------------------------
+def flood_lsa(routers: dict, origin, lsa: LSA):
+    """
+    Flood a single LSA from `origin` over the current adjacencies: every
+    router that accepts it passes it on to its other neighbours.
+    Returns (transmissions, names of the routers that accepted it).
+    """
+    transmissions = 0
+    accepted = []
+    queue = [(origin, None)]
+    for name, sender in queue:
+        for nb in routers[name].neighbors:
+            if nb == sender:
+                continue
+            transmissions += 1
+            if routers[nb].receive_lsa(lsa):
+                accepted.append(nb)
+                queue.append((nb, name))
+    return transmissions, accepted
+
+
+def inject_link_change(routers: dict, link, cost):
+    """
+    Change the cost of `link` (a pair of router names) in a converged
+    simulation; cost None fails the link, a cost for a failed or new link
+    brings it up. Both ends update their adjacency and originate a new LSA
+    for the link, which is flooded; a link coming up also synchronizes the
+    two LSDBs first (each end floods what the other has missed, e.g. while
+    partitioned). Every router whose only change is the new LSA moves its
+    shortest-path tree onto the new graph with ShortestPathTree.update_link
+    (one graph derived from the shared one, no rebuild); other routers, and
+    links the graph does not know, fall back to a full SPF.
+    Routing tables afterwards: r.spt.table().
+
+    Returns a dict with the LSA transmissions, routers updated, routers
+    whose routes were recomputed (summed over all trees) and the CPU
+    seconds (time.process_time) spent flooding and in SPF.
+    """
+    u, v = link = tuple(sorted(link))
+    old = routers[u].lsdb.get(link)
+    old_cost = old["cost"] if old is not None else None
+    seq = max(old["seq"] if old is not None else 0, next(routers[u].seq_counter)) + 1
+    # the graph the converged trees were computed on
+    base = routers[u].spt.graph if routers[u].spt is not None else lsdb_graph(routers[u])
+
+    start = time.process_time()
+    for a, b in ((u, v), (v, u)):
+        neighbors = routers[a].neighbors
+        if cost is None and b in neighbors:
+            neighbors.remove(b)
+        elif cost is not None and b not in neighbors:
+            neighbors.append(b)
+    transmissions = 0
+    accepted = {}   # router -> LSAs it accepted
+    if cost is not None and old_cost is None:
+        # database exchange over the new adjacency
+        for a, b in ((u, v), (v, u)):
+            for key, info in list(routers[a].lsdb.items()):
+                known = routers[b].lsdb.get(key)
+                if known is not None and known["seq"] >= info["seq"]:
+                    continue
+                sync = LSA(key, info["origin"], info["seq"], info["cost"])
+                transmissions += 1
+                if routers[b].receive_lsa(sync):
+                    accepted[b] = accepted.get(b, 0) + 1
+                    sent, names = flood_lsa(routers, b, sync)
+                    transmissions += sent
+                    for name in names:
+                        accepted[name] = accepted.get(name, 0) + 1
+    lsa = LSA(link, u, seq, cost)
+    changed = set()  # routers that accepted the new LSA
+    for end in (u, v):
+        names = [end] if routers[end].receive_lsa(lsa) else []
+        sent, flooded = flood_lsa(routers, end, lsa)
+        transmissions += sent
+        changed.update(names + flooded)
+    for name in changed:
+        accepted[name] = accepted.get(name, 0) + 1
+    flood_cpu = time.process_time() - start
+
+    start = time.process_time()
+    ia, ib = base.index.get(u), base.index.get(v)
+    graph = None
+    if ia is not None and ib is not None:
+        graph = base.with_link_cost(ia, ib, cost)
+    recomputed = 0
+    confirmed = set()
+    for name, count in accepted.items():
+        r = routers[name]
+        if (graph is not None and count == 1 and name in changed
+                and r.spt is not None and r.spt.graph is base):
+            _remember_graph(r, graph)   # shared by every router holding the new LSDB
+            recomputed += len(r.spt.update_link(graph, ia, ib, old_cost, cost))
+        else:
+            r.spt = ShortestPathTree(lsdb_graph(r, confirmed), name)
+            recomputed += len(r.spt.graph.names)
+    spf_cpu = time.process_time() - start
+    return {"transmissions": transmissions, "routers_updated": len(accepted),
+            "routes_recomputed": recomputed, "flood_cpu": flood_cpu, "spf_cpu": spf_cpu}
+
 # -----------------------------
 # Visualization helpers
 # -----------------------------
 def draw_topology(G, filename=None):
+    plt = pyplot()
     pos = nx.spring_layout(G, seed=42)
     plt.figure(figsize=(8,6))
     nx.draw_networkx_nodes(G, pos, node_size=700)
@@ -242,6 +810,7 @@ def draw_spt(router_name, lsdb, routing_table, filename=None):
     lsdb: router's LSDB (to build the underlying network)
     routing_table: mapping dest -> (cost, next_hop)
     """
+    plt = pyplot()
     H = build_graph_from_lsdb(lsdb)
     pos = nx.spring_layout(H, seed=42)
     plt.figure(figsize=(8,6))
@@ -295,13 +864,16 @@ def print_and_save_routing_tables(routing_tables):
 # -----------------------------
 # Main simulation glue
 # -----------------------------
-def main():
+def main(argv=None):
+    args = parse_cli("OSPF link-state simulation", os.path.join(OUTPUT_DIR, "ospf_routing_tables.jsonl"), argv)
+    start = time.perf_counter()
     ensure_dirs()
     # Build the true network topology (ground truth)
     G = create_weighted_topology()
-    topo_file = os.path.join(SCREENSHOT_DIR, "topology_ospf.png")
-    draw_topology(G, filename=topo_file)
-    print(f"Topology image saved to: {topo_file}")
+    if not args.headless:
+        topo_file = os.path.join(SCREENSHOT_DIR, "topology_ospf.png")
+        draw_topology(G, filename=topo_file)
+        print(f"Topology image saved to: {topo_file}")
 
     # Create routers and originate LSAs
     routers = {}
@@ -316,15 +888,25 @@ def main():
         initial_lsas[name] = lsas
 
     # Flood LSAs until convergence
-    print("Starting LSA flooding...")
-    rounds, advs_per_round = flood_lsas(routers, initial_lsas)
+    if not args.headless:
+        print("Starting LSA flooding...")
+    flood_stats = {}
+    rounds, advs_per_round = flood_lsas(routers, initial_lsas, stats=flood_stats)
+    if not flood_stats["converged"]:
+        print(f"Warning: LSA flooding stopped after {rounds} rounds without converging.")
+
+    # Compute routing tables (Dijkstra)
+    routing_tables = compute_routing_tables(routers)
+    if args.headless:
+        count = write_records(args.output, routing_table_records("ospf", routing_tables))
+        print(f"OSPF: {len(routers)} routers, {rounds} flooding rounds, {count} routes -> {args.output} "
+              f"({time.perf_counter() - start:.3f} s)")
+        return
+
     print(f"LSA flooding converged after {rounds} rounds.")
     # optional: print LSDB sizes
     for name, r in routers.items():
         print(f"Router {name} LSDB entries: {len(r.lsdb)}")
-
-    # Compute routing tables (Dijkstra)
-    routing_tables = compute_routing_tables(routers)
     print_and_save_routing_tables(routing_tables)
 
     # Save SPT images for each router
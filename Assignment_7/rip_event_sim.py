@@ -0,0 +1,436 @@
+"""
+rip_event_sim.py
+
+Event-driven RIP (distance-vector) engine, for measuring convergence,
+count-to-infinity and reconvergence after link failures on large topologies.
+
+rip_sim.simulate_rip runs lockstep rounds in which every router sends its whole
+distance vector to every neighbor. Here every message is an event in a priority
+queue, delivered after its link's delay, and routers behave like RIP (RFC 2453):
+
+- triggered updates carry only the routes changed since the router last sent,
+  batched by a random 1-5 s triggered-update delay; periodic full updates
+  (every 30 s) can be switched off for fast triggered-only runs, in which
+  case a router whose route got worse asks its neighbors for that route
+  (a RIP Request) instead of waiting for their next periodic update
+- split horizon, split horizon with poisoned reverse, or neither
+- route timeout (180 s without refresh) and garbage collection (120 s of
+  metric 16 before the route is deleted)
+- optional hold-down: once a route goes unreachable, updates for it from
+  other neighbors are ignored for `holddown` seconds
+- links fail (detected at once, or only through route timeouts), come back or
+  change cost at scheduled times
+
+Metric "infinity" is 16 as in RIP; raise it for networks more than 15 hops wide.
+Times are simulated seconds.
+
+Usage:
+    python rip_event_sim.py [--topology waxman] [--size 1000] [--failures 5]
+                            [--horizon poison|split|none] [--holddown 0]
+                            [--no-periodic] [--infinity 16] [--weighted]
+"""
+
+import argparse
+import heapq
+import random
+import time
+
+RIP_INFINITY = 16
+UPDATE_INTERVAL = 30.0
+ROUTE_TIMEOUT = 180.0
+GARBAGE_TIMEOUT = 120.0
+TRIGGER_DELAY = (1.0, 5.0)
+LINK_DELAY = 0.01
+HORIZONS = ("poison", "split", "none")
+
+# event kinds (heap entries: (time, seq, kind, a, b, payload))
+_DELIVER, _REQUEST, _TRIGGER, _PERIODIC, _TIMER, _LINK = range(6)
+
+# -----------------------------
+# Engine
+# -----------------------------
+class RIPEventSim:
+    """
+    Event-driven RIP over a networkx graph G (nodes are routers, each the
+    destination it advertises). Link cost is the edge's `cost` attribute
+    when weighted, else 1 (hop count); link delay the edge's `delay`
+    attribute, else `delay`. update_interval=None disables periodic
+    updates, and with them route timeouts and garbage collection.
+
+    Routing state per router: metric[r][dest] and next_hop[r][dest];
+    metric == infinity means unreachable (kept until garbage-collected).
+    """
+    def __init__(self, G, infinity=RIP_INFINITY, update_interval=UPDATE_INTERVAL,
+                 timeout=ROUTE_TIMEOUT, garbage=GARBAGE_TIMEOUT, holddown=0.0,
+                 trigger_delay=TRIGGER_DELAY, delay=LINK_DELAY, horizon="poison",
+                 weighted=False, seed=None):
+        if horizon not in HORIZONS:
+            raise ValueError(f"Unknown horizon mode: {horizon}")
+        if horizon == "split" and not update_interval:
+            # two routers pointing at each other never tell each other
+            # anything; only route timeouts clear such a loop
+            raise ValueError("split horizon without poisoned reverse needs periodic updates")
+        self.infinity = infinity
+        self.update_interval = update_interval
+        self.timeout = timeout if update_interval else None
+        self.garbage = garbage if update_interval else None
+        self.holddown = holddown
+        self.trigger_delay = trigger_delay
+        self.horizon = horizon
+        self.rng = random.Random(seed)
+        self.now = 0.0
+        self._queue = []
+        self._seq = 0
+
+        # adj[r][nb] = (cost, delay) for links that are up
+        self.adj = {r: {} for r in G.nodes()}
+        for u, v, data in G.edges(data=True):
+            cost = data.get("cost", 1) if weighted else 1
+            link = (cost, data.get("delay", delay))
+            self.adj[u][v] = link
+            self.adj[v][u] = link
+        self.metric = {r: {r: 0} for r in self.adj}
+        self.next_hop = {r: {r: r} for r in self.adj}
+        self.changed = {r: {r} for r in self.adj}      # routes to put in the next triggered update
+        self.wanted = {r: set() for r in self.adj}     # routes to ask the neighbors for (triggered-only)
+        self.expires = {r: {} for r in self.adj}       # dest -> route timeout (valid routes)
+        self.gc_at = {r: {} for r in self.adj}         # dest -> deletion time (unreachable routes)
+        self.hold_until = {r: {} for r in self.adj}    # dest -> end of hold-down
+        self._timer_pending = {r: set() for r in self.adj}
+        self._trigger_pending = set()
+
+        # counters
+        self.messages = 0
+        self.entries = 0
+        self.triggered_updates = 0
+        self.periodic_updates = 0
+        self.requests = 0
+        self.route_changes = 0
+        self.last_change = 0.0
+        self.events = 0
+        self.increases = {}         # (router, dest) -> metric increases since reset_counters()
+
+        for r in self.adj:
+            self._trigger(r)
+            if self.update_interval:
+                self._push(self.rng.uniform(0, self.update_interval), _PERIODIC, r)
+
+    # ---- event queue ----
+    def _push(self, at, kind, a, b=None, payload=None):
+        self._seq += 1
+        heapq.heappush(self._queue, (at, self._seq, kind, a, b, payload))
+
+    def _trigger(self, r):
+        if r not in self._trigger_pending:
+            self._trigger_pending.add(r)
+            low, high = self.trigger_delay
+            self._push(self.now + self.rng.uniform(low, high), _TRIGGER, r)
+
+    def _arm_timer(self, r, dest, at):
+        if dest not in self._timer_pending[r]:
+            self._timer_pending[r].add(dest)
+            self._push(at, _TIMER, r, dest)
+
+    # ---- route state changes ----
+    def _note_change(self):
+        self.route_changes += 1
+        self.last_change = self.now
+
+    def _set_metric(self, r, dest, metric):
+        old = self.metric[r].get(dest)
+        if old is not None and metric > old:
+            key = (r, dest)
+            self.increases[key] = self.increases.get(key, 0) + 1
+            if not self.update_interval:
+                self.wanted[r].add(dest)
+        self.metric[r][dest] = metric
+        self.changed[r].add(dest)
+        self._note_change()
+
+    def _refresh(self, r, dest):
+        self.gc_at[r].pop(dest, None)
+        if self.timeout:
+            self.expires[r][dest] = self.now + self.timeout
+            self._arm_timer(r, dest, self.now + self.timeout)
+
+    def _invalidate(self, r, dest):
+        """Route timed out or learned unreachable: metric infinity, hold-down, garbage timer."""
+        self._set_metric(r, dest, self.infinity)
+        self.expires[r].pop(dest, None)
+        if self.holddown:
+            self.hold_until[r][dest] = self.now + self.holddown
+            if not self.update_interval:
+                self._arm_timer(r, dest, self.now + self.holddown)   # ask again once it ends
+        if self.garbage:
+            self.gc_at[r][dest] = self.now + self.garbage
+            self._arm_timer(r, dest, self.now + self.garbage)
+        self._trigger(r)
+
+    # ---- messages ----
+    def _entries(self, r, nb, dests):
+        """Routes `dests` as r advertises them to nb (split horizon applied)."""
+        metric, hop = self.metric[r], self.next_hop[r]
+        horizon, inf = self.horizon, self.infinity
+        entries = []
+        for dest in dests:
+            m = metric.get(dest)
+            if m is None:
+                continue
+            if dest != r and hop[dest] == nb:
+                if horizon == "split":
+                    continue
+                if horizon == "poison":
+                    m = inf
+            entries.append((dest, m))
+        return entries
+
+    def _send(self, r, dests, to=None):
+        """One update with routes `dests` from r to every neighbor (or just `to`)."""
+        for nb, (_, delay) in self.adj[r].items():
+            if to is not None and nb != to:
+                continue
+            entries = self._entries(r, nb, dests)
+            if entries:
+                self.messages += 1
+                self.entries += len(entries)
+                self._push(self.now + delay, _DELIVER, nb, r, entries)
+
+    def _flush(self, r):
+        """Triggered update of r's changed routes, plus a Request for the wanted ones."""
+        if self.changed[r]:
+            self.triggered_updates += 1
+            self._send(r, list(self.changed[r]))
+            self.changed[r] = set()
+        if self.wanted[r]:
+            wanted = list(self.wanted[r])
+            self.wanted[r] = set()
+            for nb, (_, delay) in self.adj[r].items():
+                self.requests += 1
+                self._push(self.now + delay, _REQUEST, nb, r, wanted)
+
+    def _receive(self, r, nb, entries):
+        link = self.adj[r].get(nb)
+        if link is None:
+            return                              # link went down while in flight
+        cost = link[0]
+        inf, now = self.infinity, self.now
+        metric, hop, hold = self.metric[r], self.next_hop[r], self.hold_until[r]
+        for dest, m in entries:
+            if dest == r:
+                continue
+            m = min(m + cost, inf)
+            cur = metric.get(dest)
+            if hop.get(dest) == nb and cur is not None:
+                # from the current next hop: always believed
+                if m < inf:
+                    self._refresh(r, dest)
+                    if m != cur:
+                        self._set_metric(r, dest, m)
+                        self._trigger(r)
+                elif cur < inf:
+                    self._invalidate(r, dest)
+            elif m < inf and (cur is None or m < cur) and hold.get(dest, 0.0) <= now:
+                hop[dest] = nb
+                self._set_metric(r, dest, m)
+                self._refresh(r, dest)
+                self._trigger(r)
+
+    # ---- timers ----
+    def _timer(self, r, dest):
+        self._timer_pending[r].discard(dest)
+        if dest not in self.metric[r]:
+            return
+        if not self.update_interval:
+            # triggered-only runs arm timers just for hold-downs: once one
+            # ends, ask for the routes that were ignored meanwhile
+            self.wanted[r].add(dest)
+            self._trigger(r)
+            return
+        if self.metric[r][dest] < self.infinity:
+            deadline = self.expires[r].get(dest)
+            if deadline is None:
+                return
+            if deadline > self.now:
+                self._arm_timer(r, dest, deadline)
+            else:
+                self._invalidate(r, dest)
+        else:
+            deadline = self.gc_at[r].get(dest)
+            if deadline is None:
+                return
+            if deadline > self.now:
+                self._arm_timer(r, dest, deadline)
+            else:
+                del self.metric[r][dest]
+                del self.next_hop[r][dest]
+                del self.gc_at[r][dest]
+                self.changed[r].discard(dest)
+
+    # ---- topology changes ----
+    def link_down(self, u, v, detect=True):
+        """
+        Fail link u-v now. With detect, both ends notice at once and
+        invalidate the routes through each other; otherwise those routes
+        only go when they time out.
+        """
+        self.adj[u].pop(v, None)
+        self.adj[v].pop(u, None)
+        if detect:
+            for a, b in ((u, v), (v, u)):
+                for dest, nh in list(self.next_hop[a].items()):
+                    if nh == b and dest != a and self.metric[a][dest] < self.infinity:
+                        self._invalidate(a, dest)
+
+    def link_up(self, u, v, cost=1, delay=LINK_DELAY):
+        """
+        Bring link u-v up (or re-cost it); both ends send each other their
+        full table, with split horizon / poisoned reverse as in every update.
+        """
+        link = (cost, delay)
+        self.adj[u][v] = link
+        self.adj[v][u] = link
+        for a, b in ((u, v), (v, u)):
+            self._send(a, list(self.metric[a]), to=b)
+
+    def schedule(self, at, action, *args, **kwargs):
+        """Run self.<action>(*args, **kwargs) ("link_down", "link_up") at simulated time `at`."""
+        self._push(at, _LINK, action, None, (args, kwargs))
+
+    # ---- running ----
+    def run(self, until=None):
+        """Process events up to simulated time `until` (None: until the queue is empty)."""
+        queue = self._queue
+        while queue and (until is None or queue[0][0] <= until):
+            at, _, kind, a, b, payload = heapq.heappop(queue)
+            self.now = at
+            self.events += 1
+            if kind == _DELIVER:
+                self._receive(a, b, payload)
+            elif kind == _REQUEST:
+                if b in self.adj[a]:
+                    self._send(a, payload, to=b)
+            elif kind == _TRIGGER:
+                self._trigger_pending.discard(a)
+                self._flush(a)
+            elif kind == _PERIODIC:
+                self.periodic_updates += 1
+                self._send(a, list(self.metric[a]))
+                self.changed[a] = set()
+                self._push(at + self.update_interval * self.rng.uniform(0.85, 1.0), _PERIODIC, a)
+            elif kind == _TIMER:
+                self._timer(a, b)
+            else:
+                args, kwargs = payload
+                getattr(self, a)(*args, **kwargs)
+        if until is not None and until > self.now:
+            self.now = until
+
+    def run_until_stable(self, quiet=None, limit=None):
+        """
+        Run until no route has changed for `quiet` simulated seconds (default:
+        two periodic intervals plus the longest timer; triggered-only runs just
+        drain the queue). Returns the time of the last route change.
+        """
+        if not self.update_interval:
+            self.run(None if limit is None else limit)
+            return self.last_change
+        if quiet is None:
+            quiet = 2 * self.update_interval + max(self.timeout or 0, self.holddown)
+        while True:
+            target = max(self.now, self.last_change) + quiet
+            if limit is not None:
+                target = min(target, limit)
+            self.run(target)
+            if self.now - self.last_change >= quiet or (limit is not None and self.now >= limit):
+                return self.last_change
+
+    def reset_counters(self):
+        self.messages = self.entries = self.triggered_updates = self.periodic_updates = self.requests = 0
+        self.route_changes = self.events = 0
+        self.increases = {}
+
+    def counters(self):
+        depth = max(self.increases.values(), default=0)
+        return {"messages": self.messages, "entries": self.entries,
+                "triggered_updates": self.triggered_updates, "periodic_updates": self.periodic_updates,
+                "requests": self.requests,
+                "route_changes": self.route_changes, "events": self.events,
+                "count_to_infinity_depth": depth, "metric_increases": sum(self.increases.values())}
+
+    def routing_table(self, r):
+        """dest -> (metric, next_hop) for router r; unreachable routes have metric infinity."""
+        return {dest: (m, self.next_hop[r][dest]) for dest, m in sorted(self.metric[r].items(), key=str)}
+
+# -----------------------------
+# Measurements
+# -----------------------------
+def measure_failure(sim, u, v, detect=True):
+    """
+    Fail link u-v in a converged simulation and run until it settles again.
+    Returns the reconvergence time (simulated seconds from the failure to
+    the last route change), the counters accumulated meanwhile, and the
+    number of (router, destination) pairs left without a route: at metric
+    infinity or already garbage-collected, so periodic and triggered-only
+    runs count lost routes alike.
+    """
+    sim.reset_counters()
+    start = sim.now
+    sim.link_down(u, v, detect=detect)
+    last = sim.run_until_stable()
+    result = sim.counters()
+    result["reconvergence"] = max(0.0, last - start)
+    destinations = len(sim.adj)
+    result["unreachable"] = sum(destinations - sum(1 for m in table.values() if m < sim.infinity)
+                                for table in sim.metric.values())
+    return result
+
+# -----------------------------
+# Command line
+# -----------------------------
+def main(argv=None):
+    import topologies
+
+    parser = argparse.ArgumentParser(description="Event-driven RIP: convergence and link failures")
+    parser.add_argument("--topology", default="waxman", choices=topologies.KINDS)
+    parser.add_argument("--size", type=int, default=1_000)
+    parser.add_argument("--failures", type=int, default=5, help="random links failed one after another")
+    parser.add_argument("--horizon", choices=HORIZONS, default="poison")
+    parser.add_argument("--holddown", type=float, default=0.0)
+    parser.add_argument("--no-periodic", action="store_true",
+                        help="triggered updates only (no periodic updates, timeouts or garbage collection)")
+    parser.add_argument("--no-detect", action="store_true",
+                        help="failures are only noticed through route timeouts")
+    parser.add_argument("--infinity", type=int, default=RIP_INFINITY)
+    parser.add_argument("--weighted", action="store_true", help="use link costs instead of hop count")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    if args.no_periodic and args.no_detect:
+        parser.error("--no-detect needs periodic updates (route timeouts)")
+    if args.no_periodic and args.horizon == "split":
+        parser.error("--horizon split needs periodic updates (route timeouts)")
+
+    G = topologies.generate(args.topology, args.size, seed=args.seed)
+    sim = RIPEventSim(G, infinity=args.infinity, update_interval=None if args.no_periodic else UPDATE_INTERVAL,
+                      holddown=args.holddown, horizon=args.horizon, weighted=args.weighted, seed=args.seed)
+    wall = time.perf_counter()
+    converged = sim.run_until_stable()
+    counters = sim.counters()
+    print(f"{args.topology}, {G.number_of_nodes()} routers, {G.number_of_edges()} links, horizon={args.horizon}, "
+          f"holddown={args.holddown:g} s, {'triggered only' if args.no_periodic else 'periodic + triggered'}")
+    print(f"cold start: converged at t={converged:.1f} s, {counters['messages']:,} messages, "
+          f"{counters['entries']:,} route entries, {counters['events']:,} events "
+          f"({time.perf_counter() - wall:.2f} s wall)")
+
+    rng = random.Random(args.seed)
+    links = sorted(G.edges(), key=str)
+    print(f"\n{'failed link':>16} {'reconverge (s)':>15} {'messages':>9} {'entries':>9} "
+          f"{'CTI depth':>10} {'increases':>10} {'unreachable':>12} {'wall (s)':>9}")
+    for u, v in rng.sample(links, min(args.failures, len(links))):
+        wall = time.perf_counter()
+        result = measure_failure(sim, u, v, detect=not args.no_detect)
+        print(f"{f'{u}-{v}':>16} {result['reconvergence']:>15.1f} {result['messages']:>9,} {result['entries']:>9,} "
+              f"{result['count_to_infinity_depth']:>10} {result['metric_increases']:>10,} "
+              f"{result['unreachable']:>12,} {time.perf_counter() - wall:>9.2f}")
+
+if __name__ == "__main__":
+    main()
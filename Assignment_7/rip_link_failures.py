@@ -0,0 +1,109 @@
+"""
+rip_link_failures.py
+
+Rank the links of a topology by how badly RIP copes with losing them.
+
+Every link is failed in its own copy of the converged network
+(rip_sim.link_failure_scenarios, NumPy distance-vector rounds), and the
+network runs until it settles again. Per link it reports:
+
+- reconvergence rounds and the distance-vector updates spent getting there
+- transient loops: rounds with routing loops, and the most (router,
+  destination) pairs caught in one in a single round
+- count-to-infinity depth: the most times one route's cost went up
+- routes lost for good (the link was a bridge)
+
+Costs reaching --infinity count as unreachable (RIP: 16 hops). With --weighted
+the default is 16 times the most expensive link. Each scenario may run
+--max-rounds rounds, by default enough for a count to infinity climbing by
+the cheapest link cost every other round. Scenarios that run out are
+flagged "(not converged)" and ranked after all the others, since their
+figures are cut short.
+
+Usage:
+    python rip_link_failures.py [--topology waxman] [--size 300] [--weighted]
+                                [--infinity N] [--max-rounds N] [--links N] [--top 20]
+                                [--output rip_outputs/link_failures.jsonl]
+"""
+
+import argparse
+import os
+import random
+import time
+
+import rip_sim
+from sim_common import write_records
+
+RIP_INFINITY = 16
+
+def rank(results):
+    """
+    Most fragile first: deepest count to infinity, then loops, slowest
+    reconvergence, most updates. Scenarios that did not converge come last.
+    """
+    return sorted(results, key=lambda r: (r["converged"], r["count_to_infinity"], r["max_looped"],
+                                          r["loop_rounds"], r["reconvergence_rounds"], r["updates"]),
+                  reverse=True)
+
+def default_max_rounds(G, weighted, infinity):
+    """Rounds for a count to infinity that climbs by the cheapest link cost every other round."""
+    smallest = min((data.get("cost", 1) for _, _, data in G.edges(data=True)), default=1) if weighted else 1
+    return max(rip_sim.MAX_ROUNDS, 2 * -(-infinity // max(smallest, 1)))
+
+def main(argv=None):
+    import topologies
+
+    parser = argparse.ArgumentParser(description="Rank links by RIP reconvergence after their failure")
+    parser.add_argument("--topology", default="waxman", choices=topologies.KINDS + ("sample",),
+                        help="generated topology, or rip_sim's sample network")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--weighted", action="store_true", help="use link costs instead of hop count")
+    parser.add_argument("--infinity", type=int, help="cost that counts as unreachable")
+    parser.add_argument("--max-rounds", type=int,
+                        help="rounds allowed per scenario (default: scaled with the infinity)")
+    parser.add_argument("--links", type=int, help="fail only this many random links (default: all)")
+    parser.add_argument("--top", type=int, default=20, help="rows to print")
+    parser.add_argument("--output", help="write every scenario (.jsonl, or .parquet with pyarrow)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    if args.topology == "sample":
+        G = rip_sim.create_sample_topology(weighted=args.weighted)
+    else:
+        G = topologies.generate(args.topology, args.size, seed=args.seed)
+    infinity = args.infinity
+    if infinity is None:
+        largest = max((data.get("cost", 1) for _, _, data in G.edges(data=True)), default=1)
+        infinity = RIP_INFINITY * (largest if args.weighted else 1)
+    max_rounds = args.max_rounds or default_max_rounds(G, args.weighted, infinity)
+    links = sorted(G.edges(), key=str)
+    if args.links is not None:
+        links = random.Random(args.seed).sample(links, min(args.links, len(links)))
+
+    start = time.perf_counter()
+    results = rank(rip_sim.link_failure_scenarios(G, weighted=args.weighted, infinity=infinity, links=links,
+                                                  max_rounds=max_rounds))
+    wall = time.perf_counter() - start
+    unconverged = sum(not r["converged"] for r in results)
+    print(f"{args.topology}, {G.number_of_nodes()} routers, {G.number_of_edges()} links, infinity {infinity}: "
+          f"{len(results)} failures in {wall:.1f} s ({len(results) / wall * 60:,.0f} per minute)")
+    if unconverged:
+        print(f"{unconverged} scenarios did not converge within {max_rounds} rounds (ranked last; "
+              f"raise --max-rounds)")
+    print(f"\n{'link':>14} {'reconverge':>11} {'updates':>8} {'loop rounds':>12} {'max looped':>11} "
+          f"{'CTI depth':>10} {'lost routes':>12}")
+    for r in results[:args.top]:
+        u, v = r["link"]
+        print(f"{f'{u}-{v}':>14} {r['reconvergence_rounds']:>11} {r['updates']:>8,} {r['loop_rounds']:>12} "
+              f"{r['max_looped']:>11,} {r['count_to_infinity']:>10} {r['unreachable']:>12,}"
+              + ("" if r["converged"] else "  (not converged)"))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        records = ({"u": r["link"][0], "v": r["link"][1], **{k: val for k, val in r.items() if k not in ("link", "cost")}}
+                   for r in results)
+        count = write_records(args.output, records)
+        print(f"\n{count} scenarios -> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,23 @@ rip_sim.py
 
 RIP Simulation (Distance-Vector) using Bellman–Ford style updates.
 
+- simulate_rip_vectorized runs the same synchronous rounds on NumPy matrices
+  (routers x destinations) and produces identical tables, for large networks.
+- Link events (down / up / cost change at a given round) can be scheduled in
+  both; the matrix version also measures each event's reconvergence, updates,
+  transient loops and count-to-infinity depth (see rip_link_failures.py).
+- Run with --headless (or ROUTING_SIM_HEADLESS=1) for no pacing, plots or per-router tables:
+  all routing tables go to one JSON Lines file (--output, .parquet with pyarrow).
+
 """
 
 import os
 import time
-from copy import deepcopy
 import networkx as nx
-import matplotlib.pyplot as plt
-from tabulate import tabulate
+import numpy as np
+
+from sim_common import (VersionedTable, pace, parse_cli, pyplot, routing_table_records, tabulate,
+                        write_records)
 
 # -----------------------------
 # Configuration / parameters
@@ -84,7 +93,7 @@ class Router:
     def __init__(self, name, neighbors, is_weighted=False, graph=None):
         self.name = name
         self.neighbors = neighbors  # list of neighbor names
-        self.dv = {}  # distance vector: dest -> (cost, next_hop)
+        self.dv = VersionedTable()  # distance vector: dest -> (cost, next_hop)
         self.is_weighted = is_weighted
         self.graph = graph  # if weighted, we may need this to fetch link cost
 
@@ -109,9 +118,11 @@ class Router:
 # -----------------------------
 # Bellman-style update logic
 # -----------------------------
-def process_update(router_obj, neighbor_name, neighbor_vector, is_weighted=False, graph=None):
+def process_update(router_obj, neighbor_name, neighbor_vector, is_weighted=False, graph=None, infinity=INF):
     """
     Apply neighbor's distance vector to router_obj using Bellman-Ford relaxation.
+    As in RIP, a route's current next hop is always believed, even when its
+    cost gets worse; costs >= infinity mean unreachable (RIP uses 16).
     Returns True if the router's DV changed, otherwise False.
     """
     updated = False
@@ -129,17 +140,71 @@ def process_update(router_obj, neighbor_name, neighbor_vector, is_weighted=False
             new_cost = INF
         else:
             new_cost = cost_to_nb + nbr_cost
+        if new_cost >= infinity:
+            new_cost = INF
         cur_cost, cur_nh = router_obj.dv[dest]
-        # If new cost is better, update
-        if new_cost < cur_cost:
+        # If new cost is better, or the next hop's cost changed, update
+        if new_cost < cur_cost or (cur_nh == neighbor_name and new_cost != cur_cost):
             router_obj.dv[dest] = (new_cost, neighbor_name)
             updated = True
     return updated
 
+def apply_link_event(routers, G, event):
+    """
+    Apply a link event to the routers and graph G (modified in place):
+    (round, "down", u, v), (round, "up", u, v, cost) or (round, "cost", u, v, cost).
+    A failed link is noticed at once: both ends mark the routes through it unreachable.
+    "up" on a link that is already up only changes its cost; "down" or
+    "cost" on a link that does not exist raises ValueError. Without link
+    weights every link costs 1: "up" may omit the cost and "cost" events
+    are rejected, as in DistanceVectorMatrix.apply.
+    """
+    _, kind, u, v, *rest = event
+    if kind not in ("down", "up", "cost"):
+        raise ValueError(f"Unknown link event: {kind}")
+    weighted = routers[u].is_weighted
+    if kind == "cost" and not weighted:
+        raise ValueError("cost events need weighted=True")
+    if kind != "down" and weighted and not rest:
+        raise ValueError(f"Link event {kind!r} on {u}-{v} needs a cost")
+    if kind != "up" and not G.has_edge(u, v):
+        raise ValueError(f"Link event {kind!r} on missing link {u}-{v}")
+    cost = rest[0] if weighted else 1
+    if kind == "down":
+        G.remove_edge(u, v)
+        for a, b in ((u, v), (v, u)):
+            routers[a].neighbors.remove(b)
+            for dest, (cost, nh) in list(routers[a].dv.items()):
+                if nh == b and dest != a:
+                    routers[a].dv[dest] = (INF, None)
+    elif kind == "up" and not G.has_edge(u, v):
+        G.add_edge(u, v, cost=cost)
+        routers[u].neighbors.append(v)
+        routers[v].neighbors.append(u)
+    else:
+        G[u][v]["cost"] = cost
+
 # -----------------------------
 # Main simulation: synchronous rounds
 # -----------------------------
-def simulate_rip(G, weighted=False, max_rounds=MAX_ROUNDS, pause=PAUSE_BETWEEN_ROUNDS, verbose=True):
+def simulate_rip(G, weighted=False, max_rounds=MAX_ROUNDS, pause=PAUSE_BETWEEN_ROUNDS, verbose=True, stats=None,
+                 events=None, infinity=INF):
+    """
+    Run synchronous rounds until no distance vector changes.
+    Returns (routers, rounds, updates_per_round). stats: optional dict
+    filled with "messages" (distance vectors sent), "entries" (routes they
+    carried), "rounds" and "wall_seconds".
+    events: link events (see apply_link_event) applied at the start of their
+    round, on a copy of G; quiet rounds before the next event are skipped
+    (0 updates). Cost events need weighted=True.
+    """
+    start = time.perf_counter()
+    messages = entries = 0
+    pending = sorted(events or [], key=lambda event: event[0])
+    if not weighted and any(event[1] == "cost" for event in pending):
+        raise ValueError("cost events need weighted=True")
+    if pending:
+        G = G.copy()
     all_nodes = list(G.nodes())
     # create router objects
     routers = {n: Router(n, list(G.neighbors(n)), is_weighted=weighted, graph=G if weighted else None) for n in all_nodes}
@@ -148,17 +213,24 @@ def simulate_rip(G, weighted=False, max_rounds=MAX_ROUNDS, pause=PAUSE_BETWEEN_R
         r.initialize(all_nodes)
 
     updates_per_round = []
-    for round_no in range(1, max_rounds+1):
+    round_no = 0
+    while round_no < max_rounds:
+        round_no += 1
+        while pending and pending[0][0] <= round_no:
+            apply_link_event(routers, G, pending.pop(0))
         if verbose:
             print(f"\n========== ROUND {round_no} ==========")
-        # snapshots to simulate atomic send
-        snapshots = {name: deepcopy(r.dv) for name, r in routers.items()}
+        # snapshots to simulate atomic send (O(1) each, see sim_common.VersionedTable)
+        snapshots = {name: r.dv.snapshot() for name, r in routers.items()}
         any_update = False
         updates_this_round = 0
         # each router sends its snapshot to its neighbors
         for name, r in routers.items():
+            messages += len(r.neighbors)
+            entries += len(r.neighbors) * len(snapshots[name])
             for nb in r.neighbors:
-                changed = process_update(routers[nb], name, snapshots[name], is_weighted=weighted, graph=G if weighted else None)
+                changed = process_update(routers[nb], name, snapshots[name], is_weighted=weighted,
+                                         graph=G if weighted else None, infinity=infinity)
                 if changed:
                     any_update = True
                     updates_this_round += 1
@@ -169,19 +241,384 @@ def simulate_rip(G, weighted=False, max_rounds=MAX_ROUNDS, pause=PAUSE_BETWEEN_R
             for r in routers.values():
                 print_routing_table(r.name, r.dv)
 
-        if not any_update:
+        if not any_update and pending:
+            skip = min(pending[0][0], max_rounds + 1) - round_no - 1
+            updates_per_round.extend([0] * skip)
+            round_no += skip
+        elif not any_update:
             if verbose:
                 print(f"\nConverged after {round_no} rounds.")
+            if stats is not None:
+                stats.update(messages=messages, entries=entries, rounds=round_no,
+                             wall_seconds=time.perf_counter() - start)
             return routers, round_no, updates_per_round
-        time.sleep(pause)
+        pace(pause)
     if verbose:
         print("\nMax rounds reached; may not have fully converged.")
+    if stats is not None:
+        stats.update(messages=messages, entries=entries, rounds=max_rounds,
+                     wall_seconds=time.perf_counter() - start)
     return routers, max_rounds, updates_per_round
 
+# -----------------------------
+# Vectorized rounds: distance vectors as matrices
+# -----------------------------
+_INT32_COST_LIMIT = np.iinfo(np.int32).max - INF
+
+class DistanceVectorMatrix:
+    """
+    All routers' distance vectors as dense matrices over `nodes` (in
+    G.nodes() order), advanced one synchronous round at a time exactly as
+    simulate_rip does: dist[i, j] is router i's cost to destination j
+    (INF = unreachable), next_hop[i, j] the index of its next hop (-1 if none).
+
+    Internally rows are kept in decreasing-degree order (row p is router
+    order[p]), so the routers with a k-th neighbor are rows 0..m-1 and
+    every neighbor slot works on views. Only destinations whose routes
+    changed in the previous round (or were touched by a link event) are
+    recomputed: a column that did not change cannot change the next round.
+    """
+    def __init__(self, G, weighted=False, infinity=INF):
+        self.nodes = list(G.nodes())
+        self.index = {n: i for i, n in enumerate(self.nodes)}
+        self.weighted = weighted
+        self.infinity = infinity
+        self.links = {}             # (i, j) -> cost, both directions of every up link
+        for u, v, data in G.edges(data=True):
+            if u != v:
+                cost = int(data.get("cost", 1)) if weighted else 1
+                self.links[self.index[u], self.index[v]] = cost
+                self.links[self.index[v], self.index[u]] = cost
+        n = len(self.nodes)
+        # int32 costs halve the memory traffic while INF + any link cost fits
+        self._dtype = np.int32 if max(self.links.values(), default=0) <= _INT32_COST_LIMIT else np.int64
+        self._dist = None
+        self._build_slots()
+        self._dist = np.full((n, n), INF, dtype=self._dtype)
+        self._next_hop = np.full((n, n), -1, dtype=np.int32)
+        self._dist[self._row_of, np.arange(n)] = 0
+        self._next_hop[self._row_of, np.arange(n)] = np.arange(n, dtype=np.int32)
+        for m, _, senders, costs in self._slots:
+            self._dist[np.arange(m)[:, None], senders] = costs
+            self._next_hop[np.arange(m)[:, None], senders] = senders
+        self._active = np.arange(n)              # destinations to recompute
+        self._touched = np.ones(n, dtype=bool)   # rows that changed last round
+        self.round_no = 0
+        self.increases = None       # per-route cost increases, while an event is tracked
+
+    def _build_slots(self):
+        """(Re)build the neighbor slots after a topology change, re-ordering rows by degree."""
+        n = len(self.nodes)
+        count = len(self.links)
+        src = np.fromiter((i for i, _ in self.links), dtype=np.int64, count=count)
+        dst = np.fromiter((j for _, j in self.links), dtype=np.int64, count=count)
+        cost = np.fromiter(self.links.values(), dtype=np.int64, count=count)
+        by_router = np.lexsort((dst, src))      # senders in node order, as simulate_rip delivers them
+        src, dst, cost = src[by_router], dst[by_router], cost[by_router]
+        degree = np.bincount(src, minlength=n)
+        position = np.arange(count) - (np.cumsum(degree) - degree)[src]      # k: slot of each link
+        order = np.argsort(-degree, kind="stable")
+        row_of = np.empty(n, dtype=np.int64)
+        row_of[order] = np.arange(n)
+        if self._dist is not None:
+            moved = row_of[self.order]          # old row p -> new row
+            for name in ("_dist", "_next_hop", "_touched") + (("increases",) if self.increases is not None else ()):
+                old = getattr(self, name)
+                new = np.empty_like(old)
+                new[moved] = old
+                setattr(self, name, new)
+        self.order, self._row_of = order, row_of
+        self._slots = []
+        for k in range(int(degree.max()) if count else 0):
+            in_slot = np.flatnonzero(position == k)
+            in_slot = in_slot[np.argsort(row_of[src[in_slot]])]     # receivers are rows 0..m-1
+            senders = dst[in_slot].astype(np.int32)
+            self._slots.append((len(in_slot), row_of[senders], senders[:, None],
+                                cost[in_slot][:, None].astype(self._dtype)))
+
+    def copy(self):
+        """Independent copy of the current state (e.g. one per failure scenario)."""
+        other = object.__new__(DistanceVectorMatrix)
+        other.__dict__.update(self.__dict__)
+        other.links = dict(self.links)
+        other._dist = self._dist.copy()
+        other._next_hop = self._next_hop.copy()
+        other._touched = self._touched.copy()
+        other.increases = None if self.increases is None else self.increases.copy()
+        return other
+
+    @property
+    def dist(self):
+        return self._dist[self._row_of]
+
+    @property
+    def next_hop(self):
+        return self._next_hop[self._row_of]
+
+    def dv(self, name):
+        """Router `name`'s distance vector as simulate_rip has it: dest -> (cost, next_hop)."""
+        row = self._row_of[self.index[name]]
+        nodes = self.nodes
+        return {dest: (int(cost), nodes[nh] if nh >= 0 else None)
+                for dest, cost, nh in zip(nodes, self._dist[row].tolist(), self._next_hop[row].tolist())}
+
+    def tables(self):
+        return {name: self.dv(name) for name in self.nodes}
+
+    # ---- link events ----
+    def _affected(self, i, j, cost):
+        """Destinations whose route at i can change now that the link to j costs `cost` (None: down)."""
+        ri, rj = self._row_of[i], self._row_of[j]
+        affected = self._next_hop[ri] == j
+        if cost is not None:
+            offer = self._dist[rj] + cost
+            offer[offer >= self.infinity] = INF
+            affected |= offer < self._dist[ri]
+        return affected
+
+    def apply(self, event):
+        """
+        Apply a link event as apply_link_event does for simulate_rip ("up"
+        on a live link re-costs it; "down" / "cost" on a missing one raise
+        ValueError).
+        """
+        _, kind, u, v, *rest = event
+        if kind not in ("down", "up", "cost"):
+            raise ValueError(f"Unknown link event: {kind}")
+        if kind == "cost" and not self.weighted:
+            raise ValueError("cost events need weighted=True")
+        if kind != "down" and self.weighted and not rest:
+            raise ValueError(f"Link event {kind!r} on {u}-{v} needs a cost")
+        i, j = self.index[u], self.index[v]
+        if kind != "up" and (i, j) not in self.links:
+            raise ValueError(f"Link event {kind!r} on missing link {u}-{v}")
+        cost = None if kind == "down" else (int(rest[0]) if self.weighted else 1)
+        if cost is not None and cost > _INT32_COST_LIMIT and self._dtype != np.int64:
+            self._dtype = np.int64
+            self._dist = self._dist.astype(np.int64)
+        affected = self._affected(i, j, cost) | self._affected(j, i, cost)
+        if kind == "down":
+            del self.links[i, j], self.links[j, i]
+            for a, b in ((i, j), (j, i)):
+                row = self._row_of[a]
+                lost = self._next_hop[row] == b
+                lost[a] = False
+                self._dist[row, lost] = INF
+                self._next_hop[row, lost] = -1
+        else:
+            self.links[i, j] = self.links[j, i] = cost
+        self._build_slots()
+        self._active = np.union1d(self._active, np.flatnonzero(affected))
+        self._touched[self._row_of[[i, j]]] = True
+
+    # ---- rounds ----
+    def step(self):
+        """
+        One synchronous round. Returns (updates, changed) where updates
+        counts (sender, receiver) pairs that changed the receiver's vector,
+        as in simulate_rip, and changed holds the destinations that changed.
+        Only routers that changed last round, or hear from one that did, are
+        recomputed: anyone else would repeat last round's no-op.
+        """
+        n = len(self.nodes)
+        cols = self._active
+        whole = len(cols) == n
+        if whole:
+            dist, next_hop = self._dist, self._next_hop
+        else:
+            dist, next_hop = self._dist[:, cols], self._next_hop[:, cols]
+        increases = None
+        if self.increases is not None:
+            increases = self.increases if whole else self.increases[:, cols]
+        snapshot = dist.copy()
+        touched = self._touched
+        dirty = touched.copy()
+        for m, sender_rows, _, _ in self._slots:
+            dirty[:m] |= touched[sender_rows]
+        touched = np.zeros(n, dtype=bool)
+        changed = np.zeros(len(cols), dtype=bool)
+        updates = 0
+        capped = self.infinity < INF
+        for m, sender_rows, senders, costs in self._slots:
+            rows = np.flatnonzero(dirty[:m])
+            if not len(rows):
+                continue
+            if 2 * len(rows) > m:
+                rows = None         # most of the slot: work on views
+                offer = snapshot[sender_rows]
+                offer += costs
+                current, hop, slot_senders = dist[:m], next_hop[:m], senders
+            else:
+                offer = snapshot[sender_rows[rows]]
+                offer += costs[rows]
+                current, hop, slot_senders = dist[rows], next_hop[rows], senders[rows]
+            if capped:
+                np.putmask(offer, offer >= self.infinity, INF)
+            else:
+                np.minimum(offer, INF, out=offer)
+            # better offers, plus any change from the current next hop
+            accept = (offer < current) | ((hop == slot_senders) & (offer != current))
+            receivers = accept.any(axis=1)
+            count = int(receivers.sum())
+            if not count:
+                continue
+            updates += count
+            changed |= accept.any(axis=0)
+            if rows is None:
+                touched[:m] |= receivers
+                if increases is not None:
+                    increases[:m] += accept & (offer > current)
+                np.copyto(current, offer, where=accept)
+                np.copyto(hop, slot_senders, where=accept)
+            else:
+                touched[rows[receivers]] = True
+                if increases is not None:
+                    increases[rows] += accept & (offer > current)
+                dist[rows] = np.where(accept, offer, current)
+                next_hop[rows] = np.where(accept, slot_senders, hop)
+        if not whole:
+            self._dist[:, cols] = dist
+            self._next_hop[:, cols] = next_hop
+            if increases is not None:
+                self.increases[:, cols] = increases
+        self._active = cols[changed]
+        self._touched = touched
+        self.round_no += 1
+        return updates, self._active
+
+    def looped(self, cols):
+        """
+        (router, destination) pairs, for destinations `cols`, whose next
+        hops go round in a circle instead of reaching the destination (or
+        a router without a route). Costs strictly fall along a loop-free
+        path, so only destinations with a hop whose cost does not fall are
+        followed, by pointer doubling (log2(n) steps).
+        """
+        n = len(self.nodes)
+        if not n or not len(cols):
+            return 0
+        dist = self._dist[:, cols]
+        hop = self._next_hop[:, cols]
+        routed = (hop >= 0) & (dist < INF)
+        succ_rows = self._row_of[np.maximum(hop, 0)]
+        next_dist = np.take_along_axis(dist, succ_rows, axis=0)
+        suspect = (routed & (succ_rows != np.arange(n)[:, None]) & (next_dist >= dist)).any(axis=0)
+        if not suspect.any():
+            return 0
+        width = int(suspect.sum())
+        here = np.arange(n, dtype=np.int64)[:, None]
+        succ = np.where(routed[:, suspect], succ_rows[:, suspect], here).ravel()
+        # flat index of (next hop's row, same column) for every entry
+        succ = succ * width + np.tile(np.arange(width), n)
+        end = succ
+        for _ in range(max(1, (n - 1).bit_length())):
+            end = end[end]
+        # after >= n hops every walk sits on a fixed point or on a cycle
+        return int((succ[end] != end).sum())
+
+    def run(self, max_rounds=MAX_ROUNDS, events=None, stats=None):
+        """
+        Run rounds (continuing from round_no) until nothing changes and no
+        event is pending, or round max_rounds. events are applied at the
+        start of their round, quiet rounds before the next one are skipped.
+        Returns (rounds, updates_per_round); stats as in simulate_rip, plus
+        "events": one record per event with
+          updates                 (sender, receiver) pairs changed after it
+          reconvergence_rounds    rounds from the event to the last change
+          loop_rounds, max_looped rounds with routing loops, most (router,
+                                  destination) pairs looping in one round
+          count_to_infinity       most cost increases of any one route
+        Events applied in the same round share one record (the last).
+        """
+        start = time.perf_counter()
+        pending = sorted(events or [], key=lambda event: event[0])
+        links = len(self.links)
+        messages = entries = 0
+        records = []
+        record = None
+        updates_per_round = []
+        converged = False
+        while self.round_no < max_rounds:
+            while pending and pending[0][0] <= self.round_no + 1:
+                event = pending.pop(0)
+                if record is not None:
+                    record["count_to_infinity"] = int(self.increases.max())
+                self.increases = np.zeros_like(self._dist, dtype=np.int32)
+                self.apply(event)
+                links = len(self.links)
+                record = {"round": self.round_no + 1, "event": event[1], "link": (event[2], event[3]),
+                          "cost": event[4] if len(event) > 4 else None, "updates": 0,
+                          "reconvergence_rounds": 0, "loop_rounds": 0, "max_looped": 0, "count_to_infinity": 0}
+                records.append(record)
+            updates, changed = self.step()
+            messages += links
+            entries += links * len(self.nodes)
+            updates_per_round.append(updates)
+            if record is not None and updates:
+                record["updates"] += updates
+                record["reconvergence_rounds"] = self.round_no - record["round"] + 1
+                looped = self.looped(changed)
+                if looped:
+                    record["loop_rounds"] += 1
+                    record["max_looped"] = max(record["max_looped"], looped)
+            if not updates and pending:
+                skip = min(pending[0][0], max_rounds + 1) - self.round_no - 1
+                updates_per_round.extend([0] * skip)
+                self.round_no += skip
+            elif not updates:
+                converged = True
+                break
+        if record is not None:
+            record["count_to_infinity"] = int(self.increases.max())
+        self.increases = None
+        if stats is not None:
+            stats.update(messages=messages, entries=entries, rounds=self.round_no, converged=converged,
+                         events=records, wall_seconds=time.perf_counter() - start)
+        return self.round_no, updates_per_round
+
+def simulate_rip_vectorized(G, weighted=False, max_rounds=MAX_ROUNDS, stats=None, events=None, infinity=INF):
+    """
+    simulate_rip without Router objects: one round is a min-plus product of
+    the round-start distance matrix with the link costs, done one
+    "neighbor slot" at a time (slot k = every router's k-th neighbor in
+    node order), so each router sees its neighbors' vectors in the order
+    simulate_rip delivers them. Costs, next hops (ties keep the first
+    strictly better offer) and per-round update counts come out identical,
+    with or without link events. Returns (DistanceVectorMatrix, rounds,
+    updates_per_round); stats as in DistanceVectorMatrix.run.
+    """
+    start = time.perf_counter()
+    matrix = DistanceVectorMatrix(G, weighted=weighted, infinity=infinity)
+    rounds, updates_per_round = matrix.run(max_rounds, events=events, stats=stats)
+    if stats is not None:
+        stats["wall_seconds"] = time.perf_counter() - start
+    return matrix, rounds, updates_per_round
+
+def link_failure_scenarios(G, weighted=False, infinity=INF, links=None, max_rounds=MAX_ROUNDS):
+    """
+    Converge once, then fail each link in `links` (default: all) in its own
+    copy of the converged state and run until it settles again. Returns one
+    DistanceVectorMatrix.run event record per link, plus "converged" (False
+    if max_rounds ran out) and "unreachable" (routes lost for good).
+    """
+    base = DistanceVectorMatrix(G, weighted=weighted, infinity=infinity)
+    base.run(max_rounds)
+    baseline = int((base._dist >= INF).sum())
+    results = []
+    for u, v in (links if links is not None else G.edges()):
+        matrix = base.copy()
+        stats = {}
+        matrix.run(base.round_no + max_rounds, events=[(base.round_no + 1, "down", u, v)], stats=stats)
+        record = stats["events"][0]
+        record.update(converged=stats["converged"], unreachable=int((matrix._dist >= INF).sum()) - baseline)
+        results.append(record)
+    return results
+
 # -----------------------------
 # Visualization helpers
 # -----------------------------
 def draw_topology(G, filename=None, weighted=False):
+    plt = pyplot()
     pos = nx.spring_layout(G, seed=42)  # deterministic layout
     plt.figure(figsize=(7,5))
     nx.draw_networkx_nodes(G, pos, node_size=800)
@@ -196,6 +633,7 @@ def draw_topology(G, filename=None, weighted=False):
     plt.close()
 
 def plot_convergence(updates_per_round, filename=None):
+    plt = pyplot()
     rounds = list(range(1, len(updates_per_round)+1))
     plt.figure(figsize=(8,4))
     plt.plot(rounds, updates_per_round, marker='o')
@@ -219,7 +657,9 @@ def save_and_print_final_tables(routers, rounds):
 # -----------------------------
 # Example usage
 # -----------------------------
-def main():
+def main(argv=None):
+    args = parse_cli("RIP distance-vector simulation", os.path.join(OUTPUT_DIR, "rip_routing_tables.jsonl"), argv)
+    start = time.perf_counter()
     ensure_dirs()
     # Choose whether to use weighted links
     weighted = False  # set True if you want to test weighted links
@@ -228,12 +668,20 @@ def main():
     G = create_sample_topology(weighted=weighted)
 
     # Save topology image
-    topo_file = os.path.join(SCREENSHOT_DIR, "topology.png")
-    draw_topology(G, filename=topo_file, weighted=weighted)
-    print(f"Topology image saved to: {topo_file}")
+    if not args.headless:
+        topo_file = os.path.join(SCREENSHOT_DIR, "topology.png")
+        draw_topology(G, filename=topo_file, weighted=weighted)
+        print(f"Topology image saved to: {topo_file}")
 
     # Run simulation
-    routers, rounds, updates = simulate_rip(G, weighted, max_rounds=MAX_ROUNDS, pause=PAUSE_BETWEEN_ROUNDS, verbose=True)
+    routers, rounds, updates = simulate_rip(G, weighted, max_rounds=MAX_ROUNDS, pause=PAUSE_BETWEEN_ROUNDS,
+                                            verbose=not args.headless)
+    if args.headless:
+        tables = {r.name: r.dv for r in routers.values()}
+        count = write_records(args.output, routing_table_records("rip", tables, inf=INF))
+        print(f"RIP: {len(routers)} routers, {rounds} rounds, {count} routes -> {args.output} "
+              f"({time.perf_counter() - start:.3f} s)")
+        return
 
     # Save final tables and print to console
     save_and_print_final_tables(routers, rounds)
@@ -0,0 +1,174 @@
+"""
+scale_harness.py
+
+Headless scale runs of the four Assignment_7 protocol simulators (OSPF, IS-IS,
+RIP, BGP) on generated topologies (see topologies.py).
+
+Runs are headless (sim_common.set_headless: no pacing, no plotting).
+Every (simulator, size) pair runs in its own child process, so that peak RSS is
+that run's alone and a run that blows its time or memory budget can be stopped
+without losing the others. Each run records convergence rounds, messages sent,
+wall time (module import and topology generation are timed separately) and
+peak RSS.
+
+Messages are what each simulator sends: OSPF LSA transmissions (delta flooding,
+acknowledgements not counted), IS-IS LSPs, RIP distance vectors, BGP UPDATEs
+(one prefix each). OSPF and IS-IS times include the routing table computation.
+
+Usage:
+    python scale_harness.py [--sims ospf isis rip bgp] [--sizes 100 1000 10000]
+                            [--topology waxman] [--as-topology ba] [--caida FILE]
+                            [--timeout 300] [--memory-mb 3072] [--json results.jsonl]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from sim_common import set_headless
+
+SIMS = ("ospf", "isis", "rip", "bgp")
+
+# -----------------------------
+# One run (child process)
+# -----------------------------
+def build_topology(kind, n, seed, caida=None):
+    import topologies
+
+    if kind == "caida":
+        if caida is None:
+            raise ValueError("topology 'caida' needs --caida FILE")
+        return topologies.caida_as_graph(caida, max_nodes=n, seed=seed)
+    return topologies.generate(kind, n, seed=seed)
+
+def run_ospf(G):
+    import ospf_sim
+
+    routers = {node: ospf_sim.OSPFRouter(node, list(G.neighbors(node))) for node in G.nodes()}
+    initial_lsas = {name: r.originate_lsas(G) for name, r in routers.items()}
+    stats = {}
+    ospf_sim.flood_lsas(routers, initial_lsas, stats=stats)
+    ospf_sim.compute_routing_tables(routers)
+    links = G.number_of_edges()
+    return {"rounds": stats["rounds"], "messages": stats["transmissions"],
+            "converged": stats["converged"] and all(len(r.lsdb) == links for r in routers.values())}
+
+def run_isis(G):
+    import isis_sim
+
+    routers = {node: isis_sim.ISISRouter(node, list(G.neighbors(node))) for node in G.nodes()}
+    initial_lsps = {name: r.originate_lsps(G) for name, r in routers.items()}
+    stats = {}
+    isis_sim.flood_lsps(routers, initial_lsps, stats=stats)
+    isis_sim.compute_routing_tables(routers)
+    links = G.number_of_edges()
+    return {"rounds": stats["rounds"], "messages": stats["transmissions"],
+            "converged": all(len(r.lsdb) == links for r in routers.values())}
+
+def run_rip(G):
+    import rip_sim
+
+    stats = {}
+    _, rounds, updates = rip_sim.simulate_rip(G, weighted=True, verbose=False, stats=stats)
+    return {"rounds": rounds, "messages": stats["messages"], "converged": not updates[-1]}
+
+def run_bgp(G):
+    import bgp_sim
+
+    as_nodes = bgp_sim.build_as_nodes({asn: [f"P{asn}"] for asn in G.nodes()}, list(G.edges()))
+    stats = {}
+    rounds = bgp_sim.bgp_propagate(as_nodes, verbose=False, stats=stats)
+    return {"rounds": rounds, "messages": stats["messages"], "converged": rounds < bgp_sim.MAX_ROUNDS}
+
+RUNNERS = {"ospf": run_ospf, "isis": run_isis, "rip": run_rip, "bgp": run_bgp}
+
+def run_child(sim, kind, n, seed, caida, memory_mb):
+    """Run one simulation and print its result as a JSON line."""
+    if memory_mb:
+        limit = memory_mb * 2**20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    set_headless()
+    result = {"sim": sim, "topology": kind, "size": n}
+    try:
+        # module import (networkx, matplotlib, ...) is timed separately
+        start = time.perf_counter()
+        __import__(f"{sim}_sim")
+        result["import_seconds"] = time.perf_counter() - start
+        start = time.perf_counter()
+        G = build_topology(kind, n, seed, caida)
+        result.update(nodes=G.number_of_nodes(), links=G.number_of_edges(),
+                      setup_seconds=time.perf_counter() - start)
+        start = time.perf_counter()
+        result.update(RUNNERS[sim](G))
+        result.update(wall_seconds=time.perf_counter() - start, status="ok")
+    except MemoryError:
+        result["status"] = f"over {memory_mb} MB"
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(result), flush=True)
+
+# -----------------------------
+# Harness (parent process)
+# -----------------------------
+def run_one(sim, kind, n, seed, caida, timeout, memory_mb):
+    """Run one (sim, topology, size) in a child process and return its result dict."""
+    cmd = [sys.executable, __file__, "--child", sim, kind, str(n), str(seed),
+           "--memory-mb", str(memory_mb)]
+    if caida:
+        cmd += ["--caida", caida]
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"sim": sim, "topology": kind, "size": n, "status": f"timeout ({timeout} s)",
+                "wall_seconds": time.perf_counter() - start}
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        error = (proc.stderr.strip().splitlines() or [f"exit code {proc.returncode}"])[-1]
+        return {"sim": sim, "topology": kind, "size": n, "status": f"error: {error}"}
+    return json.loads(lines[-1])
+
+def format_row(result):
+    def num(key, fmt):
+        value = result.get(key)
+        return format(value, fmt) if value is not None else "-"
+    converged = {True: "yes", False: "NO"}.get(result.get("converged"), "-")
+    return (f"{result['sim']:>5} {result['topology']:>14} {num('nodes', ','):>7} {num('links', ','):>8} "
+            f"{num('rounds', 'd'):>7} {num('messages', ','):>14} {num('wall_seconds', '.1f'):>9} "
+            f"{num('peak_rss_mb', '.0f'):>9} {converged:>10}  {result['status']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless scale runs of the Assignment_7 simulators")
+    parser.add_argument("--sims", nargs="+", choices=SIMS, default=list(SIMS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--topology", default="waxman",
+                        help="topology for OSPF / IS-IS / RIP: waxman, ba, fat-tree, ring-of-rings, caida")
+    parser.add_argument("--as-topology", default="ba", help="topology for BGP (same choices)")
+    parser.add_argument("--caida", help="CAIDA AS-relationship file for the 'caida' topology")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=300, help="seconds allowed per run")
+    parser.add_argument("--memory-mb", type=int, default=3072, help="address-space limit per run")
+    parser.add_argument("--json", help="append one JSON line per run to this file")
+    parser.add_argument("--child", nargs=4, metavar=("SIM", "TOPOLOGY", "SIZE", "SEED"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sim, kind, n, seed = args.child
+        run_child(sim, kind, int(n), int(seed), args.caida, args.memory_mb)
+        return
+
+    print(f"{'sim':>5} {'topology':>14} {'nodes':>7} {'links':>8} {'rounds':>7} {'messages':>14} "
+          f"{'wall (s)':>9} {'peak RSS':>9} {'converged':>10}  status")
+    for n in args.sizes:
+        for sim in args.sims:
+            kind = args.as_topology if sim == "bgp" else args.topology
+            result = run_one(sim, kind, n, args.seed, args.caida, args.timeout, args.memory_mb)
+            print(format_row(result), flush=True)
+            if args.json:
+                with open(args.json, "a") as f:
+                    f.write(json.dumps(result) + "\n")
+
+if __name__ == "__main__":
+    main()
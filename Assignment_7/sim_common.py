@@ -0,0 +1,231 @@
+"""
+sim_common.py
+
+Shared building blocks for the Assignment_7 routing simulators.
+
+- VersionedTable: the routing state of one router (OSPF/IS-IS LSDB, RIP
+  distance vector, BGP local RIB). It is a plain dict for reading, but
+  snapshot() gives a read-only view of the table as it was at that moment
+  for the cost of the entries written afterwards, instead of a deepcopy of
+  the whole table every round.
+
+Values stored in a VersionedTable must be replaced, never mutated in place
+(store a new dict / tuple / list): the snapshot keeps references to the
+old values, not copies.
+
+- Headless mode (set_headless(), or ROUTING_SIM_HEADLESS=1 in the
+  environment): pace() stops sleeping between rounds. matplotlib and
+  tabulate are only imported when something is actually drawn or
+  tabulated (pyplot(), tabulate()), and write_records() writes a whole
+  run's routing tables as one JSON Lines (or Parquet) file.
+"""
+
+import argparse
+import json
+import os
+import time
+from collections.abc import Mapping
+
+_ABSENT = object()      # undo-log marker: key did not exist at snapshot time
+_UNCHANGED = object()
+
+
+# -----------------------------
+# Copy-on-write table with round snapshots
+# -----------------------------
+class VersionedTable(dict):
+    """
+    dict that records, per key, the value it had at the last snapshot()
+    before overwriting or deleting it (an undo log). Reads are ordinary dict
+    reads. Only the most recent snapshot is valid: taking a new one starts
+    a fresh undo log and invalidates the previous view.
+    """
+    __slots__ = ("_undo", "version")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._undo = None       # no live snapshot -> nothing to record
+        self.version = 0
+
+    def __setitem__(self, key, value):
+        undo = self._undo
+        if undo is not None and key not in undo:
+            undo[key] = dict.get(self, key, _ABSENT)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        old = dict.__getitem__(self, key)
+        undo = self._undo
+        if undo is not None and key not in undo:
+            undo[key] = old
+        dict.__delitem__(self, key)
+
+    # every other dict mutator goes through __setitem__ / __delitem__
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = dict.__getitem__(self, key)
+        del self[key]
+        return value
+
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): table is empty")
+        key = next(reversed(dict.keys(self)))
+        return key, self.pop(key)
+
+    def clear(self):
+        for key in list(dict.keys(self)):
+            del self[key]
+
+    def snapshot(self):
+        """Read-only view of the current contents; O(1) to take."""
+        self.version += 1
+        self._undo = {}
+        return TableSnapshot(self, self._undo, self.version)
+
+    def changed_since_snapshot(self):
+        """Number of keys written or deleted since the last snapshot()."""
+        return len(self._undo) if self._undo is not None else 0
+
+
+class TableSnapshot(Mapping):
+    """
+    The contents of a VersionedTable at snapshot() time: the live table
+    with the undo log laid over it. Lookups are O(1); a full iteration costs
+    a shallow copy once the table has changed since the snapshot.
+    """
+    __slots__ = ("_table", "_undo", "_version")
+
+    def __init__(self, table, undo, version):
+        self._table = table
+        self._undo = undo
+        self._version = version
+
+    def _check(self):
+        if self._table.version != self._version:
+            raise RuntimeError("stale TableSnapshot: a newer snapshot() was taken")
+
+    def __getitem__(self, key):
+        self._check()
+        old = self._undo.get(key, _UNCHANGED)
+        if old is _UNCHANGED:
+            return dict.__getitem__(self._table, key)
+        if old is _ABSENT:
+            raise KeyError(key)             # added after the snapshot
+        return old
+
+    def items(self):
+        """
+        (key, value) pairs as of the snapshot. Unchanged tables hand out the
+        live dict's items view; otherwise the changed keys are patched into
+        a shallow copy (C-speed, values shared). Iterate right away.
+        """
+        self._check()
+        undo = self._undo
+        if not undo:
+            return dict.items(self._table)
+        merged = dict(self._table)
+        for key, old in undo.items():
+            if old is _ABSENT:
+                merged.pop(key, None)
+            else:
+                merged[key] = old
+        return merged.items()
+
+    def __iter__(self):
+        for key, _ in self.items():
+            yield key
+
+    def __len__(self):
+        self._check()
+        size = len(self._table)
+        for key, old in self._undo.items():
+            size += (old is not _ABSENT) - (key in self._table)
+        return size
+
+    def __repr__(self):
+        return f"TableSnapshot({dict(self.items())!r})"
+
+
+# -----------------------------
+# Headless mode and lazy output dependencies
+# -----------------------------
+HEADLESS = os.environ.get("ROUTING_SIM_HEADLESS", "") not in ("", "0")
+
+def set_headless(enabled=True):
+    """Turn headless mode on or off for every simulator in this process."""
+    global HEADLESS
+    HEADLESS = enabled
+
+def parse_cli(description, default_output, argv=None):
+    """
+    The simulators' common command line: --headless (same as
+    ROUTING_SIM_HEADLESS=1) and --output for the bulk routing-table file.
+    Turns headless mode on when asked; args.headless is the effective mode.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--headless", action="store_true",
+                        help="no pacing, plots or per-router tables; write one routing-table file")
+    parser.add_argument("--output", default=default_output,
+                        help="headless routing-table file (.jsonl, or .parquet with pyarrow)")
+    args = parser.parse_args(argv)
+    if args.headless:
+        set_headless()
+    args.headless = HEADLESS
+    return args
+
+def pace(seconds):
+    """Sleep between rounds for readable console output; no-op when headless."""
+    if seconds and not HEADLESS:
+        time.sleep(seconds)
+
+def pyplot():
+    """matplotlib.pyplot, imported on first use."""
+    import matplotlib.pyplot as plt
+    return plt
+
+def tabulate(rows, **kwargs):
+    """tabulate.tabulate, imported on first use."""
+    from tabulate import tabulate as _tabulate
+    return _tabulate(rows, **kwargs)
+
+def write_records(path, records):
+    """
+    Write an iterable of flat dicts to `path` in one go: Parquet if the
+    name ends in .parquet (needs pyarrow), JSON Lines otherwise.
+    Returns the number of records written.
+    """
+    records = list(records)
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow (or write .jsonl instead)") from None
+        pyarrow.parquet.write_table(pyarrow.Table.from_pylist(records), path)
+    else:
+        with open(path, "w") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+    return len(records)
+
+def routing_table_records(sim, routing_tables, inf=float("inf")):
+    """
+    Records for write_records from router -> {dest: (cost, next_hop)}
+    tables; unreachable destinations (cost >= inf) get cost None.
+    """
+    for router, table in routing_tables.items():
+        for dest, (cost, next_hop) in sorted(table.items()):
+            yield {"sim": sim, "router": router, "destination": dest,
+                   "cost": cost if cost < inf else None, "next_hop": next_hop}
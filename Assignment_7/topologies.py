@@ -0,0 +1,183 @@
+"""
+topologies.py
+
+Synthetic (and file-based) topologies for exercising the Assignment_7 protocol
+simulators beyond the hand-written 5-6 node examples.
+
+- waxman(n): random geometric graph, link probability falling off with distance
+  (router-level ISP-like), cost proportional to link length.
+- barabasi_albert(n): preferential attachment, heavy-tailed degrees (AS-level-like).
+- fat_tree(k): k-ary data-center fat-tree of switches (5k^2/4 nodes).
+- ring_of_rings(rings, ring_size): metro rings hanging off a core ring.
+- caida_as_graph(path): AS graph from a CAIDA AS-relationship file.
+- generate(kind, n): any of the synthetic ones sized to roughly n nodes.
+
+Every generator returns a connected networkx Graph whose edges carry an integer
+'cost' attribute (as create_weighted_topology does); synthetic nodes are named
+R0, R1, ... and CAIDA nodes are AS numbers (int).
+"""
+
+import itertools
+import math
+import random
+import networkx as nx
+import numpy as np
+
+MAX_COST = 20
+KINDS = ("waxman", "ba", "fat-tree", "ring-of-rings")
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _finish(G, seed, max_cost=MAX_COST):
+    """Name nodes R<i> and give every edge without a cost a random one."""
+    rng = random.Random(seed)
+    G = nx.relabel_nodes(G, {node: f"R{node}" for node in G.nodes()})
+    for u, v, data in G.edges(data=True):
+        if "cost" not in data:
+            data["cost"] = rng.randint(1, max_cost)
+    return G
+
+def _connect_components(G, rng):
+    """Join every component to the largest one with a single link."""
+    components = sorted(nx.connected_components(G), key=len, reverse=True)
+    main = list(components[0])
+    for comp in components[1:]:
+        G.add_edge(rng.choice(main), rng.choice(list(comp)))
+    return G
+
+# -----------------------------
+# Generators
+# -----------------------------
+def waxman(n, degree=4, alpha=0.15, seed=7, max_cost=MAX_COST):
+    """
+    Waxman graph: n routers placed uniformly in the unit square, link (u, v)
+    with probability beta * exp(-d(u, v) / (alpha * L)), L the largest
+    distance. beta is chosen so the expected average degree is `degree`.
+    Costs grow with link length (1..max_cost). Pairs are sampled in NumPy
+    row blocks instead of networkx's O(n^2) Python loop.
+    """
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2))
+    L = math.sqrt(2)
+    block = max(1, 2_000_000 // max(n, 1))
+
+    def weights(start, stop):
+        # distances and unscaled probabilities of rows start..stop-1 against
+        # columns start..n-1; only pairs (i, j) with i < j count
+        d = np.hypot(pos[start:stop, 0, None] - pos[None, start:, 0],
+                     pos[start:stop, 1, None] - pos[None, start:, 1])
+        w = np.exp(d * (-1.0 / (alpha * L)))
+        w[np.tril_indices(stop - start, 0, w.shape[1])] = 0.0
+        return d, w
+
+    blocks = [(i, min(n, i + block)) for i in range(0, n, block)]
+    total = sum(weights(start, stop)[1].sum() for start, stop in blocks)
+    beta = min(1.0, n * degree / 2 / total) if total else 0.0
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    for start, stop in blocks:
+        d, w = weights(start, stop)
+        us, vs = np.nonzero(rng.random(w.shape) < beta * w)
+        for u, v in zip(us.tolist(), vs.tolist()):
+            G.add_edge(u + start, v + start, cost=max(1, min(max_cost, math.ceil(d[u, v] / L * max_cost * 4))))
+    _connect_components(G, random.Random(seed))
+    return _finish(G, seed, max_cost)
+
+def barabasi_albert(n, m=2, seed=7, max_cost=MAX_COST):
+    """Preferential attachment: each new node links to m existing ones."""
+    return _finish(nx.barabasi_albert_graph(n, m, seed=seed), seed, max_cost)
+
+def fat_tree(k, seed=7, max_cost=MAX_COST):
+    """
+    k-ary fat-tree (k even) without hosts: (k/2)^2 core switches and k pods
+    of k/2 aggregation + k/2 edge switches; 5k^2/4 nodes. Costs are random
+    like the other generators (ECMP everywhere with equal costs otherwise).
+    """
+    if k < 2 or k % 2:
+        raise ValueError(f"fat-tree arity must be even and >= 2, got {k}")
+    half = k // 2
+    G = nx.Graph()
+    core = [("core", i) for i in range(half * half)]
+    G.add_nodes_from(core)
+    for pod in range(k):
+        aggs = [("agg", pod, i) for i in range(half)]
+        edges = [("edge", pod, i) for i in range(half)]
+        for a, agg in enumerate(aggs):
+            for j in range(half):
+                G.add_edge(agg, core[a * half + j])
+            for edge in edges:
+                G.add_edge(agg, edge)
+    G = nx.convert_node_labels_to_integers(G)
+    return _finish(G, seed, max_cost)
+
+def ring_of_rings(rings, ring_size, seed=7, max_cost=MAX_COST):
+    """
+    `rings` access rings of `ring_size` routers; router 0 of every ring
+    also sits on a core ring joining the rings together.
+    """
+    if rings < 1 or ring_size < 1:
+        raise ValueError("ring_of_rings needs at least one ring of one router")
+    G = nx.Graph()
+    G.add_nodes_from(range(rings * ring_size))
+    for r in range(rings):
+        base = r * ring_size
+        if ring_size > 1:
+            for i in range(ring_size):
+                j = (i + 1) % ring_size
+                if i != j:
+                    G.add_edge(base + i, base + j)
+        if rings > 1:
+            G.add_edge(base, ((r + 1) % rings) * ring_size)
+    return _finish(G, seed, max_cost)
+
+def caida_as_graph(path, max_nodes=None, seed=7, max_cost=MAX_COST):
+    """
+    AS graph from a CAIDA AS-relationship file ('as1|as2|rel[|source]' per
+    line, '#' comments; rel -1 = as1 is provider of as2, 0 = peers). Edges
+    carry rel ("p2c" / "p2p") and provider. With max_nodes, keeps the first
+    max_nodes ASes reached breadth-first from the best-connected AS. The
+    largest connected component is returned.
+    """
+    rng = random.Random(seed)
+    G = nx.Graph()
+    with open(path) as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.strip().split("|")
+            if len(fields) < 3:
+                raise ValueError(f"{path}: not an AS-relationship line: {line.strip()!r}")
+            a, b, rel = int(fields[0]), int(fields[1]), int(fields[2])
+            if a == b:
+                continue
+            G.add_edge(a, b, rel="p2c" if rel == -1 else "p2p",
+                       provider=a if rel == -1 else None, cost=rng.randint(1, max_cost))
+    if G.number_of_nodes() == 0:
+        raise ValueError(f"{path}: no AS links found")
+    G = G.subgraph(max(nx.connected_components(G), key=len)).copy()
+    if max_nodes is not None and G.number_of_nodes() > max_nodes:
+        start = max(G.degree, key=lambda item: item[1])[0]
+        keep = [start] + [v for _, v in itertools.islice(nx.bfs_edges(G, start), max_nodes - 1)]
+        G = G.subgraph(keep).copy()
+    return G
+
+# -----------------------------
+# Size-driven entry point
+# -----------------------------
+def generate(kind, n, seed=7):
+    """
+    A `kind` topology (one of KINDS) with about n nodes: exact for waxman
+    and ba; the nearest fat-tree arity / ring layout otherwise.
+    """
+    if kind == "waxman":
+        return waxman(n, seed=seed)
+    if kind == "ba":
+        return barabasi_albert(n, seed=seed)
+    if kind == "fat-tree":
+        k = max(2, 2 * round(math.sqrt(4 * n / 5) / 2))
+        return fat_tree(k, seed=seed)
+    if kind == "ring-of-rings":
+        rings = max(1, round(math.sqrt(n)))
+        return ring_of_rings(rings, max(1, round(n / rings)), seed=seed)
+    raise ValueError(f"Unknown topology kind: {kind}")
@@ -0,0 +1,603 @@
+# benchmarks.py
+"""
+Performance benchmarks for the Assignment_8 data path.
+------------------------------------------------------
+Usage:
+    python benchmarks.py lpm [--sizes 1000 100000 1000000]
+    python benchmarks.py batch [--prefixes 100000] [--batch 50000]
+    python benchmarks.py engines [--sizes 100000 1000000]
+    python benchmarks.py updates [--prefixes 1000000] [--updates 10000]
+    python benchmarks.py cache [--prefixes 100000] [--zipf 1.1]
+    python benchmarks.py compress [--sizes 10000 100000] [--links 4 16]
+    python benchmarks.py v6 [--prefixes 200000]
+    python benchmarks.py service [--prefixes 100000] [--lookups 10000000] [--max-workers N]
+    python benchmarks.py snapshot [--sizes 100000 1000000]
+    python benchmarks.py schedulers [--packets 2000000]
+    python benchmarks.py packets [--packets 1000000]
+    python benchmarks.py priority [--sizes 10000 1000000 10000000] [--heap-limit 1000000]
+    python benchmarks.py htb [--leaves 100 1000 10000] [--packets 200000]
+
+lpm     -> lookups/sec of the linear scan vs the binary trie engine of Router
+batch   -> Router.route_batch (NumPy) vs per-packet route_packet calls
+engines -> trie vs DIR-24-8: build time, memory, scalar and batch lookups/sec
+updates -> cost of single route add/remove/replace and of apply_updates batches
+cache   -> route_packet with and without the destination LRU cache on a
+           Zipf-distributed destination stream
+compress -> ORTC table minimization: entry counts, time and engine memory
+v6      -> IPv6 stride trie: build time, memory and lookups/sec
+service -> ClassifierService scaling from 1 to N worker processes
+snapshot -> cold start from (CIDR, link) tuples vs loading an mmap snapshot
+schedulers -> streaming strict priority / DRR / WFQ: packets/sec and byte shares
+packets -> memory per packet and scheduling throughput of Packet,
+           CompactPacket and PacketBatch
+priority -> heap-based priority_scheduler vs batched priority_order
+htb     -> HTB shaper with thousands of leaves: dequeues/sec and per-tenant
+           shares against the configured rates
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List
+
+from classifier_service import ClassifierService
+from fib_compress import compress_routes, forwarding_equivalent
+from fib_snapshot import load_snapshot, save_snapshot
+from ip_utils import MASKS6, int_to_ip, int_to_ipv6, ips_to_array, ipv6_to_int, parse_cidr6
+from pipeline import synthetic_routes, synthetic_routes_v6
+from router import Router
+from scheduler import (CompactPacket, DRRScheduler, HTBScheduler, Packet, PacketBatch,
+                       StrictPriorityScheduler, WFQScheduler, priority_order, priority_scheduler)
+
+
+# -----------------------------
+# Synthetic workloads
+# -----------------------------
+def random_addresses(count: int, seed: int = 2) -> List[str]:
+    rng = random.Random(seed)
+    return [f"{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}"
+            for _ in range(count)]
+
+
+def zipf_stream(destinations: List[str], count: int, s: float = 1.1, seed: int = 3) -> List[str]:
+    """Draw `count` destinations where the k-th most popular has weight 1/k^s."""
+    rng = random.Random(seed)
+    cum, total = [], 0.0
+    for k in range(1, len(destinations) + 1):
+        total += 1.0 / k ** s
+        cum.append(total)
+    return rng.choices(destinations, cum_weights=cum, k=count)
+
+
+def measure_rate(fn: Callable[[str], object], items: List[str], budget: float = 2.0) -> float:
+    """
+    Call fn on items (cycling) until all were processed or `budget` seconds
+    passed; return calls per second.
+    """
+    done = 0
+    start = time.perf_counter()
+    deadline = start + budget
+    for item in items:
+        fn(item)
+        done += 1
+        if not done & 0x3F and time.perf_counter() > deadline:
+            break
+    return done / (time.perf_counter() - start)
+
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+def bench_lpm(sizes: List[int], lookups: int = 200_000):
+    """
+    Compare lookups/sec of the linear scan against the trie engine.
+    The linear scan is time-boxed, so large tables report after a few lookups.
+    """
+    addresses = random_addresses(lookups)
+    print(f"{'prefixes':>10} {'engine':>8} {'build (s)':>10} {'lookups/s':>12}")
+    for size in sizes:
+        routes = synthetic_routes(size)
+        results = {}
+        for engine in ("linear", "trie"):
+            start = time.perf_counter()
+            router = Router(routes, engine=engine)
+            build = time.perf_counter() - start
+            rate = measure_rate(router.route_packet, addresses)
+            results[engine] = router
+            print(f"{size:>10} {engine:>8} {build:>10.2f} {rate:>12,.0f}")
+        # Sanity check: both engines must agree
+        for ip in addresses[:200]:
+            assert results["linear"].route_packet(ip) == results["trie"].route_packet(ip), ip
+
+
+def bench_batch(prefixes: int, batch: int, repeats: int = 5):
+    """
+    Throughput of route_batch (uint32 input and dotted-string input) against
+    the scalar route_packet loop on the trie engine.
+    """
+    router = Router(synthetic_routes(prefixes), engine="trie")
+    addresses = random_addresses(batch)
+    addr_array = ips_to_array(addresses)
+    router.route_batch(addr_array[:1])   # build the per-length index up front
+
+    start = time.perf_counter()
+    scalar = [router.route_packet(ip) for ip in addresses]
+    scalar_rate = batch / (time.perf_counter() - start)
+
+    def best_rate(fn):
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return batch / best
+
+    array_rate = best_rate(lambda: router.route_batch(addr_array))
+    string_rate = best_rate(lambda: router.route_batch(addresses))
+
+    hops = router.route_batch(addr_array)
+    batched = [router.link_name(i) for i in hops]
+    assert batched == scalar, "route_batch disagrees with route_packet"
+
+    print(f"{prefixes} prefixes, batches of {batch} destinations")
+    print(f"{'path':>28} {'lookups/s':>14} {'speedup':>8}")
+    for name, rate in (("route_packet (trie)", scalar_rate),
+                       ("route_batch (uint32 array)", array_rate),
+                       ("route_batch (dotted strings)", string_rate)):
+        print(f"{name:>28} {rate:>14,.0f} {rate / scalar_rate:>7.1f}x")
+
+
+def bench_engines(sizes: List[int], lookups: int = 200_000):
+    """
+    Build time, memory footprint and lookup rates of the trie and DIR-24-8
+    engines, to choose between them for a given table size.
+    """
+    addresses = random_addresses(lookups)
+    addr_array = ips_to_array(addresses)
+    print(f"{'prefixes':>10} {'engine':>7} {'build (s)':>10} {'memory (MB)':>12} "
+          f"{'lookups/s':>12} {'batch lookups/s':>16}")
+    for size in sizes:
+        routes = synthetic_routes(size)
+        answers = None
+        for engine in ("trie", "dir24"):
+            router = Router(routes, engine=engine)
+            stats = router.engine_stats()
+            rate = measure_rate(router.route_packet, addresses)
+            router.route_batch(addr_array[:1])
+            start = time.perf_counter()
+            hops = router.route_batch(addr_array)
+            batch_rate = len(addr_array) / (time.perf_counter() - start)
+            if answers is None:
+                answers = hops
+            assert (hops == answers).all(), f"{engine} disagrees with trie"
+            print(f"{size:>10} {engine:>7} {stats['build_seconds']:>10.2f} "
+                  f"{stats['memory_bytes'] / 2**20:>12.1f} {rate:>12,.0f} {batch_rate:>16,.0f}")
+
+
+def bench_updates(prefixes: int, updates: int, engines=("trie", "dir24")):
+    """
+    Per-operation latency of add_route / replace_route / remove_route on a
+    table of `prefixes` routes, then throughput of one apply_updates batch.
+    """
+    routes = synthetic_routes(prefixes)
+    fresh = synthetic_routes(prefixes + updates, seed=7)
+    present = {cidr for cidr, _ in routes}
+    new_routes = [r for r in fresh if r[0] not in present][:updates]
+    print(f"{prefixes} prefixes, {len(new_routes)} updates per operation")
+    print(f"{'engine':>7} {'operation':>14} {'mean (us)':>10} {'p99 (us)':>10} {'updates/s':>12}")
+    for engine in engines:
+        router = Router(routes, engine=engine)
+        ops = (("add_route", lambda c, l: router.add_route(c, l)),
+               ("replace_route", lambda c, l: router.replace_route(c, "Link 99")),
+               ("remove_route", lambda c, l: router.remove_route(c)))
+        for name, op in ops:
+            samples = []
+            for cidr, link in new_routes:
+                start = time.perf_counter()
+                op(cidr, link)
+                samples.append(time.perf_counter() - start)
+            samples.sort()
+            mean = sum(samples) / len(samples)
+            p99 = samples[int(len(samples) * 0.99)]
+            print(f"{engine:>7} {name:>14} {mean * 1e6:>10.1f} {p99 * 1e6:>10.1f} {1 / mean:>12,.0f}")
+        batch = [("add", c, l) for c, l in new_routes] + [("remove", c) for c, _ in new_routes]
+        start = time.perf_counter()
+        router.apply_updates(batch)
+        elapsed = time.perf_counter() - start
+        print(f"{engine:>7} {'apply_updates':>14} {elapsed / len(batch) * 1e6:>10.1f} "
+              f"{'-':>10} {len(batch) / elapsed:>12,.0f}")
+
+
+def bench_cache(prefixes: int, s: float, distinct: int = 100_000, stream: int = 500_000,
+                cache_sizes=(0, 1024, 4096, 16384), churn: int = 1000):
+    """
+    Zipf-distributed destinations through route_packet for several cache
+    sizes; one route is replaced every `churn` lookups so invalidation is
+    part of the measured cost. dir24 bypasses the cache for IPv4, so its
+    rows should stay near 1.00x.
+    """
+    routes = synthetic_routes(prefixes)
+    dests = zipf_stream(random_addresses(distinct), stream, s)
+    print(f"{prefixes} prefixes, {stream} lookups over {distinct} destinations (zipf s={s}), "
+          f"1 route change per {churn} lookups")
+    print(f"{'engine':>7} {'cache':>7} {'lookups/s':>12} {'hit rate':>9} {'speedup':>8}")
+    for engine in ("trie", "dir24"):
+        baseline = None
+        for size in cache_sizes:
+            router = Router(routes, engine=engine, cache_size=size)
+            route, cidr = router.route_packet, routes[0][0]
+            start = time.perf_counter()
+            for i, ip in enumerate(dests):
+                if not i % churn:
+                    router.replace_route(cidr, f"Link {i % 16}")
+                route(ip)
+            rate = stream / (time.perf_counter() - start)
+            baseline = baseline or rate
+            hit_rate = router.cache_stats().get("hit_rate", 0.0)
+            print(f"{engine:>7} {size:>7} {rate:>12,.0f} {hit_rate:>9.1%} {rate / baseline:>7.2f}x")
+
+
+def bench_compress(sizes: List[int], link_counts: List[int]):
+    """
+    Entry counts before/after ORTC and what the smaller table saves in trie
+    build time and memory. Fewer links -> more aggregation opportunities.
+    """
+    print(f"{'prefixes':>9} {'links':>6} {'after':>9} {'ratio':>6} {'ortc (s)':>9} "
+          f"{'build before/after (s)':>23} {'trie MB before/after':>21}")
+    for size in sizes:
+        for links in link_counts:
+            routes = synthetic_routes(size, links=links)
+            start = time.perf_counter()
+            compressed = compress_routes(routes)
+            elapsed = time.perf_counter() - start
+            assert forwarding_equivalent(routes, compressed)
+            before = Router(routes, engine="trie").engine_stats()
+            after = Router(compressed, engine="trie").engine_stats()
+            print(f"{size:>9} {links:>6} {len(compressed):>9} {len(compressed) / size:>6.1%} "
+                  f"{elapsed:>9.2f} {before['build_seconds']:>11.2f}/{after['build_seconds']:<11.2f} "
+                  f"{before['memory_bytes'] / 2**20:>10.1f}/{after['memory_bytes'] / 2**20:<10.1f}")
+
+
+def bench_v6(prefixes: int, lookups: int = 200_000):
+    """
+    IPv6 stride trie on a synthetic table: build time, memory and lookup
+    rate, for destinations inside routed prefixes and for random ones.
+    Results are checked against a per-length dictionary probe.
+    """
+    routes = synthetic_routes_v6(prefixes)
+    router = Router(routes, engine="trie")
+    stats = router.engine_stats()
+    print(f"{prefixes} IPv6 prefixes: build {stats['build_seconds']:.2f} s, "
+          f"memory {stats['ipv6_memory_bytes'] / 2**20:.1f} MB "
+          f"({stats['ipv6_memory_bytes'] / prefixes:.0f} B/prefix)")
+
+    rng = random.Random(2)
+    by_length = {}
+    for (network, length), idx in router._rib6.items():
+        by_length.setdefault(length, {})[network] = idx
+    order = sorted(by_length, reverse=True)
+
+    def reference(addr):
+        for length in order:
+            idx = by_length[length].get(addr & MASKS6[length])
+            if idx is not None:
+                return router.link_name(idx)
+        return "Default Gateway"
+
+    covered = []
+    for cidr, _ in rng.choices(routes, k=lookups):
+        network, _, length = parse_cidr6(cidr)
+        covered.append(int_to_ipv6(network | rng.getrandbits(128 - length)))
+    uniform = [int_to_ipv6((1 << 125) | rng.getrandbits(125)) for _ in range(lookups)]
+    print(f"{'destinations':>14} {'lookups/s':>12}")
+    for name, dests in (("in table", covered), ("random", uniform)):
+        for ip in dests[:10_000]:
+            assert router.route_packet(ip) == reference(ipv6_to_int(ip))
+        print(f"{name:>14} {measure_rate(router.route_packet, dests):>12,.0f}")
+
+
+def bench_service(prefixes: int, lookups: int, max_workers: int):
+    """
+    Lookups/sec of ClassifierService with 1..max_workers processes against
+    a single process calling route_batch on the same DIR-24-8 table.
+    """
+    import numpy as np
+
+    router = Router(synthetic_routes(prefixes), engine="dir24")
+    addrs = np.random.default_rng(2).integers(0, 1 << 32, size=lookups, dtype=np.uint32)
+    start = time.perf_counter()
+    expected = router.route_batch(addrs)
+    single = lookups / (time.perf_counter() - start)
+    print(f"{prefixes} prefixes, {lookups} destinations, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'lookups/s':>14} {'vs route_batch':>15} {'scaling':>8}")
+    print(f"{'-':>8} {single:>14,.0f} {1:>14.2f}x {'-':>8}")
+    base = None
+    for workers in range(1, max_workers + 1):
+        with ClassifierService(router, workers=workers) as service:
+            service.classify(addrs[:service.chunk * workers])    # workers attached, pages touched
+            start = time.perf_counter()
+            hops = service.classify(addrs)
+            rate = lookups / (time.perf_counter() - start)
+        assert (hops == expected).all(), "service disagrees with route_batch"
+        base = base or rate
+        print(f"{workers:>8} {rate:>14,.0f} {rate / single:>14.2f}x {rate / base:>7.2f}x")
+
+
+def bench_snapshot(sizes: List[int], lookups: int = 200_000):
+    """
+    Time to a serving Router: building the dir24 engine from (CIDR, link)
+    tuples vs mapping a snapshot, with and without the checksum pass.
+    Also reports the deferred cost of the first update (RIB rebuild and
+    copy of the mapped tables).
+    """
+    addr_array = ips_to_array(random_addresses(lookups))
+    path = os.path.join(tempfile.gettempdir(), f"bench_fib_{os.getpid()}.snap")
+    print(f"{'prefixes':>10} {'build (s)':>10} {'save (s)':>9} {'file MB':>8} "
+          f"{'load (s)':>9} {'load, no crc (s)':>17} {'first update (s)':>17}")
+    try:
+        for size in sizes:
+            routes = synthetic_routes(size)
+            start = time.perf_counter()
+            router = Router(routes, engine="dir24")
+            build = time.perf_counter() - start
+            start = time.perf_counter()
+            file_size = save_snapshot(router, path)
+            save = time.perf_counter() - start
+            start = time.perf_counter()
+            loaded = load_snapshot(path)
+            load = time.perf_counter() - start
+            start = time.perf_counter()
+            unverified = load_snapshot(path, verify=False)
+            load_fast = time.perf_counter() - start
+            assert (loaded.route_batch(addr_array) == router.route_batch(addr_array)).all()
+            start = time.perf_counter()
+            unverified.replace_route(routes[0][0], "Link 99")
+            first_update = time.perf_counter() - start
+            print(f"{size:>10} {build:>10.2f} {save:>9.2f} {file_size / 2**20:>8.1f} "
+                  f"{load:>9.3f} {load_fast:>17.4f} {first_update:>17.2f}")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def bench_schedulers(packets: int, weights=(4, 2, 1), backlog: int = 1000):
+    """
+    Closed loop on a saturated output port: every class always has
+    `backlog` packets queued (each packet sent is enqueued again), so the
+    byte shares show the discipline's allocation. Payload sizes are random
+    between 64 and 1500 bytes.
+    """
+    rng = random.Random(4)
+    pool = [Packet("10.0.0.1", "10.0.0.2", "x" * rng.randint(64, 1500), cls)
+            for cls in range(len(weights)) for _ in range(backlog)]
+    weight_map = dict(enumerate(weights))
+    total_weight = sum(weights)
+    print(f"{packets} packets, {len(weights)} classes, weights {weights}")
+    print(f"{'scheduler':>24} {'packets/s':>12}  byte share per class (target)")
+    for scheduler in (StrictPriorityScheduler(), DRRScheduler(weights=weight_map),
+                      WFQScheduler(weights=weight_map)):
+        for pkt in pool:
+            scheduler.enqueue(pkt)
+        enqueue, dequeue = scheduler.enqueue, scheduler.dequeue
+        start = time.perf_counter()
+        for _ in range(packets):
+            enqueue(dequeue())
+        rate = packets / (time.perf_counter() - start)
+        stats = scheduler.stats()
+        sent = sum(s["sent_bytes"] for s in stats.values())
+        shares = "  ".join(f"{cls}: {s['sent_bytes'] / sent:.1%} ({weight_map[cls] / total_weight:.1%})"
+                           for cls, s in stats.items())
+        print(f"{type(scheduler).__name__:>24} {rate:>12,.0f}  {shares}")
+
+
+def bench_packets(count: int):
+    """
+    Retained memory per packet (tracemalloc) and build / DRR scheduling
+    rates for the three packet representations. Payloads are 64-512 bytes;
+    "overhead" is memory beyond the payload bytes themselves.
+    """
+    def fields():
+        rng = random.Random(5)
+        for _ in range(count):
+            yield (rng.getrandbits(32), rng.getrandbits(32), rng.randint(64, 512), rng.randrange(3))
+
+    builders = (
+        ("Packet (dataclass)", lambda: [Packet(int_to_ip(s), int_to_ip(d), "x" * n, p)
+                                        for s, d, n, p in fields()]),
+        ("CompactPacket", lambda: [CompactPacket(s, d, b"x" * n, p) for s, d, n, p in fields()]),
+        ("PacketBatch", lambda: PacketBatch.from_packets(CompactPacket(s, d, b"x" * n, p)
+                                                         for s, d, n, p in fields())),
+    )
+    payload_bytes = sum(n for _, _, n, _ in fields())
+    print(f"{count} packets, {payload_bytes / count:.0f} payload bytes/packet on average")
+    print(f"{'representation':>20} {'bytes/packet':>13} {'overhead':>9} {'build/s':>11} {'DRR pkts/s':>11}")
+    for name, build in builders:
+        tracemalloc.start()
+        packets = build()
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del packets
+        start = time.perf_counter()
+        packets = build()
+        build_rate = count / (time.perf_counter() - start)
+        scheduler = DRRScheduler()
+        start = time.perf_counter()
+        if isinstance(packets, PacketBatch):
+            scheduler.enqueue_batch(packets)
+        else:
+            for pkt in packets:
+                scheduler.enqueue(pkt)
+        for _ in scheduler.drain():
+            pass
+        sched_rate = count / (time.perf_counter() - start)
+        del packets
+        print(f"{name:>20} {retained / count:>13.0f} {(retained - payload_bytes) / count:>9.0f} "
+              f"{build_rate:>11,.0f} {sched_rate:>11,.0f}")
+
+
+def bench_priority(sizes: List[int], heap_limit: int, classes: int = 3):
+    """
+    priority_scheduler (heap of (priority, idx, packet) tuples over a list)
+    vs priority_order on a PacketBatch and on a plain list of packets.
+    The heap version is skipped above heap_limit packets; its order is
+    checked against priority_order where both run.
+    """
+    import numpy as np
+
+    print(f"{classes} priority classes")
+    print(f"{'packets':>10} {'heap (s)':>9} {'order, batch (s)':>17} {'order, list (s)':>16} {'speedup':>8}")
+    for size in sizes:
+        rng = np.random.default_rng(6)
+        prio = rng.integers(0, classes, size, dtype=np.uint8)
+        batch = PacketBatch(rng.integers(0, 1 << 32, size, dtype=np.uint32),
+                            rng.integers(0, 1 << 32, size, dtype=np.uint32),
+                            prio, b"", np.zeros(size + 1, dtype=np.int64))
+        start = time.perf_counter()
+        order = priority_order(batch)
+        batch_time = time.perf_counter() - start
+        heap_time = list_time = None
+        if size <= heap_limit:
+            packets = [Packet("10.0.0.1", "10.0.0.2", "", p) for p in prio.tolist()]
+            start = time.perf_counter()
+            ordered = priority_scheduler(packets)
+            heap_time = time.perf_counter() - start
+            start = time.perf_counter()
+            list_order = priority_order(packets)
+            list_time = time.perf_counter() - start
+            assert (list_order == order).all()
+            assert all(packets[i] is pkt for i, pkt in zip(order.tolist(), ordered))
+        def fmt(seconds):
+            return f"{seconds:.4f}" if seconds is not None else "skipped"
+
+        speedup = f"{heap_time / batch_time:.0f}x" if heap_time is not None else "-"
+        print(f"{size:>10} {fmt(heap_time):>9} {fmt(batch_time):>17} {fmt(list_time):>16} {speedup:>8}")
+
+
+def bench_htb(leaf_counts: List[int], packets: int, tenants: int = 10, link_bps: float = 1e9):
+    """
+    Closed loop on a saturated, virtually clocked link: HTB root at the
+    link rate, `tenants` classes with rates in the ratio 1:2:..:tenants
+    (ceil = link) and the leaves split evenly under them (ceil = their
+    tenant's rate). Every other leaf always has a packet queued, the rest
+    stay idle, so busy leaves send half their bytes on spare rate borrowed
+    from their tenant while tenant shares must still match tenant rates.
+    The clock advances by each packet's transmission time, or jumps to
+    next_eligible() when all leaves are over limit.
+    """
+    link = link_bps / 8
+    rng = random.Random(7)
+    print(f"{packets} packets, {tenants} tenants, link {link_bps / 1e9:g} Gbit/s")
+    print(f"{'leaves':>7} {'busy':>6} {'dequeues/s':>11} {'idle polls':>11} {'max share error':>16} "
+          f"{'leaf conformance':>17}")
+    for leaves in leaf_counts:
+        clock = [0.0]
+        htb = HTBScheduler(clock=lambda: clock[0])
+        htb.add_class("link", rate=link)
+        total_weight = tenants * (tenants + 1) // 2
+        per_tenant = max(1, leaves // tenants)
+        for t in range(tenants):
+            rate = link * (t + 1) / total_weight
+            htb.add_class(("tenant", t), rate=rate, ceil=link, parent="link")
+            for leaf in range(per_tenant):
+                htb.add_class((t, leaf), rate=rate / per_tenant, ceil=rate, parent=("tenant", t))
+        leaf_names = [(t, leaf) for t in range(tenants) for leaf in range(0, per_tenant, 2)]
+        pool = [Packet("10.0.0.1", "10.0.0.2", "x" * rng.randint(64, 1500), 0) for _ in leaf_names]
+        owner = {id(pkt): name for pkt, name in zip(pool, leaf_names)}
+        for pkt in pool:
+            htb.enqueue_item(pkt, owner[id(pkt)], len(pkt.payload))
+        push, dequeue = htb.enqueue_item, htb.dequeue
+        sent = idle = 0
+        start = time.perf_counter()
+        while sent < packets:
+            pkt = dequeue()
+            if pkt is None:
+                idle += 1
+                clock[0] = htb.next_eligible()
+                continue
+            size = len(pkt.payload)
+            clock[0] += size / link
+            push(pkt, owner[id(pkt)], size)
+            sent += 1
+        rate = packets / (time.perf_counter() - start)
+        stats = htb.class_stats()
+        total = stats["link"]["sent_bytes"]
+        error = max(abs(stats[("tenant", t)]["sent_bytes"] / total - (t + 1) / total_weight)
+                    for t in range(tenants))
+        leaf_sent = sum(stats[name]["sent_bytes"] for name in leaf_names)
+        conforming = sum(stats[name]["conforming_bytes"] for name in leaf_names)
+        print(f"{per_tenant * tenants:>7} {len(leaf_names):>6} {rate:>11,.0f} {idle:>11} {error:>16.2%} "
+              f"{conforming / leaf_sent:>17.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assignment_8 data-path benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    p = sub.add_parser("lpm", help="linear scan vs binary trie lookups/sec")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    p = sub.add_parser("batch", help="route_batch vs route_packet throughput")
+    p.add_argument("--prefixes", type=int, default=100_000)
+    p.add_argument("--batch", type=int, default=50_000)
+    p = sub.add_parser("engines", help="trie vs DIR-24-8 build time, memory and lookups/sec")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    p = sub.add_parser("updates", help="incremental route update latency")
+    p.add_argument("--prefixes", type=int, default=1_000_000)
+    p.add_argument("--updates", type=int, default=10_000)
+    p = sub.add_parser("cache", help="destination cache on a Zipf stream")
+    p.add_argument("--prefixes", type=int, default=100_000)
+    p.add_argument("--zipf", type=float, default=1.1)
+    p = sub.add_parser("compress", help="ORTC forwarding-table minimization")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    p.add_argument("--links", type=int, nargs="+", default=[4, 16])
+    p = sub.add_parser("v6", help="IPv6 stride trie build time, memory and lookups/sec")
+    p.add_argument("--prefixes", type=int, default=200_000)
+    p = sub.add_parser("service", help="multi-process classifier scaling, 1..N workers")
+    p.add_argument("--prefixes", type=int, default=100_000)
+    p.add_argument("--lookups", type=int, default=10_000_000)
+    p.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    p = sub.add_parser("snapshot", help="cold start: build from routes vs mmap snapshot")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    p = sub.add_parser("schedulers", help="streaming scheduler throughput and fairness")
+    p.add_argument("--packets", type=int, default=2_000_000)
+    p = sub.add_parser("packets", help="memory and throughput of packet representations")
+    p.add_argument("--packets", type=int, default=1_000_000)
+    p = sub.add_parser("priority", help="heap priority_scheduler vs batched priority_order")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    p.add_argument("--heap-limit", type=int, default=1_000_000)
+    p = sub.add_parser("htb", help="HTB shaper throughput and rate conformance")
+    p.add_argument("--leaves", type=int, nargs="+", default=[100, 1_000, 10_000])
+    p.add_argument("--packets", type=int, default=200_000)
+    args = parser.parse_args()
+
+    if args.bench == "lpm":
+        bench_lpm(args.sizes)
+    elif args.bench == "batch":
+        bench_batch(args.prefixes, args.batch)
+    elif args.bench == "engines":
+        bench_engines(args.sizes)
+    elif args.bench == "updates":
+        bench_updates(args.prefixes, args.updates)
+    elif args.bench == "cache":
+        bench_cache(args.prefixes, args.zipf)
+    elif args.bench == "compress":
+        bench_compress(args.sizes, args.links)
+    elif args.bench == "v6":
+        bench_v6(args.prefixes)
+    elif args.bench == "service":
+        bench_service(args.prefixes, args.lookups, args.max_workers)
+    elif args.bench == "snapshot":
+        bench_snapshot(args.sizes)
+    elif args.bench == "schedulers":
+        bench_schedulers(args.packets)
+    elif args.bench == "packets":
+        bench_packets(args.packets)
+    elif args.bench == "priority":
+        bench_priority(args.sizes, args.heap_limit)
+    elif args.bench == "htb":
+        bench_htb(args.leaves, args.packets)
+
+
+if __name__ == "__main__":
+    main()
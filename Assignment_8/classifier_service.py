@@ -0,0 +1,164 @@
+# classifier_service.py
+"""
+Multi-process packet classification
+-----------------------------------
+Longest Prefix Match for large destination batches on a pool of worker
+processes that share one compiled forwarding structure:
+- the router's IPv4 routes are compiled once into DIR-24-8 tables
+  (router.Dir248Table) held in multiprocessing.shared_memory; every worker
+  maps the same pages, there is no per-worker copy of the table;
+- destinations and results live in shared buffers too, so a batch is
+  handed out as (start, end) slices and the results land in input order
+  without pickling any arrays.
+
+The service answers from a snapshot of the router taken at construction;
+routes changed afterwards are seen by a new service only.
+
+Usage:
+    with ClassifierService(router, workers=4) as service:
+        hops = service.classify(addresses)      # int32 indices into router.links
+        links = service.classify_links(addresses)
+"""
+
+import os
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ip_utils import ips_to_array
+from router import DEFAULT_GATEWAY, Dir248Table, Router, np
+
+
+# -----------------------------
+# Shared arrays
+# -----------------------------
+def _share(array: "np.ndarray") -> Tuple[SharedMemory, "np.ndarray", Tuple[str, str, int]]:
+    """Copy an array into a new shared memory block; return (block, view, spec)."""
+    shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[:] = array
+    return shm, view, (shm.name, array.dtype.str, len(array))
+
+
+def _attach(spec: Tuple[str, str, int]) -> Tuple[SharedMemory, "np.ndarray"]:
+    """Map a block created by _share in another process."""
+    name, dtype, length = spec
+    # Pool workers share the parent's resource tracker, so attaching here
+    # registers nothing new and the creator's unlink stays the only cleanup.
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray((length,), dtype=dtype, buffer=shm.buf)
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+_worker: Dict[str, object] = {}
+
+
+def _init_worker(specs: Dict[str, Tuple[str, str, int]], flag: int):
+    for key, spec in specs.items():
+        shm, view = _attach(spec)
+        _worker[key] = view
+        _worker[key + "_shm"] = shm         # keep the mapping alive
+    _worker["flag"] = flag
+
+
+def _classify_slice(bounds: Tuple[int, int]):
+    lo, hi = bounds
+    w = _worker
+    w["out"][lo:hi] = Dir248Table.lookup_arrays(w["tbl24"], w["tbl_long"], w["flag"], w["in"][lo:hi])
+
+
+# -----------------------------
+# Service
+# -----------------------------
+class ClassifierService:
+    def __init__(self, router: Router, workers: Optional[int] = None, chunk: int = 1 << 18):
+        """
+        Compile the IPv4 routes of `router` into shared DIR-24-8 tables and
+        start `workers` processes (default: one per CPU). Batches are cut
+        into slices of `chunk` destinations, one slice per task.
+        """
+        if np is None:
+            raise ImportError("ClassifierService requires NumPy")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk = chunk
+        self.links, table, _, _ = router.forwarding_state()
+        tbl24, tbl_long, self.flag = table.tbl24, table.tbl_long, table.flag
+
+        self._blocks: List[SharedMemory] = []
+        specs = {}
+        self._window = self.chunk * self.workers
+        for key, array in (("tbl24", tbl24), ("tbl_long", tbl_long),
+                           ("in", np.zeros(self._window, dtype=np.uint32)),
+                           ("out", np.zeros(self._window, dtype=np.int32))):
+            shm, view, specs[key] = _share(array)
+            self._blocks.append(shm)
+            if key in ("in", "out"):
+                setattr(self, "_" + key, view)
+        self._pool = get_context().Pool(self.workers, initializer=_init_worker,
+                                        initargs=(specs, self.flag))
+
+    def table_bytes(self) -> int:
+        """Size of the shared forwarding tables (mapped once, by all workers)."""
+        return self._blocks[0].size + self._blocks[1].size
+
+    def classify(self, addresses: Iterable) -> "np.ndarray":
+        """
+        LPM for a batch of IPv4 destinations (uint32 array, or an iterable
+        of dotted-decimal strings / integers). Returns an int32 array of
+        indices into self.links, -1 = DEFAULT_GATEWAY, in input order.
+        """
+        if self._pool is None:
+            raise ValueError("ClassifierService is closed")
+        if not isinstance(addresses, np.ndarray):
+            addresses = ips_to_array(addresses)
+        addrs = addresses.astype(np.uint32, copy=False).ravel()
+        result = np.empty(len(addrs), dtype=np.int32)
+        for start in range(0, len(addrs), self._window):
+            n = min(self._window, len(addrs) - start)
+            self._in[:n] = addrs[start:start + n]
+            self._pool.map(_classify_slice, [(lo, min(lo + self.chunk, n))
+                                             for lo in range(0, n, self.chunk)])
+            result[start:start + n] = self._out[:n]
+        return result
+
+    def classify_links(self, addresses: Iterable) -> List[str]:
+        """Like classify, but returns output link names."""
+        links = self.links
+        return [links[i] if i >= 0 else DEFAULT_GATEWAY for i in self.classify(addresses).tolist()]
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+        del self._in, self._out             # views must go before the blocks close
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Quick manual test when run directly
+if __name__ == "__main__":
+    routes = [
+        ("223.1.1.0/24", "Link 0"),
+        ("223.1.2.0/24", "Link 1"),
+        ("223.1.3.0/24", "Link 2"),
+        ("223.1.0.0/16", "Link 4 (ISP)"),
+        ("223.1.3.128/25", "Link 3"),
+    ]
+    test_cases = ["223.1.1.100", "223.1.2.5", "223.1.250.1", "198.51.100.1", "223.1.3.200"]
+    router = Router(routes, engine="trie")
+    with ClassifierService(router, workers=2, chunk=2) as service:
+        for ip, link in zip(test_cases, service.classify_links(test_cases)):
+            print(f"{ip} -> {link} (expected: {router.route_packet(ip)})")
@@ -0,0 +1,179 @@
+# fib_compress.py
+"""
+Forwarding-table compression (ORTC)
+-----------------------------------
+Optimal Routing Table Constructor (Draves et al.): rewrites a table into
+the smallest prefix table that forwards every address to the same link.
+Works on top of router.Router:
+- compress_routes(routes)  -> minimized (CIDR, output_link) list (offline)
+- compress_router(router)  -> new Router built from a live router's routes
+- forwarding_equivalent(a, b) checks two tables agree on every address.
+
+Addresses with no route are treated as one more next hop (the null route),
+so a compressed table may contain (CIDR, DEFAULT_GATEWAY) entries that
+punch a hole into a shorter prefix.
+"""
+
+from typing import Dict, FrozenSet, List, Tuple
+
+from ip_utils import MASKS, int_to_ip, parse_cidr
+from router import DEFAULT_GATEWAY, NULL_ROUTE, BinaryTrie, Router
+
+
+def _pick(hops: FrozenSet[int], preferred: int) -> int:
+    return preferred if preferred in hops else min(hops)
+
+
+def ortc(entries: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
+    """
+    Minimize (network, prefix_len, hop) entries; hop NULL_ROUTE means
+    "no route". Runs the three ORTC passes over a path-compressed trie:
+    the chains of one-child nodes a plain binary trie would hold between
+    two trie nodes are accounted for in closed form instead of being built.
+    """
+    trie = BinaryTrie()
+    for network, length, hop in entries:
+        trie.insert(network, length, hop)
+    root = trie._root           # walk the engine's nodes directly
+    sets: Dict[int, FrozenSet[int]] = {}      # id(node) -> candidate hop set
+
+    def merge(a, b):
+        both = a & b
+        return both if both else a | b
+
+    def side_set(child, depth, hop):
+        # Candidate set of one side of a node at `depth` whose
+        # effective hop is `hop` (leaves on that side inherit it).
+        if child is None:
+            return frozenset((hop,))
+        chain = child.length - depth - 1    # implicit one-child nodes
+        below = sets[id(child)]
+        if chain == 0:
+            return below
+        if chain == 1:
+            return frozenset((hop,)) if hop in below else below | {hop}
+        return frozenset((hop,))
+
+    # Pass 1 + 2: push hops down to the leaves, compute sets bottom-up
+    def collect(node, inherited):
+        hop = node.value if node.value is not None else inherited
+        left, right = node.children
+        if left is None and right is None:
+            sets[id(node)] = frozenset((hop,))
+            return
+        for child in (left, right):
+            if child is not None:
+                collect(child, hop)
+        sets[id(node)] = merge(side_set(left, node.length, hop),
+                               side_set(right, node.length, hop))
+
+    # Pass 3: top-down, emit an entry wherever the inherited hop is not a candidate
+    out: List[Tuple[int, int, int]] = []
+
+    def assign(node, inherited, current):
+        hop = node.value if node.value is not None else inherited
+        candidates = sets[id(node)]
+        if current not in candidates:
+            current = _pick(candidates, hop)
+            out.append((node.prefix, node.length, current))
+        left, right = node.children
+        if left is None and right is None:
+            return
+        depth = node.length
+        for bit, child in enumerate((left, right)):
+            if child is None:
+                if current != hop:
+                    out.append((node.prefix | (bit << (31 - depth)), depth + 1, hop))
+                continue
+            chain_current = current
+            for t in range(depth + 1, child.length):
+                # Implicit node at depth t on the way to child
+                prefix = child.prefix & MASKS[t]
+                if t == child.length - 1:
+                    below = sets[id(child)]
+                    chain_set = frozenset((hop,)) if hop in below else below | {hop}
+                else:
+                    chain_set = frozenset((hop,))
+                if chain_current not in chain_set:
+                    chain_current = _pick(chain_set, hop)
+                    out.append((prefix, t, chain_current))
+                # Its off-path child is a leaf inheriting hop
+                if chain_current != hop:
+                    off = ((child.prefix >> (31 - t)) & 1) ^ 1
+                    out.append((prefix | (off << (31 - t)), t + 1, hop))
+            assign(child, hop, chain_current)
+
+    collect(root, NULL_ROUTE)
+    assign(root, NULL_ROUTE, NULL_ROUTE)
+    return out
+
+
+def compress_routes(routes: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Offline pass: return a minimal (CIDR, output_link) list that forwards
+    exactly like `routes` (later duplicates of a prefix win, as in Router).
+    """
+    links: List[str] = []
+    index: Dict[str, int] = {}
+    table: Dict[Tuple[int, int], int] = {}
+    for cidr, out_link in routes:
+        network, _, length = parse_cidr(cidr)
+        if out_link == DEFAULT_GATEWAY:
+            hop = NULL_ROUTE
+        else:
+            hop = index.get(out_link)
+            if hop is None:
+                hop = index[out_link] = len(links)
+                links.append(out_link)
+        table[(network, length)] = hop
+    minimized = ortc([(network, length, hop) for (network, length), hop in table.items()])
+    return [(f"{int_to_ip(network)}/{length}", links[hop] if hop >= 0 else DEFAULT_GATEWAY)
+            for network, length, hop in sorted(minimized, key=lambda e: (-e[1], e[0]))]
+
+
+def compress_router(router: Router, engine: str = None, cache_size: int = 0) -> Tuple[Router, Dict[str, int]]:
+    """
+    Online pass: build a new Router (same engine unless given) from the
+    minimized current table of `router`. Returns (router, stats) where stats
+    holds the IPv4 entry counts before and after; IPv6 routes are carried
+    over unchanged.
+    """
+    current = router.routes()
+    routes = [route for route in current if ":" not in route[0]]
+    ipv6_routes = [route for route in current if ":" in route[0]]
+    compressed = compress_routes(routes)
+    new_router = Router(compressed + ipv6_routes, engine=engine or router.engine, cache_size=cache_size)
+    return new_router, {"before": len(routes), "after": len(compressed)}
+
+
+def forwarding_equivalent(a: List[Tuple[str, str]], b: List[Tuple[str, str]]) -> bool:
+    """
+    Exact check that two route lists send every IPv4 address to the same
+    link: LPM results only change at prefix range boundaries, so comparing
+    the first address of every elementary range covers the whole space.
+    """
+    ra, rb = Router(a, engine="trie"), Router(b, engine="trie")
+    points = {0}
+    for network, length in list(ra._rib) + list(rb._rib):
+        points.add(network)
+        end = network + (1 << (32 - length))
+        if end <= 0xFFFFFFFF:
+            points.add(end)
+    return all(ra.route_packet(ip) == rb.route_packet(ip) for ip in map(int_to_ip, points))
+
+
+# Quick manual test when run directly
+if __name__ == "__main__":
+    routes = [
+        ("223.1.0.0/16", "Link 4 (ISP)"),
+        ("223.1.1.0/24", "Link 4 (ISP)"),    # redundant: same link as its cover
+        ("223.1.2.0/24", "Link 1"),
+        ("223.1.3.0/24", "Link 1"),          # merges with 223.1.2.0/24
+        ("10.0.0.0/9", "Link 0"),
+        ("10.128.0.0/9", "Link 0"),          # siblings -> 10.0.0.0/8
+    ]
+    compressed = compress_routes(routes)
+    print(f"{len(routes)} routes -> {len(compressed)} routes")
+    for cidr, link in compressed:
+        print(f"  {cidr:<18} {link}")
+    print("forwarding equivalent:", forwarding_equivalent(routes, compressed))
@@ -0,0 +1,231 @@
+# fib_snapshot.py
+"""
+On-disk FIB snapshots
+---------------------
+Writes the built forwarding structure of a Router to a binary file that
+later processes map with mmap instead of rebuilding from (CIDR, link)
+tuples:
+- save_snapshot(router, path) -> bytes written
+- load_snapshot(path)         -> Router answering lookups straight from the
+                                 mapped DIR-24-8 tables (no parsing, no copy;
+                                 processes loading the same file share its
+                                 page cache)
+- route_digest(routes)        -> digest of a route set, recorded in every
+                                 snapshot; load_snapshot(path, routes_digest=...)
+                                 rejects a snapshot of other routes
+
+The full tbl24 / depth24 arrays are always written, so even a snapshot
+of a single route takes about 50 MB (2^24 entries of 2 or 4 bytes plus
+2^24 depth bytes, and 4 KiB alignment per section); only tbl_long grows
+with the routes.
+
+File layout (little-endian):
+    header   magic "FIBSNAP\\0", format version, CRC-32 of everything after
+             the header, metadata length, section count, file size
+    metadata JSON: links, DIR-24-8 entry flag, route set digest
+    sections name, dtype, offset, count for each array, then the arrays
+             themselves, every one starting on a 4 KiB boundary:
+             tbl24, depth24, tbl_long, depth_long, free_blocks,
+             rib_network, rib_length, rib_link and the rib6_* arrays
+
+A snapshot with another magic, another format version, a wrong size, a
+checksum mismatch or (when the caller passes one) another route digest is
+rejected with ValueError. The RIB dict (needed for
+updates, routes() and route_batch) is rebuilt from the rib_* arrays on
+first use only, and the mapped tables are copied before the first update.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ip_utils import parse_cidr, parse_cidr6
+from router import DEFAULT_GATEWAY, Dir248Table, Router, np
+
+SNAPSHOT_MAGIC = b"FIBSNAP\0"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<8sIIIIQ")      # magic, version, crc32, meta length, sections, file size
+_SECTION = struct.Struct("<16s8sQQ")     # name, dtype, offset, count
+_ALIGN = 4096
+
+
+def _digest(networks: "np.ndarray", lengths: "np.ndarray", link_ids: "np.ndarray", links: List[str],
+            routes6: Iterable[Tuple[int, int, int]]) -> str:
+    """
+    SHA-256 of IPv4 routes (arrays of network, prefix length, index into
+    links, -1 = DEFAULT_GATEWAY) and IPv6 (network, prefix_len, link index)
+    routes, in canonical order and by link name.
+    """
+    names = list(links) + [DEFAULT_GATEWAY]          # index -1 -> DEFAULT_GATEWAY
+    order = np.lexsort((lengths, networks))
+    sha = hashlib.sha256()
+    sha.update(networks[order].astype("<u4").tobytes())
+    sha.update(lengths[order].astype("u1").tobytes())
+    sha.update("\n".join(map(names.__getitem__, link_ids[order].tolist())).encode())
+    for network, length, link in sorted((n, l, names[i]) for n, l, i in routes6):
+        sha.update(f"\0{network:x}/{length} {link}".encode())
+    return sha.hexdigest()
+
+
+def route_digest(routes: Iterable[Tuple[str, str]]) -> str:
+    """
+    SHA-256 (hex) of a route set given as (CIDR, link) pairs, e.g.
+    Router.routes(). Independent of route order and of how the CIDRs are
+    written (host bits, IPv6 zero compression); a prefix listed twice keeps
+    its last link, as in Router.
+    """
+    links: Dict[str, int] = {}
+    rib: Dict[Tuple[int, int], int] = {}
+    rib6: Dict[Tuple[int, int], int] = {}
+    for cidr, link in routes:
+        idx = links.setdefault(link, len(links))
+        if ":" in cidr:
+            network, _, length = parse_cidr6(cidr)
+            rib6[(network, length)] = idx
+        else:
+            network, _, length = parse_cidr(cidr)
+            rib[(network, length)] = idx
+    return _digest(np.fromiter((n for n, _ in rib), dtype=np.uint32, count=len(rib)),
+                   np.fromiter((l for _, l in rib), dtype=np.uint8, count=len(rib)),
+                   np.fromiter(rib.values(), dtype=np.int32, count=len(rib)), list(links),
+                   [(n, l, i) for (n, l), i in rib6.items()])
+
+
+def save_snapshot(router: Router, path: str) -> int:
+    """
+    Write `router` to `path` and return the file size. Routers using
+    another engine are compiled to DIR-24-8 tables for the snapshot. The
+    file is written next to `path` and renamed over it, so processes that
+    load concurrently never see a half-written snapshot.
+    """
+    links, table, rib, rib6 = router.forwarding_state()
+    used = table._n_blocks << 8
+    rib, rib6 = list(rib.items()), list(rib6.items())
+    sections = [
+        ("tbl24", table.tbl24), ("depth24", table.depth24),
+        ("tbl_long", table.tbl_long[:used]), ("depth_long", table.depth_long[:used]),
+        ("free_blocks", np.array(table._free_blocks, dtype=np.uint32)),
+        ("rib_network", np.array([n for (n, _), _ in rib], dtype=np.uint32)),
+        ("rib_length", np.array([l for (_, l), _ in rib], dtype=np.uint8)),
+        ("rib_link", np.array([i for _, i in rib], dtype=np.int32)),
+        ("rib6_high", np.array([n >> 64 for (n, _), _ in rib6], dtype=np.uint64)),
+        ("rib6_low", np.array([n & 0xFFFFFFFFFFFFFFFF for (n, _), _ in rib6], dtype=np.uint64)),
+        ("rib6_length", np.array([l for (_, l), _ in rib6], dtype=np.uint8)),
+        ("rib6_link", np.array([i for _, i in rib6], dtype=np.int32)),
+    ]
+    by_name = dict(sections)
+    digest = _digest(by_name["rib_network"], by_name["rib_length"], by_name["rib_link"], links,
+                     [(n, l, i) for (n, l), i in rib6])
+    meta = json.dumps({"links": links, "flag": table.flag, "routes_digest": digest}).encode()
+
+    # Lay the sections out after the header, metadata and section table
+    offset = _HEADER.size + len(meta) + _SECTION.size * len(sections)
+    toc, layout = [], []
+    for name, array in sections:
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        offset += -offset % _ALIGN
+        toc.append(_SECTION.pack(name.encode(), array.dtype.str.encode(), offset, len(array)))
+        layout.append((offset, array))
+        offset += array.nbytes
+    size = offset
+
+    crc = zlib.crc32(meta)
+    crc = zlib.crc32(b"".join(toc), crc)
+    position = _HEADER.size + len(meta) + len(toc) * _SECTION.size
+    for start, array in layout:
+        crc = zlib.crc32(bytes(start - position), crc)
+        crc = zlib.crc32(memoryview(array).cast("B"), crc)
+        position = start + array.nbytes
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, crc, len(meta), len(sections), size))
+        f.write(meta)
+        f.writelines(toc)
+        for start, array in layout:
+            f.seek(start)
+            f.write(memoryview(array).cast("B"))
+        f.truncate(size)
+    os.replace(tmp, path)
+    return size
+
+
+def _read_header(mm: mmap.mmap, path: str) -> Tuple[Dict[str, object], Dict[str, "np.ndarray"], int]:
+    if len(mm) < _HEADER.size:
+        raise ValueError(f"Not a FIB snapshot: {path}")
+    magic, version, crc, meta_len, count, size = _HEADER.unpack_from(mm, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"Not a FIB snapshot: {path}")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Stale FIB snapshot {path}: format version {version}, "
+                         f"expected {SNAPSHOT_VERSION}")
+    if size != len(mm):
+        raise ValueError(f"Truncated FIB snapshot {path}: {len(mm)} bytes, expected {size}")
+    meta = json.loads(bytes(mm[_HEADER.size:_HEADER.size + meta_len]))
+    arrays = {}
+    for i in range(count):
+        name, dtype, offset, length = _SECTION.unpack_from(mm, _HEADER.size + meta_len + i * _SECTION.size)
+        arrays[name.rstrip(b"\0").decode()] = np.frombuffer(
+            mm, dtype=dtype.rstrip(b"\0").decode(), count=length, offset=offset)
+    return meta, arrays, crc
+
+
+def load_snapshot(path: str, cache_size: int = 0, verify: bool = True,
+                  routes_digest: Optional[str] = None) -> Router:
+    """
+    Map a snapshot written by save_snapshot and return a dir24 Router that
+    serves lookups from the mapped tables. verify=False skips the checksum
+    pass over the file (the header checks still apply). routes_digest
+    (see route_digest) rejects a snapshot built from any other route set.
+    """
+    if np is None:
+        raise ImportError("FIB snapshots require NumPy")
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    meta, arrays, crc = _read_header(mm, path)
+    if routes_digest is not None and meta.get("routes_digest") != routes_digest:
+        raise ValueError(f"Stale FIB snapshot {path}: built from another route set")
+    if verify and zlib.crc32(memoryview(mm)[_HEADER.size:]) != crc:
+        raise ValueError(f"Corrupt FIB snapshot {path}: checksum mismatch")
+
+    def rib_loader() -> Dict[Tuple[int, int], int]:
+        keys = zip(arrays["rib_network"].tolist(), arrays["rib_length"].tolist())
+        return dict(zip(keys, arrays["rib_link"].tolist()))
+
+    table = Dir248Table()
+    table.adopt(arrays["tbl24"], arrays["depth24"], arrays["tbl_long"], arrays["depth_long"],
+                meta["flag"], arrays["free_blocks"].tolist(), rib_loader)
+    networks6 = [(high << 64) | low for high, low in
+                 zip(arrays["rib6_high"].tolist(), arrays["rib6_low"].tolist())]
+    rib6 = dict(zip(zip(networks6, arrays["rib6_length"].tolist()), arrays["rib6_link"].tolist()))
+    return Router.from_table("dir24", meta["links"], table, rib_loader, rib6, cache_size)
+
+
+# Quick manual test when run directly
+if __name__ == "__main__":
+    import tempfile
+
+    routes = [
+        ("223.1.1.0/24", "Link 0"),
+        ("223.1.2.0/24", "Link 1"),
+        ("223.1.3.0/24", "Link 2"),
+        ("223.1.0.0/16", "Link 4 (ISP)"),
+        ("223.1.3.128/25", "Link 3"),
+        ("2001:db8::/32", "Link 5"),
+    ]
+    path = os.path.join(tempfile.gettempdir(), "lab8_fib.snap")
+    print(f"wrote {save_snapshot(Router(routes, engine='trie'), path)} bytes to {path}")
+    router = load_snapshot(path, routes_digest=route_digest(routes))
+    for ip in ("223.1.1.100", "223.1.3.200", "223.1.250.1", "198.51.100.1", "2001:db8::1"):
+        print(f"{ip} -> {router.route_packet(ip)}")
+    try:
+        load_snapshot(path, routes_digest=route_digest(routes[1:]))
+    except ValueError as e:
+        print(e)
+    router.add_route("198.51.100.0/24", "Link 6")      # copies the mapped tables first
+    print("198.51.100.1 ->", router.route_packet("198.51.100.1"))
+    os.remove(path)
@@ -2,44 +2,173 @@
 """
 IP utilities: conversion between dotted-decimal IP and 32-bit binary,
 and extracting network prefix bits from a CIDR address.
+
+The integer API (ip_to_int, ips_to_array, int_to_ip, prefix_mask, parse_cidr)
+is what the forwarding path uses; the binary-string helpers are for display.
+IPv6 has the same integer API over 128-bit values (ipv6_to_int,
+int_to_ipv6, prefix_mask6, parse_cidr6), "::" compression included.
 """
 
+import socket
 from typing import Tuple
 
-def ip_to_binary(ip_address: str) -> str:
+_inet_pton = socket.inet_pton
+_AF_INET = socket.AF_INET
+_AF_INET6 = socket.AF_INET6
+_from_bytes = int.from_bytes
+
+# MASKS[n] is the 32-bit netmask of a /n prefix, MASKS6[n] the 128-bit one
+MASKS = tuple((0xFFFFFFFF << (32 - n)) & 0xFFFFFFFF for n in range(33))
+MASKS6 = tuple(((1 << 128) - 1) ^ ((1 << (128 - n)) - 1) for n in range(129))
+
+
+def _parse_octets(ip_address: str) -> int:
     """
-    Convert a dotted-decimal IPv4 address (e.g. "192.168.1.1")
-    into a 32-bit binary string (e.g. "11000000101010000000000100000001").
+    Slow path of ip_to_int: accepts what inet_pton rejects but int() allows
+    (e.g. leading zeros), with per-octet error messages.
     """
     octets = ip_address.split(".")
     if len(octets) != 4:
         raise ValueError(f"Invalid IPv4 address: {ip_address}")
-    binary_parts = []
+    value = 0
     for octet in octets:
-        num = int(octet)
+        try:
+            num = int(octet)
+        except ValueError:
+            raise ValueError(f"Invalid IPv4 address: {ip_address}")
         if num < 0 or num > 255:
             raise ValueError(f"Invalid octet value: {octet} in {ip_address}")
-        binary_parts.append(f"{num:08b}")
-    return "".join(binary_parts)
+        value = (value << 8) | num
+    return value
 
 
-def get_network_prefix(ip_cidr: str) -> str:
+def ip_to_int(ip_address: str) -> int:
     """
-    Given a CIDR string like "200.23.16.0/23", return the network prefix bits
-    as a binary string (e.g. first 23 bits).
+    Convert a dotted-decimal IPv4 address (e.g. "192.168.1.1")
+    into an unsigned 32-bit integer (e.g. 3232235777).
+    """
+    try:
+        return _from_bytes(_inet_pton(_AF_INET, ip_address), "big")
+    except OSError:
+        return _parse_octets(ip_address)
+
+
+def ips_to_array(addresses):
+    """
+    Bulk-convert an iterable of dotted-decimal strings (or integers) into a
+    NumPy uint32 array. Strings are packed with inet_pton and decoded in one
+    go; anything inet_pton rejects goes through ip_to_int. Requires NumPy.
+    """
+    import numpy as np
+
+    addresses = list(addresses)
+    if addresses and all(isinstance(a, str) for a in addresses):
+        try:
+            packed = b"".join([_inet_pton(_AF_INET, a) for a in addresses])
+            return np.frombuffer(packed, dtype=">u4").astype(np.uint32)
+        except OSError:
+            pass
+    return np.fromiter((a if isinstance(a, int) else ip_to_int(a) for a in addresses),
+                       dtype=np.uint32, count=len(addresses))
+
+
+def int_to_ip(value: int) -> str:
+    """
+    Convert an unsigned 32-bit integer back to dotted-decimal notation.
+    """
+    if value < 0 or value > 0xFFFFFFFF:
+        raise ValueError(f"Invalid IPv4 integer: {value}")
+    return socket.inet_ntop(_AF_INET, value.to_bytes(4, "big"))
+
+
+def prefix_mask(prefix_len: int) -> int:
+    """
+    Return the 32-bit netmask for a prefix length (e.g. 24 -> 0xFFFFFF00).
+    """
+    if prefix_len < 0 or prefix_len > 32:
+        raise ValueError(f"Invalid prefix length: {prefix_len}")
+    return MASKS[prefix_len]
+
+
+def parse_cidr(ip_cidr: str) -> Tuple[int, int, int]:
+    """
+    Given a CIDR string like "200.23.16.0/23", return
+    (network_int, mask_int, prefix_len). Host bits are cleared.
     """
     try:
         ip_part, prefix_len_str = ip_cidr.split("/")
+        prefix_len = int(prefix_len_str)
     except ValueError:
         raise ValueError(f"Invalid CIDR notation: {ip_cidr}")
-    prefix_len = int(prefix_len_str)
-    if prefix_len < 0 or prefix_len > 32:
+    mask = prefix_mask(prefix_len)
+    return ip_to_int(ip_part) & mask, mask, prefix_len
+
+
+def ipv6_to_int(ip_address: str) -> int:
+    """
+    Convert an IPv6 address (e.g. "2001:db8::1", "::ffff:192.0.2.1")
+    into an unsigned 128-bit integer.
+    """
+    try:
+        return _from_bytes(_inet_pton(_AF_INET6, ip_address), "big")
+    except OSError:
+        raise ValueError(f"Invalid IPv6 address: {ip_address}")
+
+
+def int_to_ipv6(value: int) -> str:
+    """
+    Convert an unsigned 128-bit integer to canonical (RFC 5952) IPv6 text.
+    """
+    if value < 0 or value >> 128:
+        raise ValueError(f"Invalid IPv6 integer: {value}")
+    return socket.inet_ntop(_AF_INET6, value.to_bytes(16, "big"))
+
+
+def prefix_mask6(prefix_len: int) -> int:
+    """
+    Return the 128-bit netmask for an IPv6 prefix length.
+    """
+    if prefix_len < 0 or prefix_len > 128:
         raise ValueError(f"Invalid prefix length: {prefix_len}")
-    full_bin = ip_to_binary(ip_part)
-    return full_bin[:prefix_len]
+    return MASKS6[prefix_len]
+
+
+def parse_cidr6(ip_cidr: str) -> Tuple[int, int, int]:
+    """
+    Given an IPv6 CIDR string like "2001:db8::/32", return
+    (network_int, mask_int, prefix_len). Host bits are cleared.
+    """
+    try:
+        ip_part, prefix_len_str = ip_cidr.split("/")
+        prefix_len = int(prefix_len_str)
+    except ValueError:
+        raise ValueError(f"Invalid CIDR notation: {ip_cidr}")
+    mask = prefix_mask6(prefix_len)
+    return ipv6_to_int(ip_part) & mask, mask, prefix_len
+
+
+def ip_to_binary(ip_address: str) -> str:
+    """
+    Convert a dotted-decimal IPv4 address (e.g. "192.168.1.1")
+    into a 32-bit binary string (e.g. "11000000101010000000000100000001").
+    """
+    return f"{ip_to_int(ip_address):032b}"
+
+
+def get_network_prefix(ip_cidr: str) -> str:
+    """
+    Given a CIDR string like "200.23.16.0/23", return the network prefix bits
+    as a binary string (e.g. first 23 bits).
+    """
+    network, _, prefix_len = parse_cidr(ip_cidr)
+    return f"{network:032b}"[:prefix_len]
 
 
 # Quick manual test when run directly
 if __name__ == "__main__":
     print("ip_to_binary('192.168.1.1') ->", ip_to_binary("192.168.1.1"))
     print("get_network_prefix('200.23.16.0/23') ->", get_network_prefix("200.23.16.0/23"))
+    print("ip_to_int('192.168.1.1') ->", ip_to_int("192.168.1.1"))
+    print("parse_cidr('200.23.16.0/23') ->", parse_cidr("200.23.16.0/23"))
+    print("ipv6_to_int('2001:db8::1') ->", hex(ipv6_to_int("2001:db8::1")))
+    print("parse_cidr6('2001:db8::/32') ->", parse_cidr6("2001:db8::/32"))
@@ -6,12 +6,23 @@ Runs all three parts of the assignment in sequence:
 1. IP Utilities
 2. Router Forwarding (LPM)
 3. Output Port Scheduling
+With --pipeline, also runs the parse -> LPM -> queue -> scheduler
+data-plane benchmark (pipeline.py) as part 4.
 """
 
+import argparse
+
 import ip_utils
 from router import Router
 from scheduler import Packet, fifo_scheduler, priority_scheduler
 
+parser = argparse.ArgumentParser(description="CN LAB 8 test runner")
+parser.add_argument("--pipeline", action="store_true",
+                    help="also run the data-plane pipeline benchmark")
+parser.add_argument("--packets", type=int, default=200_000,
+                    help="packets streamed by --pipeline")
+args = parser.parse_args()
+
 print("=" * 75)
 print("🌐  PART 1: IP Address and Subnet Utilities")
 print("=" * 75)
@@ -74,6 +85,15 @@ priority_result = priority_scheduler(packets)
 print("\nPriority Scheduler Order:")
 print(" -> ".join([p.payload for p in priority_result]))
 
+# ---------------------------------------------------------------------
+if args.pipeline:
+    import pipeline
+
+    print("\n" + "=" * 75)
+    print("🚀  PART 4: Data-Plane Pipeline (parse -> LPM -> queue -> scheduler)")
+    print("=" * 75)
+    pipeline.main(["--packets", str(args.packets)])
+
 print("\n" + "=" * 75)
 print("🏁  ALL TESTS COMPLETED SUCCESSFULLY")
 print("=" * 75)
@@ -0,0 +1,284 @@
+# pipeline.py
+"""
+Data-plane pipeline benchmark
+-----------------------------
+Streams packets through the whole Assignment_8 data path:
+
+    parse (dest IP -> int) -> LPM (Router) -> per-output-link queue
+    (one streaming scheduler per link) -> transmit (dequeue)
+
+Packets move in batches; every stage is timed per batch, and each packet's
+latency is measured from the moment its batch entered the pipeline to its
+dequeue. Reports packets/sec, ns per packet for each stage, per-link
+counts and a log2 latency histogram.
+
+Packets are synthetic (destinations mostly inside the routed prefixes) or
+replayed from a text file with one "source_ip dest_ip priority size" line
+per packet ('#' starts a comment).
+
+Usage:
+    python pipeline.py [--prefixes 100000] [--packets 1000000] [--mode batch|scalar]
+                       [--scheduler priority|drr|wfq] [--replay packets.txt]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ip_utils import int_to_ip, int_to_ipv6, ip_to_int, ips_to_array, parse_cidr
+from router import ENGINES, Router, np
+from scheduler import (DRRScheduler, Packet, StrictPriorityScheduler, StreamingScheduler,
+                       WFQScheduler)
+
+SCHEDULERS = {"priority": StrictPriorityScheduler, "drr": DRRScheduler, "wfq": WFQScheduler}
+STAGES = ("parse", "lpm", "queue", "transmit")
+
+# Rough shape of a real BGP table: most prefixes are /24, a good share
+# sits between /16 and /23, the rest is spread over the other lengths.
+PREFIX_LENGTH_WEIGHTS = {8: 1, 12: 1, 16: 8, 18: 4, 19: 6, 20: 8, 21: 8,
+                         22: 12, 23: 10, 24: 55, 28: 2, 32: 1}
+# IPv6 tables are dominated by /48s, then /32 and /44 allocations.
+PREFIX_LENGTH_WEIGHTS_V6 = {29: 2, 32: 10, 36: 4, 40: 6, 44: 8, 48: 55, 56: 8, 64: 7}
+
+
+# -----------------------------
+# Route and packet sources
+# -----------------------------
+def synthetic_routes(count: int, links: int = 16, seed: int = 1) -> List[Tuple[str, str]]:
+    """
+    Generate `count` distinct random (CIDR, output_link) tuples whose prefix
+    lengths follow PREFIX_LENGTH_WEIGHTS.
+    """
+    rng = random.Random(seed)
+    lengths = list(PREFIX_LENGTH_WEIGHTS)
+    weights = list(PREFIX_LENGTH_WEIGHTS.values())
+    seen = set()
+    routes = []
+    while len(routes) < count:
+        for length in rng.choices(lengths, weights, k=count - len(routes)):
+            network = rng.getrandbits(length) << (32 - length)
+            if (network, length) in seen:
+                continue
+            seen.add((network, length))
+            ip = ".".join(str((network >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+            routes.append((f"{ip}/{length}", f"Link {rng.randrange(links)}"))
+    return routes
+
+
+def synthetic_routes_v6(count: int, links: int = 16, seed: int = 1) -> List[Tuple[str, str]]:
+    """
+    Generate `count` distinct random IPv6 routes inside 2000::/3 whose
+    prefix lengths follow PREFIX_LENGTH_WEIGHTS_V6.
+    """
+    rng = random.Random(seed)
+    lengths = list(PREFIX_LENGTH_WEIGHTS_V6)
+    weights = list(PREFIX_LENGTH_WEIGHTS_V6.values())
+    seen = set()
+    routes = []
+    while len(routes) < count:
+        for length in rng.choices(lengths, weights, k=count - len(routes)):
+            network = ((0b001 << (length - 3)) | rng.getrandbits(length - 3)) << (128 - length)
+            if (network, length) in seen:
+                continue
+            seen.add((network, length))
+            routes.append((f"{int_to_ipv6(network)}/{length}", f"Link {rng.randrange(links)}"))
+    return routes
+
+
+def synthetic_packets(routes: List[tuple], count: int, hit_ratio: float = 0.9,
+                      seed: int = 8) -> Iterator[Packet]:
+    """
+    Generate `count` packets; a `hit_ratio` share is addressed inside a
+    random routed prefix, the rest to random addresses. Payload sizes are
+    drawn from a small IMIX-like set and shared between packets.
+    """
+    rng = random.Random(seed)
+    prefixes = [parse_cidr(cidr) for cidr, _ in routes]
+    payloads = ["x" * n for n in (64, 64, 64, 64, 64, 64, 64, 576, 576, 576, 576, 1500)]
+    for _ in range(count):
+        if prefixes and rng.random() < hit_ratio:
+            network, mask, _ = prefixes[int(rng.random() * len(prefixes))]
+            dest = network | (rng.getrandbits(32) & ~mask & 0xFFFFFFFF)
+        else:
+            dest = rng.getrandbits(32)
+        yield Packet("10.0.0.1", int_to_ip(dest), payloads[int(rng.random() * len(payloads))],
+                     int(rng.random() * 3))
+
+
+def read_packets(path: str) -> Iterator[Packet]:
+    """Replay packets from a 'source_ip dest_ip priority size' text file."""
+    payloads: Dict[int, str] = {}
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].split()
+            if not line:
+                continue
+            source, dest, priority, size = line
+            size = int(size)
+            payload = payloads.get(size)
+            if payload is None:
+                payload = payloads[size] = "x" * size
+            yield Packet(source, dest, payload, int(priority))
+
+
+# -----------------------------
+# Pipeline
+# -----------------------------
+class Pipeline:
+    """
+    Runs packets through parse -> LPM -> per-link queue -> transmit.
+    mode "batch" parses with ips_to_array and looks up with route_batch
+    (needs NumPy); "scalar" uses ip_to_int and Router.route_index per packet.
+    Each output link (and DEFAULT_GATEWAY) gets its own scheduler from
+    `scheduler_factory`; after every batch each link sends up to
+    `link_budget` packets (None = drain completely).
+    """
+    def __init__(self, router: Router, scheduler_factory: Callable[[], StreamingScheduler] = StrictPriorityScheduler,
+                 batch_size: int = 256, mode: str = "batch", link_budget: Optional[int] = None):
+        if mode not in ("batch", "scalar"):
+            raise ValueError(f"Unknown pipeline mode: {mode}")
+        if mode == "batch" and np is None:
+            raise ImportError("batch mode requires NumPy")
+        self.router = router
+        self.scheduler_factory = scheduler_factory
+        self.batch_size = batch_size
+        self.mode = mode
+        self.link_budget = link_budget
+        self.queues: Dict[int, StreamingScheduler] = {}
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        self.histogram: List[int] = [0] * 40     # bucket k: latency in [2^(k-1), 2^k) ns
+        self.packets = 0
+        self.sent = 0
+        self.wall_seconds = 0.0
+
+    def _queue(self, link: int) -> StreamingScheduler:
+        queue = self.queues.get(link)
+        if queue is None:
+            queue = self.queues[link] = self.scheduler_factory()
+        return queue
+
+    def run(self, packets: Iterable[Packet]):
+        """Push all packets through the pipeline, then drain the queues."""
+        it = iter(packets)
+        perf = time.perf_counter_ns
+        seconds = self.stage_seconds
+        router = self.router
+        batch_mode = self.mode == "batch"
+        start_wall = time.perf_counter()
+        while True:
+            batch = [pkt for _, pkt in zip(range(self.batch_size), it)]
+            if not batch:
+                break
+            ingress = perf()
+            dests = [pkt.dest_ip for pkt in batch]
+            if batch_mode:
+                addrs = ips_to_array(dests)
+            else:
+                addrs = [ip_to_int(dest) for dest in dests]
+            t_parse = perf()
+            if batch_mode:
+                links = router.route_batch(addrs).tolist()
+            else:
+                route = router.route_index
+                links = [route(addr) for addr in addrs]
+            t_lpm = perf()
+            queues = self.queues
+            for pkt, link in zip(batch, links):
+                scheduler = queues.get(link)
+                if scheduler is None:
+                    scheduler = self._queue(link)
+                scheduler.enqueue_item((pkt, ingress), scheduler.classify(pkt), scheduler.size(pkt))
+            t_queue = perf()
+            self._transmit(self.link_budget)
+            t_done = perf()
+            seconds["parse"] += (t_parse - ingress) / 1e9
+            seconds["lpm"] += (t_lpm - t_parse) / 1e9
+            seconds["queue"] += (t_queue - t_lpm) / 1e9
+            seconds["transmit"] += (t_done - t_queue) / 1e9
+            self.packets += len(batch)
+        start = perf()
+        self._transmit(None)
+        seconds["transmit"] += (perf() - start) / 1e9
+        self.wall_seconds += time.perf_counter() - start_wall
+
+    def _transmit(self, budget: Optional[int]):
+        perf = time.perf_counter_ns
+        histogram = self.histogram
+        top = len(histogram) - 1
+        for scheduler in self.queues.values():
+            n = len(scheduler) if budget is None else min(budget, len(scheduler))
+            if not n:
+                continue
+            now = perf()
+            for _ in range(n):
+                _, ingress = scheduler.dequeue()
+                histogram[min(top, max(0, now - ingress).bit_length())] += 1
+            self.sent += n
+
+    def latency_percentile(self, q: float) -> int:
+        """Upper edge (ns) of the histogram bucket holding the q-quantile."""
+        target = q * sum(self.histogram)
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= target:
+                return 1 << bucket
+        return 0
+
+    def report(self) -> Dict[str, object]:
+        total = sum(self.stage_seconds.values())
+        return {"packets": self.packets, "sent": self.sent,
+                "packets_per_second": self.packets / total if total else 0.0,
+                "wall_packets_per_second": self.packets / self.wall_seconds if self.wall_seconds else 0.0,
+                "stage_ns_per_packet": {stage: s * 1e9 / max(1, self.packets)
+                                        for stage, s in self.stage_seconds.items()},
+                "latency_p50_ns": self.latency_percentile(0.50),
+                "latency_p99_ns": self.latency_percentile(0.99),
+                "per_link": {self.router.link_name(link): sum(s["sent_packets"] for s in q.stats().values())
+                             for link, q in sorted(self.queues.items())}}
+
+
+def print_report(pipeline: Pipeline):
+    report = pipeline.report()
+    print(f"{report['packets']} packets, {report['packets_per_second']:,.0f} packets/s in the pipeline "
+          f"({report['wall_packets_per_second']:,.0f} packets/s including packet generation)")
+    print(f"{'stage':>10} {'ns/packet':>10} {'share':>7}")
+    total = sum(report["stage_ns_per_packet"].values())
+    for stage, ns in report["stage_ns_per_packet"].items():
+        print(f"{stage:>10} {ns:>10.0f} {ns / total:>7.1%}")
+    print(f"latency p50 < {report['latency_p50_ns'] / 1e3:.0f} us, p99 < {report['latency_p99_ns'] / 1e3:.0f} us")
+    peak = max(pipeline.histogram) or 1
+    for bucket, count in enumerate(pipeline.histogram):
+        if count:
+            print(f"  < {(1 << bucket) / 1e3:>10.1f} us {count:>9} {'#' * max(1, 50 * count // peak)}")
+    busiest = sorted(report["per_link"].items(), key=lambda e: -e[1])[:5]
+    print("busiest links:", ", ".join(f"{link}: {n}" for link, n in busiest))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="parse -> LPM -> queue -> scheduler pipeline benchmark")
+    parser.add_argument("--prefixes", type=int, default=100_000)
+    parser.add_argument("--packets", type=int, default=1_000_000)
+    parser.add_argument("--engine", choices=ENGINES, default="dir24")
+    parser.add_argument("--mode", choices=("batch", "scalar"), default="batch")
+    parser.add_argument("--scheduler", choices=tuple(SCHEDULERS), default="priority")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--link-budget", type=int, default=None,
+                        help="packets each link sends per batch (default: drain)")
+    parser.add_argument("--replay", help="packet file to replay instead of synthetic traffic")
+    args = parser.parse_args(argv)
+
+
+    routes = synthetic_routes(args.prefixes)
+    router = Router(routes, engine=args.engine)
+    packets = read_packets(args.replay) if args.replay else synthetic_packets(routes, args.packets)
+    pipeline = Pipeline(router, SCHEDULERS[args.scheduler], args.batch_size, args.mode, args.link_budget)
+    pipeline.run(packets)
+    print(f"{args.prefixes} prefixes ({args.engine}), {args.mode} mode, {args.scheduler} scheduler, "
+          f"batches of {args.batch_size}")
+    print_report(pipeline)
+
+
+if __name__ == "__main__":
+    main()
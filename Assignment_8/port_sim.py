@@ -0,0 +1,418 @@
+# port_sim.py
+"""
+Discrete-event output port simulation
+-------------------------------------
+Drives timed Packet arrivals into an output port that transmits at a fixed
+link rate, with a finite buffer and a streaming scheduler (scheduler.py)
+choosing the next packet:
+- Simulator        -> event heap and virtual clock (seconds)
+- OutputPort       -> link rate, buffer policy, scheduler, per-class stats
+- Buffer policies  -> TailDrop (byte / packet limit), RED (random early
+                      detection on the average queue), CoDel (sojourn-time
+                      AQM, drops at dequeue); all enforce the hard limit
+- PoissonSource / replay -> arrival processes (generated lazily, one
+                      pending arrival event at a time)
+
+Usage:
+    python port_sim.py --rate 10e9 --load 0.95 --buffer 1000000 --aqm codel
+    python port_sim.py --scheduler htb --load 1.2
+"""
+
+import argparse
+import bisect
+import heapq
+import itertools
+import math
+import random
+import time
+from array import array
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from scheduler import (DRRScheduler, HTBScheduler, Packet, StrictPriorityScheduler,
+                       StreamingScheduler, WFQScheduler)
+
+
+# -----------------------------
+# Event core
+# -----------------------------
+class Simulator:
+    """Event heap of (time, seq, callback, argument) with a virtual clock."""
+    def __init__(self):
+        self.now = 0.0
+        self.events = 0
+        self._heap: List[tuple] = []
+        self._seq = 0
+
+    def schedule(self, at: float, callback: Callable, arg=None):
+        heapq.heappush(self._heap, (at, self._seq, callback, arg))
+        self._seq += 1
+
+    def run(self, until: Optional[float] = None):
+        """Process events in time order (ties in scheduling order) until the heap is empty or `until`."""
+        heap = self._heap
+        pop = heapq.heappop
+        events = 0
+        while heap:
+            if until is not None and heap[0][0] > until:
+                self.now = until
+                break
+            at, _, callback, arg = pop(heap)
+            self.now = at
+            callback(arg)
+            events += 1
+        self.events += events
+
+
+# -----------------------------
+# Buffer policies
+# -----------------------------
+class TailDrop:
+    """Drop arrivals that would exceed limit_bytes or limit_packets (None = unlimited)."""
+    def __init__(self, limit_bytes: Optional[int] = None, limit_packets: Optional[int] = None):
+        self.limit_bytes = limit_bytes
+        self.limit_packets = limit_packets
+
+    def fits(self, port: "OutputPort", size: int) -> bool:
+        return ((self.limit_bytes is None or port.backlog_bytes + size <= self.limit_bytes)
+                and (self.limit_packets is None or len(port.scheduler) < self.limit_packets))
+
+    def admit(self, port: "OutputPort", size: int, now: float) -> bool:
+        return self.fits(port, size)
+
+    def dequeue(self, port: "OutputPort", now: float):
+        return port.take()
+
+
+class RED(TailDrop):
+    """
+    Random Early Detection (Floyd & Jacobson) on the average backlog in
+    bytes: EWMA with weight `weight`, no early drops below min_th, forced
+    drops above max_th, linear probability up to max_p in between (spread
+    out by the count since the last drop). While the queue is idle the
+    average decays as if empty packets of `idle_packet` bytes were sent.
+    """
+    def __init__(self, min_th: int, max_th: int, max_p: float = 0.1, weight: float = 0.002,
+                 limit_bytes: Optional[int] = None, idle_packet: int = 1000, seed: int = 1):
+        super().__init__(limit_bytes)
+        self.min_th = min_th
+        self.max_th = max_th
+        self.max_p = max_p
+        self.weight = weight
+        self.idle_packet = idle_packet
+        self.avg = 0.0
+        self._count = -1
+        self._idle_since: Optional[float] = 0.0
+        self._rng = random.Random(seed)
+
+    def admit(self, port: "OutputPort", size: int, now: float) -> bool:
+        if port.backlog_bytes or port.busy:
+            self.avg += self.weight * (port.backlog_bytes - self.avg)
+        else:
+            if self._idle_since is not None:
+                idle_packets = (now - self._idle_since) * port.rate_bps / (8 * self.idle_packet)
+                self.avg *= (1 - self.weight) ** idle_packets
+            self._idle_since = None
+        if self.avg < self.min_th:
+            self._count = -1
+        elif self.avg >= self.max_th:
+            self._count = 0
+            return False
+        else:
+            self._count += 1
+            pb = self.max_p * (self.avg - self.min_th) / (self.max_th - self.min_th)
+            pa = pb / max(1e-9, 1 - self._count * pb)
+            if self._rng.random() < pa:
+                self._count = 0
+                return False
+        return self.fits(port, size)
+
+    def dequeue(self, port: "OutputPort", now: float):
+        record = port.take()
+        if record is None:
+            self._idle_since = now
+        return record
+
+
+class CoDel(TailDrop):
+    """
+    Controlled Delay (RFC 8289): once packets of a class have waited longer
+    than `target` for at least `interval`, drop that class's packets at
+    dequeue at a rate growing with the square root of the drop count, until
+    its sojourn time falls back below target. State is kept per class (as
+    fq_codel keeps it per queue), so a class the scheduler serves promptly
+    does not mask a standing queue in another. Arrivals are only refused at
+    the hard buffer limit.
+    """
+    def __init__(self, target: float = 0.005, interval: float = 0.100,
+                 limit_bytes: Optional[int] = None, mtu: int = 1500):
+        super().__init__(limit_bytes)
+        self.target = target
+        self.interval = interval
+        self.mtu = mtu
+        # class -> [first_above_time, drop_next, count, last_count, dropping]
+        self._state: Dict[Hashable, list] = {}
+
+    def _ok_to_drop(self, state: list, record, port: "OutputPort", now: float) -> bool:
+        if now - record[1] < self.target or port.backlog_bytes <= self.mtu:
+            state[0] = 0.0
+            return False
+        if state[0] == 0.0:
+            state[0] = now + self.interval
+            return False
+        return now >= state[0]
+
+    def dequeue(self, port: "OutputPort", now: float):
+        while True:
+            record = port.take()
+            if record is None:
+                return None
+            state = self._state.get(record[2])
+            if state is None:
+                state = self._state[record[2]] = [0.0, 0.0, 0, 0, False]
+            ok_to_drop = self._ok_to_drop(state, record, port, now)
+            if state[4]:
+                if not ok_to_drop:
+                    state[4] = False
+                elif now >= state[1]:
+                    port.drop(record, now)
+                    state[2] += 1
+                    state[1] += self.interval / math.sqrt(state[2])
+                    continue
+            elif ok_to_drop:
+                port.drop(record, now)
+                state[4] = True
+                delta = state[2] - state[3]
+                state[2] = delta if delta > 1 and now - state[1] < 16 * self.interval else 1
+                state[3] = state[2]
+                state[1] = now + self.interval / math.sqrt(state[2])
+                continue
+            return record
+
+
+# -----------------------------
+# Output port
+# -----------------------------
+class OutputPort:
+    """
+    A link of `rate_bps` fed by `scheduler` (default strict priority) behind
+    `buffer` (default unlimited TailDrop). Packet sizes and classes come
+    from the scheduler's size / classify callables. Delay is measured from
+    arrival to the end of transmission. A scheduler with next_eligible()
+    (HTBScheduler, clocked by the simulator) may leave the link idle while
+    packets wait for tokens; the port wakes up when they become eligible.
+    """
+    def __init__(self, sim: Simulator, rate_bps: float,
+                 scheduler: Optional[StreamingScheduler] = None, buffer: Optional[TailDrop] = None):
+        self.sim = sim
+        self.rate_bps = rate_bps
+        self.scheduler = scheduler if scheduler is not None else StrictPriorityScheduler()
+        self.buffer = buffer if buffer is not None else TailDrop()
+        self.backlog_bytes = 0
+        self.busy = False
+        self._wake_at: Optional[float] = None
+        # class -> [arrived, arrived bytes, sent, sent bytes, refused, AQM drops]
+        self.counters: Dict[Hashable, List[int]] = {}
+        self.delays: Dict[Hashable, array] = {}
+        self._bytes_per_second = rate_bps / 8
+
+    def _class(self, cls: Hashable) -> List[int]:
+        counters = self.counters.get(cls)
+        if counters is None:
+            counters = self.counters[cls] = [0, 0, 0, 0, 0, 0]
+            self.delays[cls] = array("d")
+        return counters
+
+    def arrive(self, packet: Packet):
+        """Arrival of `packet` at the current simulation time."""
+        now = self.sim.now
+        scheduler = self.scheduler
+        cls = scheduler.classify(packet)
+        size = scheduler.size(packet)
+        counters = self._class(cls)
+        counters[0] += 1
+        counters[1] += size
+        if not self.buffer.admit(self, size, now):
+            counters[4] += 1
+            return
+        scheduler.enqueue_item((packet, now, cls, size), cls, size)
+        self.backlog_bytes += size
+        if not self.busy:
+            self._transmit_next(now)
+
+    def take(self):
+        """Next (packet, arrival time, class, size) from the scheduler, or None."""
+        record = self.scheduler.dequeue()
+        if record is not None:
+            self.backlog_bytes -= record[3]
+        return record
+
+    def drop(self, record, now: float):
+        """Account a packet the buffer policy discarded after dequeue."""
+        self.counters[record[2]][5] += 1
+
+    def _transmit_next(self, now: float):
+        record = self.buffer.dequeue(self, now)
+        if record is None:
+            self.busy = False
+            # A shaping scheduler (HTBScheduler) may hold packets back until
+            # its token buckets refill: come back when it says so. Never
+            # drop the wake-up, even if it claims to be due already
+            next_eligible = getattr(self.scheduler, "next_eligible", None)
+            if len(self.scheduler) and next_eligible is not None:
+                at = next_eligible()
+                if at is not None and at <= now:
+                    at = math.nextafter(now, math.inf)
+                if at is not None and at != self._wake_at:
+                    self._wake_at = at
+                    self.sim.schedule(at, self._wake)
+            return
+        self.busy = True
+        self.sim.schedule(now + record[3] / self._bytes_per_second, self._departed, record)
+
+    def _wake(self, _):
+        self._wake_at = None
+        if not self.busy:
+            self._transmit_next(self.sim.now)
+
+    def _departed(self, record):
+        _, arrival, cls, size = record
+        now = self.sim.now
+        counters = self.counters[cls]
+        counters[2] += 1
+        counters[3] += size
+        self.delays[cls].append(now - arrival)
+        self._transmit_next(now)
+
+    def report(self, duration: Optional[float] = None) -> Dict[Hashable, Dict[str, float]]:
+        """
+        Per-class counts, drops, throughput over `duration` (default: the
+        simulated time so far) and delay percentiles in seconds.
+        """
+        duration = duration or self.sim.now or 1.0
+        out = {}
+        for cls in sorted(self.counters):
+            arrived, _, sent, sent_bytes, refused, aqm = self.counters[cls]
+            delays = sorted(self.delays[cls])
+
+            def pct(q):
+                return delays[min(len(delays) - 1, int(q * len(delays)))] if delays else 0.0
+
+            out[cls] = {"arrived": arrived, "sent": sent, "dropped": refused + aqm,
+                        "aqm_drops": aqm, "drop_rate": (refused + aqm) / arrived if arrived else 0.0,
+                        "throughput_bps": sent_bytes * 8 / duration,
+                        "delay_p50": pct(0.50), "delay_p90": pct(0.90),
+                        "delay_p99": pct(0.99), "delay_max": delays[-1] if delays else 0.0}
+        return out
+
+
+# -----------------------------
+# Traffic sources
+# -----------------------------
+class PoissonSource:
+    """
+    Poisson arrivals of `count` packets at `rate_pps`. Each packet draws a
+    class from `class_mix` ({priority: share}) and a payload size from that
+    class's list in `sizes` ({priority: [bytes, ...]}).
+    """
+    def __init__(self, sim: Simulator, port: OutputPort, rate_pps: float, count: int,
+                 class_mix: Dict[int, float], sizes: Dict[int, List[int]], seed: int = 1):
+        self.sim = sim
+        self.port = port
+        self.rate_pps = rate_pps
+        self.remaining = count
+        self._rng = random.Random(seed)
+        self._classes = list(class_mix)
+        self._cum_weights = list(itertools.accumulate(class_mix.values()))
+        # One payload string per size, shared by all packets of that size
+        self._payloads = {cls: ["x" * n for n in sizes[cls]] for cls in self._classes}
+        sim.schedule(sim.now + self._rng.expovariate(rate_pps), self._arrival)
+
+    def _arrival(self, _):
+        rng = self._rng
+        cls = self._classes[bisect.bisect(self._cum_weights, rng.random() * self._cum_weights[-1])]
+        payloads = self._payloads[cls]
+        self.port.arrive(Packet("10.0.0.1", "10.0.0.2", payloads[int(rng.random() * len(payloads))], cls))
+        self.remaining -= 1
+        if self.remaining:
+            self.sim.schedule(self.sim.now + rng.expovariate(self.rate_pps), self._arrival)
+
+
+def replay(sim: Simulator, port: OutputPort, arrivals: Iterable[Tuple[float, Packet]]):
+    """Feed (time, packet) pairs, sorted by time, into `port` one event at a time."""
+    it = iter(arrivals)
+
+    def step(packet):
+        if packet is not None:
+            port.arrive(packet)
+        nxt = next(it, None)
+        if nxt is not None:
+            sim.schedule(nxt[0], step, nxt[1])
+
+    step(None)
+
+
+# -----------------------------
+# Command line
+# -----------------------------
+SCHEDULERS = {"priority": StrictPriorityScheduler, "drr": DRRScheduler, "wfq": WFQScheduler}
+CLASS_MIX = {0: 0.1, 1: 0.3, 2: 0.6}                      # voice, video, data
+CLASS_SIZES = {0: [160, 200], 1: [1200, 1400], 2: [64, 576, 1500, 1500]}
+
+
+def htb_scheduler(sim: Simulator, rate_bps: float) -> HTBScheduler:
+    """
+    One HTB root at the link rate; each class is guaranteed its CLASS_MIX
+    share, may borrow up to the full link and keeps its strict priority.
+    """
+    link = rate_bps / 8
+    htb = HTBScheduler(clock=lambda: sim.now)
+    htb.add_class("link", rate=link)
+    for cls, share in CLASS_MIX.items():
+        htb.add_class(cls, rate=share * link, ceil=link, parent="link", prio=cls)
+    return htb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Output port discrete-event simulation")
+    parser.add_argument("--rate", type=float, default=1e9, help="link rate in bit/s")
+    parser.add_argument("--load", type=float, default=0.95, help="offered load / link rate")
+    parser.add_argument("--packets", type=int, default=300_000)
+    parser.add_argument("--buffer", type=int, default=500_000, help="buffer size in bytes")
+    parser.add_argument("--aqm", choices=("taildrop", "red", "codel"), default="taildrop")
+    parser.add_argument("--scheduler", choices=tuple(SCHEDULERS) + ("htb",), default="priority")
+    args = parser.parse_args()
+
+    if args.aqm == "red":
+        buffer = RED(args.buffer // 4, args.buffer * 3 // 4, limit_bytes=args.buffer)
+    elif args.aqm == "codel":
+        buffer = CoDel(limit_bytes=args.buffer)
+    else:
+        buffer = TailDrop(limit_bytes=args.buffer)
+    mean_bytes = sum(share * sum(CLASS_SIZES[c]) / len(CLASS_SIZES[c]) for c, share in CLASS_MIX.items())
+    rate_pps = args.load * args.rate / (8 * mean_bytes)
+
+    sim = Simulator()
+    if args.scheduler == "htb":
+        scheduler = htb_scheduler(sim, args.rate)
+    else:
+        scheduler = SCHEDULERS[args.scheduler]()
+    port = OutputPort(sim, args.rate, scheduler, buffer)
+    PoissonSource(sim, port, rate_pps, args.packets, CLASS_MIX, CLASS_SIZES)
+    start = time.perf_counter()
+    sim.run()
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.packets} packets at {args.load:.0%} of {args.rate / 1e9:g} Gbit/s, "
+          f"{args.buffer} B buffer, {args.aqm}, {args.scheduler} scheduler")
+    print(f"simulated {sim.now * 1e3:.2f} ms, {sim.events} events in {elapsed:.2f} s "
+          f"({sim.events / elapsed:,.0f} events/s)")
+    print(f"{'class':>5} {'arrived':>9} {'sent':>9} {'drops':>7} {'drop %':>7} {'Mbit/s':>9} "
+          f"{'p50 (us)':>9} {'p90 (us)':>9} {'p99 (us)':>9} {'max (us)':>9}")
+    for cls, s in port.report().items():
+        print(f"{cls:>5} {s['arrived']:>9} {s['sent']:>9} {s['dropped']:>7} {s['drop_rate']:>7.2%} "
+              f"{s['throughput_bps'] / 1e6:>9.1f} {s['delay_p50'] * 1e6:>9.1f} {s['delay_p90'] * 1e6:>9.1f} "
+              f"{s['delay_p99'] * 1e6:>9.1f} {s['delay_max'] * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,48 +4,1025 @@ PART 2: Router Forwarding Table (Longest Prefix Match)
 -------------------------------------------------------
 Implements a Router class that performs:
 - Longest Prefix Matching (LPM) using a forwarding table.
+- Selectable lookup engines:
+    "linear" -> scan of the table sorted longest prefix first,
+                matching with integer mask-and-compare; an update costs a
+                list memmove (~1 ms at 1M routes, where trie and dir24
+                stay well under a millisecond)
+    "trie"   -> path-compressed binary trie over integer addresses,
+                at most 32 node visits per lookup regardless of table size
+    "dir24"  -> DIR-24-8 flat tables (NumPy), at most two array reads
+                per lookup; suited to read-mostly FIBs
+- Batched LPM over NumPy arrays of destinations (route_batch).
+- Incremental route updates (add_route / remove_route / replace_route /
+  apply_updates) without rebuilding the table.
+- Optional bounded LRU cache of destination -> result in front of the engine.
+  IPv4 lookups on the dir24 engine skip it: two array reads are cheaper
+  than the cache bookkeeping, so it only pays off for linear and trie (and
+  for IPv6 destinations).
+- Dual stack: IPv6 routes and destinations (anything containing ":") go to
+  a separate 128-bit stride trie, whatever the IPv4 engine is. route_batch
+  and the dir24 engine are IPv4-only.
+
+Engines store next hops as small integer indices into Router.links; a
+route whose link is DEFAULT_GATEWAY is a null route (index -1) that hides
+shorter covering prefixes.
 """
 
-from typing import List, Tuple
-from ip_utils import ip_to_binary, get_network_prefix
+import bisect
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from ip_utils import (MASKS, MASKS6, int_to_ip, int_to_ipv6, ip_to_int, ips_to_array,
+                      ipv6_to_int, parse_cidr, parse_cidr6)
+
+try:
+    import numpy as np
+except ImportError:  # only route_batch and the dir24 engine need NumPy
+    np = None
+
+
+ENGINES = ("linear", "trie", "dir24")
+DEFAULT_GATEWAY = "Default Gateway"
+NULL_ROUTE = -1
+_UPDATE_ARITY = {"add": 3, "remove": 2, "replace": 3}    # apply_updates tuple lengths
+
+
+# -----------------------------
+# Lookup engines
+# -----------------------------
+class LinearTable:
+    """
+    The original forwarding table, scanned longest prefix first until the
+    first match. Entries are (-prefix_len, network, mask, value) tuples
+    kept in sorted order, so an update finds its slot by binary search:
+    O(log n) compares plus one list memmove (about a millisecond at 1M
+    routes; only trie and dir24 update in microseconds).
+    """
+    def __init__(self):
+        self._forwarding_table = []
+
+    def build(self, entries: List[Tuple[int, int, object]]):
+        # Sorted longest prefix first (then by network)
+        self._forwarding_table = sorted((-length, network, MASKS[length], value)
+                                        for network, length, value in entries)
+
+    def lookup(self, addr: int):
+        for _, network, mask, value in self._forwarding_table:
+            if addr & mask == network:
+                return value
+        return None
+
+    def _find(self, network: int, length: int):
+        table = self._forwarding_table
+        pos = bisect.bisect_left(table, (-length, network))
+        found = pos < len(table) and table[pos][0] == -length and table[pos][1] == network
+        return pos, found
+
+    def insert(self, network: int, length: int, value):
+        """Overwrite the entry or insert it in sorted position."""
+        pos, found = self._find(network, length)
+        entry = (-length, network, MASKS[length], value)
+        if found:
+            self._forwarding_table[pos] = entry
+        else:
+            self._forwarding_table.insert(pos, entry)
+
+    def remove(self, network: int, length: int):
+        pos, found = self._find(network, length)
+        if not found:
+            raise KeyError((network, length))
+        del self._forwarding_table[pos]
+
+    def memory_bytes(self) -> int:
+        table = self._forwarding_table
+        size = sys.getsizeof(table)
+        for entry in table:
+            size += sys.getsizeof(entry) + sys.getsizeof(entry[1]) + sys.getsizeof(entry[2])
+        return size
+
+    def __len__(self):
+        return len(self._forwarding_table)
+
+
+class _TrieNode:
+    __slots__ = ("prefix", "length", "value", "children")
+
+    def __init__(self, prefix: int, length: int, value=None):
+        self.prefix = prefix        # network address (host bits zero)
+        self.length = length        # prefix length in bits
+        self.value = value          # None if this node only joins two branches
+        self.children = [None, None]
+
+
+class BinaryTrie:
+    """
+    Path-compressed binary trie (Patricia tree) keyed by 32-bit integers.
+    Chains of single-child nodes are collapsed, so every node either holds
+    a route or is a branching point; a lookup follows at most 32 edges.
+    """
+    def __init__(self):
+        self._root = _TrieNode(0, 0)
+        self._size = 0
+
+    def build(self, entries: List[Tuple[int, int, object]]):
+        self._root = _TrieNode(0, 0)
+        self._size = 0
+        for network, length, value in entries:
+            self.insert(network, length, value)
+
+    def insert(self, network: int, length: int, value):
+        node = self._root
+        while True:
+            if node.length == length:
+                if node.value is None:
+                    self._size += 1
+                node.value = value
+                return
+            bit = (network >> (31 - node.length)) & 1
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = _TrieNode(network, length, value)
+                self._size += 1
+                return
+            # Length of the prefix shared by the new route and the child
+            limit = min(child.length, length)
+            common = limit - ((child.prefix ^ network) >> (32 - limit)).bit_length()
+            if common == child.length:
+                node = child
+                continue
+            if common == length:
+                # New route sits between node and child
+                new = _TrieNode(network, length, value)
+                new.children[(child.prefix >> (31 - length)) & 1] = child
+            else:
+                # Routes diverge below node: add a branching node
+                new = _TrieNode(network >> (32 - common) << (32 - common), common)
+                new.children[(child.prefix >> (31 - common)) & 1] = child
+                new.children[(network >> (31 - common)) & 1] = _TrieNode(network, length, value)
+            node.children[bit] = new
+            self._size += 1
+            return
+
+    def remove(self, network: int, length: int):
+        """
+        Withdraw a route, splicing out nodes that no longer hold a route or
+        branch. Each structural change is a single child-pointer store, so a
+        concurrent lookup sees either the old or the new path.
+        """
+        grand, grand_bit = None, 0
+        parent, bit, node = None, 0, self._root
+        while node.length < length:
+            b = (network >> (31 - node.length)) & 1
+            child = node.children[b]
+            if (child is None or child.length > length
+                    or (network ^ child.prefix) >> (32 - child.length)):
+                raise KeyError((network, length))
+            grand, grand_bit = parent, bit
+            parent, bit, node = node, b, child
+        if node.prefix != network or node.value is None:
+            raise KeyError((network, length))
+        node.value = None
+        self._size -= 1
+        if parent is None:
+            return
+        left, right = node.children
+        if left is not None and right is not None:
+            return          # still a branching point
+        parent.children[bit] = left if left is not None else right
+        if left is None and right is None and grand is not None and parent.value is None:
+            # parent was a pure branching node and now has one child
+            grand.children[grand_bit] = parent.children[bit ^ 1]
+
+    def lookup(self, addr: int):
+        node = self._root
+        best = node.value
+        while node.length < 32:
+            node = node.children[(addr >> (31 - node.length)) & 1]
+            if node is None or (addr ^ node.prefix) >> (32 - node.length):
+                break
+            if node.value is not None:
+                best = node.value
+        return best
+
+    def memory_bytes(self) -> int:
+        size = 0
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            size += sys.getsizeof(node) + sys.getsizeof(node.children) + sys.getsizeof(node.prefix)
+            stack.extend(child for child in node.children if child is not None)
+        return size
+
+    def __len__(self):
+        return self._size
+
+
+class Dir248Table:
+    """
+    DIR-24-8 lookup tables.
+    tbl24 has one entry per /24 (2^24 entries). An entry is either
+    link_index + 1 (0 = no route) or, with FLAG set, the number of a
+    256-entry block in tbl_long that resolves the last octet for prefixes
+    longer than /24. Entries are uint16 while links and blocks fit in
+    15 bits, uint32 otherwise.
+    depth24 / depth_long record the prefix length that wrote each entry, so
+    a route can be inserted or withdrawn by rewriting only its own range.
+    """
+    def __init__(self):
+        if np is None:
+            raise ImportError("the dir24 engine requires NumPy")
+        self.tbl24 = np.zeros(1 << 24, dtype=np.uint16)
+        self.depth24 = np.zeros(1 << 24, dtype=np.uint8)
+        self.tbl_long = np.zeros(0, dtype=np.uint16)
+        self.depth_long = np.zeros(0, dtype=np.uint8)
+        self.flag = 0x8000
+        self._routes = {}
+        self._n_blocks = 0
+        self._free_blocks: List[int] = []
+
+    @property
+    def _routes(self) -> Dict[Tuple[int, int], int]:
+        # Tables adopted from a snapshot build the route dict on first use
+        if self._routes_loader is not None:
+            self._route_map, self._routes_loader = self._routes_loader(), None
+        return self._route_map
+
+    @_routes.setter
+    def _routes(self, routes: Dict[Tuple[int, int], int]):
+        self._route_map, self._routes_loader = routes, None
+
+    def adopt(self, tbl24, depth24, tbl_long, depth_long, flag: int,
+              free_blocks: List[int], routes_loader):
+        """
+        Take over prebuilt tables (e.g. read-only views of a mapped
+        snapshot) instead of building them. routes_loader() returns the
+        {(network, prefix_len): link index} dict when it is first needed;
+        read-only tables are copied before the first update.
+        """
+        self.tbl24, self.depth24 = tbl24, depth24
+        self.tbl_long, self.depth_long = tbl_long, depth_long
+        self.flag = flag
+        self._n_blocks = len(tbl_long) >> 8
+        self._free_blocks = list(free_blocks)
+        self._route_map, self._routes_loader = None, routes_loader
+
+    def _make_writable(self):
+        if not self.tbl24.flags.writeable:
+            self.tbl24, self.depth24 = self.tbl24.copy(), self.depth24.copy()
+            self.tbl_long, self.depth_long = self.tbl_long.copy(), self.depth_long.copy()
+
+    def copy(self) -> "Dir248Table":
+        """Independent, writable copy of the tables and their route dict."""
+        table = Dir248Table.__new__(Dir248Table)
+        table.tbl24, table.depth24 = self.tbl24.copy(), self.depth24.copy()
+        table.tbl_long, table.depth_long = self.tbl_long.copy(), self.depth_long.copy()
+        table.flag = self.flag
+        table._n_blocks = self._n_blocks
+        table._free_blocks = list(self._free_blocks)
+        table._routes = dict(self._routes)
+        return table
+
+    def build(self, entries: List[Tuple[int, int, int]]):
+        entries = sorted(entries, key=lambda e: e[1])   # shortest first, longer overwrite
+        short = [e for e in entries if e[1] <= 24]
+        long = [e for e in entries if e[1] > 24]
+        blocks = {}                                     # /24 index -> block number
+        for network, _, _ in long:
+            blocks.setdefault(network >> 8, len(blocks))
+        max_value = max([idx for _, _, idx in entries] + [0]) + 1
+        if max_value < 0x8000 and len(blocks) < 0x8000:
+            dtype, flag = np.uint16, 0x8000
+        else:
+            dtype, flag = np.uint32, 0x80000000
+
+        tbl24 = np.zeros(1 << 24, dtype=dtype)
+        depth24 = np.zeros(1 << 24, dtype=np.uint8)
+        for network, length, idx in short:
+            start = network >> 8
+            end = start + (1 << (24 - length))
+            tbl24[start:end] = idx + 1
+            depth24[start:end] = length
+        # Blocks start out with the covering (<= /24) result of their /24
+        hi = np.fromiter(blocks, dtype=np.int64, count=len(blocks))
+        tbl_long = np.repeat(tbl24[hi], 256)
+        depth_long = np.repeat(depth24[hi], 256)
+        for network, length, idx in long:
+            start = (blocks[network >> 8] << 8) | (network & 0xFF)
+            end = start + (1 << (32 - length))
+            tbl_long[start:end] = idx + 1
+            depth_long[start:end] = length
+        tbl24[hi] = flag | np.arange(len(blocks), dtype=dtype)
+
+        self.tbl24, self.depth24 = tbl24, depth24
+        self.tbl_long, self.depth_long = tbl_long, depth_long
+        self.flag = flag
+        self._routes = {(network, length): idx for network, length, idx in entries}
+        self._n_blocks = len(blocks)
+        self._free_blocks = []
+
+    def lookup(self, addr: int):
+        e = int(self.tbl24[addr >> 8])
+        if e & self.flag:
+            e = int(self.tbl_long[((e ^ self.flag) << 8) | (addr & 0xFF)])
+        return e - 1 if e else None
+
+    def lookup_batch(self, addrs: "np.ndarray") -> "np.ndarray":
+        return self.lookup_arrays(self.tbl24, self.tbl_long, self.flag, addrs)
+
+    @staticmethod
+    def lookup_arrays(tbl24: "np.ndarray", tbl_long: "np.ndarray", flag: int,
+                      addrs: "np.ndarray") -> "np.ndarray":
+        """
+        Batch lookup on bare tbl24 / tbl_long arrays (e.g. views of shared
+        memory); returns int32 link indices, -1 where there is no route.
+        """
+        e = tbl24[addrs >> 8]
+        long = (e & flag) != 0
+        if long.any():
+            block = (e[long] ^ flag).astype(np.int64)
+            e[long] = tbl_long[(block << 8) | (addrs[long] & 0xFF)]
+        return e.astype(np.int32) - 1
+
+    # -- incremental updates --
+    def insert(self, network: int, length: int, value: int):
+        self._make_writable()
+        self._routes[(network, length)] = value
+        if value + 1 >= self.flag:
+            self._widen()
+        self._rewrite(network, length, lambda depth: depth <= length, value + 1, length)
+
+    def remove(self, network: int, length: int):
+        del self._routes[(network, length)]
+        self._make_writable()
+        # Entries written by this route fall back to the next covering route
+        value, depth = 0, 0
+        for shorter in range(length - 1, -1, -1):
+            idx = self._routes.get((network & MASKS[shorter], shorter))
+            if idx is not None:
+                value, depth = idx + 1, shorter
+                break
+        self._rewrite(network, length, lambda d: d == length, value, depth)
+        if length > 24:
+            self._release_block(network >> 8)
+
+    def _rewrite(self, network: int, length: int, select, value: int, depth: int):
+        """
+        Set entries in the range of network/length for which select(depth)
+        holds to (value, depth), descending into the blocks under the range.
+        """
+        if length > 24:
+            base = self._block_of(network >> 8) << 8
+            start = base | (network & 0xFF)
+            blocks = [(start, start + (1 << (32 - length)))]
+        else:
+            start = network >> 8
+            seg = self.tbl24[start:start + (1 << (24 - length))]
+            seg_depth = self.depth24[start:start + (1 << (24 - length))]
+            flagged = (seg & self.flag) != 0
+            hit = ~flagged & select(seg_depth)
+            seg[hit] = value
+            seg_depth[hit] = depth
+            blocks = [(b << 8, (b << 8) + 256) for b in (seg[flagged] ^ self.flag).tolist()]
+        for lo, hi in blocks:
+            block = self.tbl_long[lo:hi]
+            block_depth = self.depth_long[lo:hi]
+            hit = select(block_depth)
+            block[hit] = value
+            block_depth[hit] = depth
+
+    def _block_of(self, slot: int) -> int:
+        """Block number for a /24 slot, allocating it on first use."""
+        e = int(self.tbl24[slot])
+        if e & self.flag:
+            return e ^ self.flag
+        if self._free_blocks:
+            block = self._free_blocks.pop()
+        else:
+            block = self._n_blocks
+            if block + 1 >= self.flag:
+                self._widen()
+            if (block + 1) << 8 > len(self.tbl_long):
+                # Grow geometrically; the new array is published before any
+                # tbl24 entry points into it.
+                extra = max(len(self.tbl_long), 256)
+                self.depth_long = np.concatenate([self.depth_long, np.zeros(extra, np.uint8)])
+                self.tbl_long = np.concatenate([self.tbl_long, np.zeros(extra, self.tbl_long.dtype)])
+            self._n_blocks += 1
+        lo = block << 8
+        self.tbl_long[lo:lo + 256] = e
+        self.depth_long[lo:lo + 256] = self.depth24[slot]
+        self.tbl24[slot] = self.flag | block
+        return block
+
+    def _release_block(self, slot: int):
+        """Fold a block back into tbl24 once no route longer than /24 uses it."""
+        block = int(self.tbl24[slot]) ^ self.flag
+        lo = block << 8
+        if (self.depth_long[lo:lo + 256] > 24).any():
+            return
+        self.depth24[slot] = self.depth_long[lo]
+        self.tbl24[slot] = self.tbl_long[lo]
+        self._free_blocks.append(block)
+
+    def _widen(self):
+        """Switch from uint16 to uint32 entries (more links or blocks than 15 bits hold)."""
+        if self.flag == 0x80000000:
+            return
+        tbl24 = self.tbl24.astype(np.uint32)
+        flagged = (tbl24 & 0x8000) != 0
+        tbl24[flagged] = (tbl24[flagged] ^ 0x8000) | 0x80000000
+        self.tbl_long = self.tbl_long.astype(np.uint32)
+        self.tbl24, self.flag = tbl24, 0x80000000
+
+    def memory_bytes(self) -> int:
+        return (self.tbl24.nbytes + self.depth24.nbytes
+                + self.tbl_long.nbytes + self.depth_long.nbytes)
+
+    def __len__(self):
+        return len(self._routes)
+
+
+class _StrideNode:
+    __slots__ = ("children", "slots")
+
+    def __init__(self):
+        self.children = {}      # chunk -> _StrideNode
+        self.slots = {}         # chunk -> (local_len, value), prefixes expanded
+
+
+class StrideTrie:
+    """
+    Multibit trie for wide addresses (IPv6 by default): every level consumes
+    `stride` bits, so a /128 lookup visits at most width / stride nodes
+    (16 with the default stride of 8) instead of walking 128 binary levels.
+    Prefixes that do not end on a stride boundary are expanded over the
+    slots they cover (controlled prefix expansion); nodes keep only the
+    slots and children in use, so sparse tables stay small.
+    """
+    def __init__(self, width: int = 128, stride: int = 8):
+        if width % stride:
+            raise ValueError(f"Stride {stride} does not divide width {width}")
+        self.width = width
+        self.stride = stride
+        self._root = _StrideNode()
+        self._default = None        # the /0 route
+        self._prefixes = {}         # (network, length) -> value, as inserted
+
+    def build(self, entries: List[Tuple[int, int, int]]):
+        self._root = _StrideNode()
+        self._default = None
+        self._prefixes = {}
+        for network, length, value in entries:
+            self.insert(network, length, value)
 
+    def _locate(self, network: int, length: int, create: bool):
+        """Return (path, node, slot bits, local length) for a prefix."""
+        level, local_len = divmod(length - 1, self.stride)
+        local_len += 1
+        cmask = (1 << self.stride) - 1
+        path = []
+        node = self._root
+        shift = self.width - self.stride
+        for _ in range(level):
+            chunk = (network >> shift) & cmask
+            child = node.children.get(chunk)
+            if child is None:
+                if not create:
+                    raise KeyError((network, length))
+                child = node.children[chunk] = _StrideNode()
+            path.append((node, chunk))
+            node = child
+            shift -= self.stride
+        bits = ((network >> shift) & cmask) >> (self.stride - local_len)
+        return path, node, bits, local_len
 
+    def insert(self, network: int, length: int, value):
+        self._prefixes[(network, length)] = value
+        if length == 0:
+            self._default = value
+            return
+        _, node, bits, local_len = self._locate(network, length, create=True)
+        base = bits << (self.stride - local_len)
+        entry = (local_len, value)
+        slots = node.slots
+        for slot in range(base, base + (1 << (self.stride - local_len))):
+            current = slots.get(slot)
+            if current is None or current[0] <= local_len:
+                slots[slot] = entry
+
+    def remove(self, network: int, length: int):
+        del self._prefixes[(network, length)]
+        if length == 0:
+            self._default = None
+            return
+        path, node, bits, local_len = self._locate(network, length, create=False)
+        base = bits << (self.stride - local_len)
+        start = length - local_len          # prefix length at the top of this node
+        prefixes = self._prefixes
+        for slot in range(base, base + (1 << (self.stride - local_len))):
+            current = node.slots.get(slot)
+            if current is None or current[0] != local_len:
+                continue
+            # Fall back to the longest shorter prefix of this node covering the slot
+            addr = network | (slot << (self.width - start - self.stride))
+            for shorter in range(local_len - 1, 0, -1):
+                value = prefixes.get((addr & self._mask(start + shorter), start + shorter))
+                if value is not None:
+                    node.slots[slot] = (shorter, value)
+                    break
+            else:
+                del node.slots[slot]
+        # Drop nodes left without routes or children
+        while path and not (node.slots or node.children):
+            parent, chunk = path.pop()
+            del parent.children[chunk]
+            node = parent
+
+    def lookup(self, addr: int):
+        best = self._default
+        cmask = (1 << self.stride) - 1
+        shift = self.width - self.stride
+        node = self._root
+        while node is not None:
+            chunk = (addr >> shift) & cmask
+            hit = node.slots.get(chunk)
+            if hit is not None:
+                best = hit[1]
+            node = node.children.get(chunk)
+            shift -= self.stride
+        return best
+
+    def _mask(self, length: int) -> int:
+        return ((1 << length) - 1) << (self.width - length)
+
+    def memory_bytes(self) -> int:
+        # Containers measured exactly, their items at an estimated 64 bytes
+        size = sys.getsizeof(self._prefixes) + 64 * len(self._prefixes)
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            size += (sys.getsizeof(node) + sys.getsizeof(node.children)
+                     + sys.getsizeof(node.slots) + 64 * len(node.slots))
+            stack.extend(node.children.values())
+        return size
+
+    def __len__(self):
+        return len(self._prefixes)
+
+
+# -----------------------------
+# Destination cache
+# -----------------------------
+class LPMCache:
+    """
+    Bounded LRU map dest_ip -> (addr, link index or None, width) with
+    hit/miss counters. Keys are the destination strings as given to
+    route_packet, so a hit skips address parsing as well as the table lookup.
+    Entries are also bucketed by the top 16 bits of their address (per
+    address width), so invalidating a route only inspects the destinations
+    that can fall inside it.
+    """
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"Invalid cache capacity: {capacity}")
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._buckets: Dict[int, Dict[int, set]] = {32: {}, 128: {}}
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    def get(self, dest_ip: str):
+        entry = self._entries.get(dest_ip)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self._entries.move_to_end(dest_ip)
+        except KeyError:    # evicted by a concurrent reader
+            pass
+        return entry
+
+    def put(self, dest_ip: str, addr: int, idx, width: int = 32):
+        entries = self._entries
+        entries[dest_ip] = (addr, idx, width)
+        self._buckets[width].setdefault(addr >> (width - 16), set()).add(dest_ip)
+        if len(entries) > self.capacity:
+            try:
+                old_key, (old_addr, _, old_width) = entries.popitem(last=False)
+            except KeyError:
+                return
+            self._unbucket(old_key, old_addr, old_width)
+
+    def discard(self, dest_ip: str):
+        entry = self._entries.pop(dest_ip, None)
+        if entry is not None:
+            self._unbucket(dest_ip, entry[0], entry[2])
+
+    def _unbucket(self, dest_ip: str, addr: int, width: int):
+        buckets = self._buckets[width]
+        bucket = buckets.get(addr >> (width - 16))
+        if bucket is not None:
+            bucket.discard(dest_ip)
+            if not bucket:
+                buckets.pop(addr >> (width - 16), None)
+
+    def invalidate(self, prefixes: Iterable[Tuple[int, int]], width: int = 32):
+        """
+        Drop every cached destination of the given address width covered by
+        one of the (network, prefix_len) pairs.
+        """
+        buckets = self._buckets[width]
+        masks = MASKS if width == 32 else MASKS6
+        for network, length in prefixes:
+            if length >= 16:
+                keys = list(buckets.get(network >> (width - 16), ()))
+            else:
+                shift = width - length
+                keys = [key for b, bucket in list(buckets.items())
+                        if (b << (width - 16)) >> shift == network >> shift for key in list(bucket)]
+            mask = masks[length]
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[2] == width and entry[0] & mask == network:
+                    self.discard(key)
+                    self.invalidated += 1
+
+    def clear(self):
+        self._entries.clear()
+        for buckets in self._buckets.values():
+            buckets.clear()
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {"capacity": self.capacity, "entries": len(self._entries),
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidated": self.invalidated}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# -----------------------------
+# Router
+# -----------------------------
 class Router:
-    def __init__(self, routes: List[Tuple[str, str]]):
+    def __init__(self, routes: List[Tuple[str, str]], engine: str = "linear",
+                 cache_size: int = 0):
         """
         Initialize router with a list of (CIDR, output_link) tuples.
         Example:
             [("223.1.1.0/24", "Link 0"), ("223.1.2.0/24", "Link 1")]
+        engine selects the lookup structure, one of ENGINES.
+        cache_size > 0 puts an LRU cache of that many destinations in front
+        of route_packet (IPv6 only with the dir24 engine, see the module
+        docstring).
         """
-        self._forwarding_table = []
+        self._setup(engine, cache_size)
         self._build_forwarding_table(routes)
 
+    @classmethod
+    def from_table(cls, engine: str, links: List[str], table, rib_loader,
+                   rib6: Optional[Dict[Tuple[int, int], int]] = None,
+                   cache_size: int = 0) -> "Router":
+        """
+        Wrap an IPv4 lookup engine that is already built (e.g. mapped from
+        a snapshot by fib_snapshot) instead of building one from routes.
+        rib_loader() returns the {(network, prefix_len): link index} dict;
+        it is only called when the RIB is first needed (updates, routes(),
+        route_batch index).
+        """
+        router = cls.__new__(cls)
+        router._setup(engine, cache_size)
+        for link in links:
+            router._link_id(link)
+        router._table = table
+        router._rib_loader = rib_loader
+        if rib6:
+            router._rib6 = dict(rib6)
+            router._table6.build([(network, length, idx) for (network, length), idx in rib6.items()])
+        return router
+
+    def _setup(self, engine: str, cache_size: int):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine} (expected one of {ENGINES})")
+        self.engine = engine
+        self.links: List[str] = []              # next-hop index -> output link
+        self._link_index: Dict[str, int] = {}
+        self._rib = {}                          # (network, prefix_len) -> link index
+        self._rib6: Dict[Tuple[int, int], int] = {}  # same for IPv6 routes
+        self._batch_index = None
+        self.build_seconds = 0.0
+        # Writers hold the lock and bump the generation to odd while a batch
+        # is applied; readers retry if it changed under them (seqlock).
+        self._update_lock = threading.Lock()
+        self._generation = 0
+        self._cache = LPMCache(cache_size) if cache_size else None
+        self._cache4 = None if engine == "dir24" else self._cache
+        self._table = {"linear": LinearTable, "trie": BinaryTrie, "dir24": Dir248Table}[engine]()
+        self._table6 = StrideTrie()
+
+    @property
+    def _rib(self) -> Dict[Tuple[int, int], int]:
+        if self._rib_loader is not None:
+            self._rib_map, self._rib_loader = self._rib_loader(), None
+        return self._rib_map
+
+    @_rib.setter
+    def _rib(self, rib: Dict[Tuple[int, int], int]):
+        self._rib_map, self._rib_loader = rib, None
+
+    @property
+    def _forwarding_table(self):
+        # The linear engine's sorted table (empty for other engines)
+        return getattr(self._table, "_forwarding_table", [])
+
     def _build_forwarding_table(self, routes: List[Tuple[str, str]]):
         """
-        Build internal forwarding table with binary prefixes.
-        Sort by prefix length (descending) for easy LPM.
+        Parse routes into (network_int, prefix_len, link_index) entries and
+        load them into the selected lookup engine (IPv6 into the stride trie).
         """
-        table = []
+        rib, rib6 = {}, {}
         for cidr, out_link in routes:
-            ip_part, prefix_len_str = cidr.split("/")
-            prefix_len = int(prefix_len_str)
-            prefix_bits = get_network_prefix(cidr)
-            table.append((prefix_bits, prefix_len, out_link))
+            network, prefix_len, width = self._parse_route(cidr)
+            (rib if width == 32 else rib6)[(network, prefix_len)] = self._link_id(out_link)
+        self._rib, self._rib6 = rib, rib6
+        self._batch_index = None
+        start = time.perf_counter()
+        self._table.build([(network, length, idx) for (network, length), idx in rib.items()])
+        self._table6.build([(network, length, idx) for (network, length), idx in rib6.items()])
+        self.build_seconds = time.perf_counter() - start
 
-        # Sort longest prefix first
-        table.sort(key=lambda x: x[1], reverse=True)
-        self._forwarding_table = table
+    @staticmethod
+    def _parse_route(cidr: str) -> Tuple[int, int, int]:
+        """Return (network, prefix_len, address width) of an IPv4 or IPv6 CIDR."""
+        if ":" in cidr:
+            network, _, length = parse_cidr6(cidr)
+            return network, length, 128
+        network, _, length = parse_cidr(cidr)
+        return network, length, 32
+
+    def engine_stats(self) -> Dict[str, object]:
+        """
+        Size and cost of the lookup structure, for choosing an engine:
+        routes, engine build time (parsing excluded) and memory footprint.
+        The ipv6_* entries describe the IPv6 stride trie.
+        """
+        return {"engine": self.engine, "routes": len(self._table),
+                "build_seconds": self.build_seconds,
+                "memory_bytes": self._table.memory_bytes(),
+                "ipv6_routes": len(self._table6),
+                "ipv6_memory_bytes": self._table6.memory_bytes()}
+
+    def cache_stats(self) -> Dict[str, object]:
+        """Hit/miss counters of the destination cache (empty dict if disabled)."""
+        return self._cache.stats() if self._cache is not None else {}
+
+    def routes(self) -> List[Tuple[str, str]]:
+        """Current (CIDR, output_link) routes, longest prefix first (IPv4, then IPv6)."""
+        return ([(f"{int_to_ip(network)}/{length}", self.link_name(idx))
+                 for (network, length), idx in sorted(self._rib.items(), key=lambda e: -e[0][1])]
+                + [(f"{int_to_ipv6(network)}/{length}", self.link_name(idx))
+                   for (network, length), idx in sorted(self._rib6.items(), key=lambda e: -e[0][1])])
+
+    def forwarding_state(self) -> Tuple[List[str], "Dir248Table",
+                                        Dict[Tuple[int, int], int], Dict[Tuple[int, int], int]]:
+        """
+        Consistent copy of what the router forwards with, taken under the
+        update lock so no batch is seen half applied: (links, DIR-24-8
+        tables of the IPv4 routes, IPv4 RIB, IPv6 RIB), the RIBs mapping
+        (network, prefix_len) -> link index. The dir24 engine's tables are
+        copied; other engines get tables compiled from the copied RIB.
+        Later updates do not show through any of them.
+        """
+        with self._update_lock:
+            links = list(self.links)
+            rib, rib6 = dict(self._rib), dict(self._rib6)
+            table = self._table.copy() if self.engine == "dir24" else None
+        if table is None:
+            table = Dir248Table()
+            table.build([(network, length, idx) for (network, length), idx in rib.items()])
+        return links, table, rib, rib6
+
+    def link_name(self, idx) -> str:
+        """Output link for a next-hop index (None / -1 -> DEFAULT_GATEWAY)."""
+        if idx is None or idx < 0:
+            return DEFAULT_GATEWAY
+        return self.links[idx]
+
+    def _link_id(self, out_link: str) -> int:
+        if out_link == DEFAULT_GATEWAY:
+            return NULL_ROUTE
+        idx = self._link_index.get(out_link)
+        if idx is None:
+            idx = self._link_index[out_link] = len(self.links)
+            self.links.append(out_link)
+        return idx
 
     def route_packet(self, dest_ip: str) -> str:
         """
         Perform Longest Prefix Match (LPM) and return output link.
-        If no match, return "Default Gateway".
+        If no match, return "Default Gateway". dest_ip may be IPv4 or IPv6.
         """
-        dest_bin = ip_to_binary(dest_ip)
-        for prefix_bits, _, out_link in self._forwarding_table:
-            if dest_bin.startswith(prefix_bits):
-                return out_link
-        return "Default Gateway"
+        if ":" in dest_ip:
+            table, parse, width, cache = self._table6, ipv6_to_int, 128, self._cache
+        else:
+            table, parse, width, cache = self._table, ip_to_int, 32, self._cache4
+        if cache is None:
+            addr = parse(dest_ip)
+        while True:
+            gen = self._generation
+            if gen & 1:
+                self._wait_for_update()
+                continue
+            if cache is None:
+                idx = table.lookup(addr)
+            else:
+                entry = cache.get(dest_ip)
+                if entry is not None:
+                    idx = entry[1]
+                else:
+                    addr = parse(dest_ip)
+                    idx = table.lookup(addr)
+                    cache.put(dest_ip, addr, idx, width)
+            if self._generation == gen:
+                break
+            if cache is not None:
+                # Raced with an update: the entry may predate its invalidation
+                cache.discard(dest_ip)
+        if idx is None or idx < 0:
+            return DEFAULT_GATEWAY
+        return self.links[idx]
+
+    def route_index(self, addr: int) -> int:
+        """
+        LPM for an IPv4 address already converted with ip_to_int: the link
+        index (-1 = DEFAULT_GATEWAY). Bypasses parsing and the cache.
+        """
+        while True:
+            gen = self._generation
+            if gen & 1:
+                self._wait_for_update()
+                continue
+            idx = self._table.lookup(addr)
+            if self._generation == gen:
+                return NULL_ROUTE if idx is None else idx
+
+    def _wait_for_update(self):
+        # An update batch is in progress; block until the writer is done
+        with self._update_lock:
+            pass
+
+    # -----------------------------
+    # Incremental updates
+    # -----------------------------
+    def add_route(self, cidr: str, out_link: str):
+        """Insert a new route; raises ValueError if the prefix is already present."""
+        self.apply_updates([("add", cidr, out_link)])
+
+    def remove_route(self, cidr: str):
+        """Withdraw a route; raises KeyError if the prefix is not present."""
+        self.apply_updates([("remove", cidr)])
+
+    def replace_route(self, cidr: str, out_link: str):
+        """Point an existing prefix at another link; raises KeyError if absent."""
+        self.apply_updates([("replace", cidr, out_link)])
+
+    def apply_updates(self, updates: Iterable[Tuple]) -> int:
+        """
+        Apply a batch of ("add", cidr, link), ("remove", cidr) and
+        ("replace", cidr, link) operations in order and return how many were
+        applied. The whole batch is validated before anything changes, and
+        concurrent route_packet / route_batch callers observe the table
+        either before or after the batch, never in between.
+        """
+        with self._update_lock:
+            ops = self._validate_updates(updates)
+            self._generation += 1           # odd: readers retry
+            try:
+                for network, length, idx, width in ops:
+                    rib, table = (self._rib, self._table) if width == 32 else (self._rib6, self._table6)
+                    if idx is None:
+                        del rib[(network, length)]
+                        table.remove(network, length)
+                    else:
+                        rib[(network, length)] = idx
+                        table.insert(network, length, idx)
+                if ops:
+                    self._batch_index = None
+                    if self._cache is not None:
+                        for width in (32, 128):
+                            self._cache.invalidate(((network, length) for network, length, _, w in ops
+                                                    if w == width), width)
+            finally:
+                self._generation += 1
+        return len(ops)
+
+    def _validate_updates(self, updates: Iterable[Tuple]) -> List[Tuple[int, int, Optional[int], int]]:
+        """
+        Turn update tuples into (network, prefix_len, link_index or None for
+        a withdrawal, address width), checking each against the RIB as it
+        will be when the operation runs. Link names are registered only once
+        the whole batch is valid, so a rejected batch leaves self.links as
+        it was.
+        """
+        present = {}
+        ops = []
+        for update in updates:
+            op = update[0] if len(update) else None
+            if op not in _UPDATE_ARITY:
+                raise ValueError(f"Unknown update operation: {op}")
+            if len(update) != _UPDATE_ARITY[op]:
+                raise ValueError(f"Malformed {op} update: {update!r}")
+            cidr = update[1]
+            network, length, width = self._parse_route(cidr)
+            key = (network, length, width)
+            rib = self._rib if width == 32 else self._rib6
+            exists = present[key] if key in present else (network, length) in rib
+            if op == "add":
+                if exists:
+                    raise ValueError(f"Route already present: {cidr}")
+            elif not exists:
+                raise KeyError(f"No such route: {cidr}")
+            if op == "remove":
+                ops.append((network, length, None, width))
+                present[key] = False
+            else:
+                ops.append((network, length, update[2], width))
+                present[key] = True
+        link_id = self._link_id
+        return [(network, length, None if link is None else link_id(link), width)
+                for network, length, link, width in ops]
+
+    def _build_batch_index(self):
+        """
+        Group the RIB by prefix length: for each length (longest first) a
+        sorted uint32 array of networks and the matching link indices.
+        """
+        by_length = {}
+        for (network, length), idx in self._rib.items():
+            by_length.setdefault(length, []).append((network, idx))
+        index = []
+        for length in sorted(by_length, reverse=True):
+            entries = sorted(by_length[length])
+            networks = np.fromiter((n for n, _ in entries), dtype=np.uint32, count=len(entries))
+            values = np.fromiter((i for _, i in entries), dtype=np.int32, count=len(entries))
+            index.append((np.uint32(MASKS[length]), networks, values))
+        self._batch_index = index
+
+    def route_batch(self, addresses: Iterable) -> "np.ndarray":
+        """
+        Longest Prefix Match for many destinations at once.
+        addresses: NumPy array of uint32 destinations, or an iterable of
+        dotted-decimal strings / integers.
+        Returns an int32 array of indices into self.links (-1 = DEFAULT_GATEWAY).
+        IPv4 only; IPv6 destinations go through route_packet.
+        The dir24 engine answers from its own tables; the others use a
+        per-prefix-length index built on first use.
+        """
+        if np is None:
+            raise ImportError("route_batch requires NumPy")
+        if not isinstance(addresses, np.ndarray):
+            addresses = ips_to_array(addresses)
+        addrs = addresses.astype(np.uint32, copy=False).ravel()
+        while True:
+            gen = self._generation
+            if gen & 1:
+                self._wait_for_update()
+                continue
+            result = self._lookup_batch(addrs)
+            if self._generation == gen:
+                return result
+
+    def _lookup_batch(self, addrs: "np.ndarray") -> "np.ndarray":
+        if self.engine == "dir24":
+            return self._table.lookup_batch(addrs)
+        index = self._batch_index
+        if index is None:
+            with self._update_lock:       # the RIB must not change while indexing
+                if self._batch_index is None:
+                    self._build_batch_index()
+                index = self._batch_index
+
+        result = np.full(len(addrs), -1, dtype=np.int32)
+        pending = np.arange(len(addrs))
+        # One vectorized mask-and-search pass per prefix length, longest first;
+        # resolved destinations drop out of later passes.
+        for mask, networks, values in index:
+            if not len(pending):
+                break
+            keys = addrs[pending] & mask
+            pos = np.searchsorted(networks, keys)
+            pos[pos == len(networks)] = 0
+            hit = networks[pos] == keys
+            result[pending[hit]] = values[pos[hit]]
+            pending = pending[~hit]
+        return result
 
 
 # Optional self-test
@@ -56,12 +1033,25 @@ if __name__ == "__main__":
         ("223.1.3.0/24", "Link 2"),
         ("223.1.0.0/16", "Link 4 (ISP)")
     ]
-    r = Router(routes)
     test_cases = [
         ("223.1.1.100", "Link 0"),
         ("223.1.2.5", "Link 1"),
         ("223.1.250.1", "Link 4 (ISP)"),
         ("198.51.100.1", "Default Gateway")
     ]
-    for ip, expected in test_cases:
-        print(f"{ip} -> {r.route_packet(ip)} (expected: {expected})")
+    for engine in ENGINES:
+        if engine == "dir24" and np is None:
+            continue
+        r = Router(routes, engine=engine)
+        print(f"[{engine}]")
+        for ip, expected in test_cases:
+            print(f"{ip} -> {r.route_packet(ip)} (expected: {expected})")
+    if np is not None:
+        hops = r.route_batch([ip for ip, _ in test_cases])
+        print("route_batch ->", [r.link_name(i) for i in hops])
+
+    r6 = Router(routes + [("2001:db8::/32", "Link 5"), ("2001:db8:1::/48", "Link 6")])
+    print("[ipv6]")
+    for ip, expected in [("2001:db8:1::1", "Link 6"), ("2001:db8:ffff::1", "Link 5"),
+                         ("2001:db9::1", "Default Gateway"), ("223.1.1.100", "Link 0")]:
+        print(f"{ip} -> {r6.route_packet(ip)} (expected: {expected})")
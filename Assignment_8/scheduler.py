@@ -5,12 +5,36 @@ PART 3: Output Port Scheduling Simulation
 Implements:
 1. Packet dataclass (contains IPs, payload, and priority)
 2. FIFO (First Come First Served) scheduler
-3. Priority scheduler
+3. Priority scheduler (heap over a list of packets) and priority_order,
+   its batched equivalent returning the dequeue order as indices
+4. Streaming schedulers for a live output port (enqueue / dequeue one
+   packet at a time, per-class packet and byte counters):
+   - StrictPriorityScheduler -> lowest class number first, O(log classes)
+   - DRRScheduler            -> Deficit Round Robin, O(1) per packet
+                                when the quantum covers the largest packet
+   - WFQScheduler            -> Weighted Fair Queueing with self-clocked
+                                (SCFQ) virtual time, O(log classes)
+   - HTBScheduler            -> hierarchical token-bucket shaping (rate /
+                                ceil per class, borrowing from ancestors),
+                                HTB levels, then priority; O(depth log classes)
+5. Compact packet representations for large simulations:
+   - CompactPacket -> frozen, slotted; integer addresses, bytes payload
+   - PacketBatch   -> columnar NumPy arrays (uint32 src/dst, uint8
+                      priority, offsets into one payload buffer)
 """
 
+from collections import deque
 from dataclasses import dataclass
-from typing import List
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Union
 import heapq
+import time
+
+from ip_utils import int_to_ip, ip_to_int
+
+try:
+    import numpy as np
+except ImportError:  # only PacketBatch needs NumPy
+    np = None
 
 
 @dataclass
@@ -21,6 +45,114 @@ class Packet:
     priority: int  # 0 = High, 1 = Medium, 2 = Low
 
 
+@dataclass(frozen=True)
+class CompactPacket:
+    """
+    Immutable, slotted packet: addresses as 32-bit integers and the payload
+    as bytes, so no per-instance dict and no dotted-quad strings.
+    source_ip / dest_ip give the Packet-style view.
+    """
+    __slots__ = ("source", "dest", "payload", "priority")
+    source: int
+    dest: int
+    payload: bytes
+    priority: int
+
+    @property
+    def source_ip(self) -> str:
+        return int_to_ip(self.source)
+
+    @property
+    def dest_ip(self) -> str:
+        return int_to_ip(self.dest)
+
+    @classmethod
+    def from_packet(cls, packet: Packet) -> "CompactPacket":
+        return cls(ip_to_int(packet.source_ip), ip_to_int(packet.dest_ip),
+                   packet.payload.encode(), packet.priority)
+
+
+class PacketBatch:
+    """
+    Columnar packets. Row i has addresses src[i] / dst[i] (uint32),
+    priority[i] (uint8) and payload payload[offsets[i]:offsets[i + 1]]
+    (offsets is int64 with len + 1 entries). Schedulers take a batch
+    through enqueue_batch without building packet objects; indexing or
+    iterating yields CompactPacket rows. Requires NumPy.
+    """
+    def __init__(self, src: "np.ndarray", dst: "np.ndarray", priority: "np.ndarray",
+                 payload: bytes, offsets: "np.ndarray"):
+        if np is None:
+            raise ImportError("PacketBatch requires NumPy")
+        if not len(src) == len(dst) == len(priority) == len(offsets) - 1:
+            raise ValueError("PacketBatch columns differ in length")
+        self.src = src
+        self.dst = dst
+        self.priority = priority
+        self.payload = payload
+        self.offsets = offsets
+
+    @classmethod
+    def from_packets(cls, packets: Iterable[Union[Packet, CompactPacket]]) -> "PacketBatch":
+        """Build a batch from Packet or CompactPacket objects (consumed once)."""
+        if np is None:
+            raise ImportError("PacketBatch requires NumPy")
+        src, dst, prio, lengths = [], [], [], []
+        payload = bytearray()
+        for pkt in packets:
+            if isinstance(pkt, CompactPacket):
+                src.append(pkt.source)
+                dst.append(pkt.dest)
+                data = pkt.payload
+            else:
+                src.append(ip_to_int(pkt.source_ip))
+                dst.append(ip_to_int(pkt.dest_ip))
+                data = pkt.payload.encode()
+            prio.append(pkt.priority)
+            lengths.append(len(data))
+            payload += data
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(np.array(src, dtype=np.uint32), np.array(dst, dtype=np.uint32),
+                   np.array(prio, dtype=np.uint8), bytes(payload), offsets)
+
+    def sizes(self) -> "np.ndarray":
+        """Payload length of every row."""
+        return np.diff(self.offsets)
+
+    def take(self, rows: "np.ndarray") -> "PacketBatch":
+        """New batch holding the given rows in the given order."""
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # Byte i of the new buffer comes from old position starts[row] + (i - offsets[row])
+        gather = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        payload = np.frombuffer(self.payload, dtype=np.uint8)[gather].tobytes()
+        return PacketBatch(self.src[rows], self.dst[rows], self.priority[rows], payload, offsets)
+
+    def nbytes(self) -> int:
+        """Memory held by the columns and the payload buffer."""
+        return (self.src.nbytes + self.dst.nbytes + self.priority.nbytes
+                + self.offsets.nbytes + len(self.payload))
+
+    def __getitem__(self, row: int) -> CompactPacket:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return CompactPacket(int(self.src[row]), int(self.dst[row]),
+                             self.payload[start:end], int(self.priority[row]))
+
+    def __iter__(self) -> Iterator[CompactPacket]:
+        offsets = self.offsets.tolist()
+        payload = self.payload
+        for row, (src, dst, prio) in enumerate(zip(self.src.tolist(), self.dst.tolist(),
+                                                   self.priority.tolist())):
+            yield CompactPacket(src, dst, payload[offsets[row]:offsets[row + 1]], prio)
+
+    def __len__(self):
+        return len(self.src)
+
+
 def fifo_scheduler(packet_list: List[Packet]) -> List[Packet]:
     """
     FIFO (First-Come, First-Served) scheduling.
@@ -47,6 +179,573 @@ def priority_scheduler(packet_list: List[Packet]) -> List[Packet]:
     return ordered
 
 
+def priority_order(packets: Union["PacketBatch", "np.ndarray", List[Packet]]):
+    """
+    Batched priority scheduling: the order in which priority_scheduler would
+    send the packets, as an index array. Priorities are small integers, so
+    this is a stable bucket sort, O(n): one vectorized pass per priority
+    present when there are few, else NumPy's stable (radix) argsort.
+    Accepts a PacketBatch, an array of priorities or a list of packets
+    (without NumPy, lists get a pure-Python bucket sort returning a list).
+    """
+    if isinstance(packets, PacketBatch):
+        prio = packets.priority
+    elif np is not None and isinstance(packets, np.ndarray):
+        prio = packets
+    elif np is None:
+        buckets: Dict[int, List[int]] = {}
+        for idx, pkt in enumerate(packets):
+            buckets.setdefault(pkt.priority, []).append(idx)
+        return [idx for level in sorted(buckets) for idx in buckets[level]]
+    else:
+        prio = np.fromiter((pkt.priority for pkt in packets), dtype=np.int64, count=len(packets))
+    if not len(prio):
+        return np.zeros(0, dtype=np.int64)
+    if prio.min() >= 0 and prio.max() < 256:
+        levels = np.flatnonzero(np.bincount(prio))
+        if len(levels) <= 4:
+            return np.concatenate([np.flatnonzero(prio == level) for level in levels])
+    return np.argsort(prio, kind="stable")
+
+
+# -----------------------------
+# Streaming schedulers
+# -----------------------------
+def payload_size(packet: Packet) -> int:
+    """Default packet size in bytes: the payload length."""
+    return len(packet.payload)
+
+
+def packet_class(packet: Packet) -> int:
+    """Default traffic class: the packet priority."""
+    return packet.priority
+
+
+def _positive_weights(weights: Optional[Dict[Hashable, float]]) -> Dict[Hashable, float]:
+    """Copy of a class -> weight map; a weight that is not positive raises ValueError."""
+    weights = dict(weights or {})
+    for cls, weight in weights.items():
+        if not weight > 0:
+            raise ValueError(f"Weight of class {cls} must be positive, got {weight}")
+    return weights
+
+
+class StreamingScheduler:
+    """
+    Base class: per-class FIFO queues plus per-class counters. Subclasses
+    decide which class sends next.
+    classify(packet) -> class key (default: priority)
+    size(packet)     -> length in bytes (default: payload length)
+    """
+    def __init__(self, classify: Callable[[Packet], Hashable] = packet_class,
+                 size: Callable[[Packet], int] = payload_size):
+        self.classify = classify
+        self.size = size
+        self._queues: Dict[Hashable, deque] = {}
+        # class -> [enqueued packets, enqueued bytes, sent packets, sent bytes]
+        self._counters: Dict[Hashable, List[int]] = {}
+        self._backlog = 0
+
+    def _queue(self, cls: Hashable) -> deque:
+        queue = self._queues.get(cls)
+        if queue is None:
+            queue = self._queues[cls] = deque()
+            self._counters[cls] = [0, 0, 0, 0]
+        return queue
+
+    def enqueue(self, packet: Packet):
+        self._push(packet, self.classify(packet), self.size(packet))
+
+    def enqueue_batch(self, batch: "PacketBatch"):
+        """
+        Enqueue every row of a PacketBatch in order, classed by its priority
+        column. No packet objects are built: dequeue returns the row index.
+        """
+        push = self._push
+        for row, cls, size in zip(range(len(batch)), batch.priority.tolist(), batch.sizes().tolist()):
+            push(row, cls, size)
+
+    def enqueue_item(self, item, cls: Hashable, size: int):
+        """
+        Enqueue any object as a packet of class `cls` and `size` bytes,
+        e.g. a record carrying the packet with its arrival time: dequeue
+        returns it unchanged. classify / size are not called.
+        """
+        self._push(item, cls, size)
+
+    def _push(self, item, cls: Hashable, size: int):
+        raise NotImplementedError
+
+    def dequeue(self) -> Optional[Packet]:
+        """Next packet (or batch row) to transmit, or None when every queue is empty."""
+        raise NotImplementedError
+
+    def drain(self) -> Iterator[Packet]:
+        """Dequeue until empty."""
+        while self._backlog:
+            yield self.dequeue()
+
+    def stats(self) -> Dict[Hashable, Dict[str, int]]:
+        """Per-class enqueued / sent packets and bytes and current backlog."""
+        out = {}
+        for cls, (in_pkts, in_bytes, out_pkts, out_bytes) in sorted(self._counters.items()):
+            out[cls] = {"enqueued_packets": in_pkts, "enqueued_bytes": in_bytes,
+                        "sent_packets": out_pkts, "sent_bytes": out_bytes,
+                        "queued_packets": in_pkts - out_pkts, "queued_bytes": in_bytes - out_bytes}
+        return out
+
+    def __len__(self):
+        return self._backlog
+
+
+class StrictPriorityScheduler(StreamingScheduler):
+    """
+    Always serves the lowest non-empty class (0 = High). A heap of the
+    non-empty classes keeps dequeue at O(log classes); FIFO within a class.
+    """
+    def __init__(self, classify: Callable[[Packet], Hashable] = packet_class,
+                 size: Callable[[Packet], int] = payload_size):
+        super().__init__(classify, size)
+        self._active: List[Hashable] = []
+
+    def _push(self, packet, cls: Hashable, size: int):
+        queue = self._queue(cls)
+        if not queue:
+            heapq.heappush(self._active, cls)
+        queue.append((packet, size))
+        counters = self._counters[cls]
+        counters[0] += 1
+        counters[1] += size
+        self._backlog += 1
+
+    def dequeue(self) -> Optional[Packet]:
+        if not self._backlog:
+            return None
+        cls = self._active[0]
+        queue = self._queues[cls]
+        packet, size = queue.popleft()
+        if not queue:
+            heapq.heappop(self._active)
+        counters = self._counters[cls]
+        counters[2] += 1
+        counters[3] += size
+        self._backlog -= 1
+        return packet
+
+
+class DRRScheduler(StreamingScheduler):
+    """
+    Deficit Round Robin (Shreedhar & Varghese). Each visit adds
+    quantum * weight bytes to a class's deficit; the class sends while its
+    head packet fits, then the next active class gets its turn. Long-run
+    byte shares follow the weights (positive, default 1).
+    """
+    def __init__(self, quantum: int = 1500, weights: Optional[Dict[Hashable, float]] = None,
+                 classify: Callable[[Packet], Hashable] = packet_class,
+                 size: Callable[[Packet], int] = payload_size):
+        super().__init__(classify, size)
+        if not quantum > 0:
+            raise ValueError(f"DRR quantum must be positive, got {quantum}")
+        self.quantum = quantum
+        self.weights = _positive_weights(weights)
+        self._deficit: Dict[Hashable, float] = {}
+        self._active: deque = deque()          # round-robin order of non-empty classes
+        self._in_turn = False                  # head class already got this round's quantum
+
+    def _push(self, packet, cls: Hashable, size: int):
+        queue = self._queue(cls)
+        if not queue:
+            self._active.append(cls)
+            self._deficit[cls] = 0
+        queue.append((packet, size))
+        counters = self._counters[cls]
+        counters[0] += 1
+        counters[1] += size
+        self._backlog += 1
+
+    def dequeue(self) -> Optional[Packet]:
+        if not self._backlog:
+            return None
+        active = self._active
+        deficit = self._deficit
+        while True:
+            cls = active[0]
+            if not self._in_turn:
+                credit = self.quantum * self.weights.get(cls, 1)
+                if not credit > 0:
+                    # A class that never earns deficit would spin forever
+                    raise ValueError(f"DRR class {cls} earns no deficit (quantum x weight = {credit})")
+                deficit[cls] += credit
+                self._in_turn = True
+            queue = self._queues[cls]
+            packet, size = queue[0]
+            if size <= deficit[cls]:
+                break
+            active.rotate(-1)                  # head does not fit: next class
+            self._in_turn = False
+        queue.popleft()
+        deficit[cls] -= size
+        if not queue:
+            deficit[cls] = 0                   # idle classes keep no credit
+            active.popleft()
+            self._in_turn = False
+        counters = self._counters[cls]
+        counters[2] += 1
+        counters[3] += size
+        self._backlog -= 1
+        return packet
+
+
+class WFQScheduler(StreamingScheduler):
+    """
+    Weighted Fair Queueing, self-clocked variant (SCFQ, Golestani): a packet
+    gets the finish tag max(V, class's last tag) + size / weight, where V is
+    the tag of the packet last sent, and the smallest tag goes first. Only
+    the head packet of each class sits in the heap, so both operations are
+    O(log classes).
+    """
+    def __init__(self, weights: Optional[Dict[Hashable, float]] = None,
+                 classify: Callable[[Packet], Hashable] = packet_class,
+                 size: Callable[[Packet], int] = payload_size):
+        super().__init__(classify, size)
+        self.weights = _positive_weights(weights)
+        self._virtual_time = 0.0
+        self._last_finish: Dict[Hashable, float] = {}
+        self._heads: List[tuple] = []          # (finish tag, seq, class)
+        self._seq = 0
+
+    def _push(self, packet, cls: Hashable, size: int):
+        queue = self._queue(cls)
+        start = max(self._virtual_time, self._last_finish.get(cls, 0.0))
+        finish = self._last_finish[cls] = start + size / self.weights.get(cls, 1)
+        if not queue:
+            heapq.heappush(self._heads, (finish, self._seq, cls))
+            self._seq += 1
+        queue.append((packet, size, finish))
+        counters = self._counters[cls]
+        counters[0] += 1
+        counters[1] += size
+        self._backlog += 1
+
+    def dequeue(self) -> Optional[Packet]:
+        if not self._backlog:
+            return None
+        finish, _, cls = heapq.heappop(self._heads)
+        queue = self._queues[cls]
+        packet, size, _ = queue.popleft()
+        self._virtual_time = finish
+        if queue:
+            heapq.heappush(self._heads, (queue[0][2], self._seq, cls))
+            self._seq += 1
+        counters = self._counters[cls]
+        counters[2] += 1
+        counters[3] += size
+        self._backlog -= 1
+        return packet
+
+
+_CAN_SEND, _MAY_BORROW, _CANT_SEND = 0, 1, 2
+
+
+class _HTBClass:
+    __slots__ = ("name", "parent", "rate", "ceil", "burst", "cburst", "prio", "level", "tokens",
+                 "ctokens", "updated", "children", "feed", "feed_count", "placed", "seq", "wseq",
+                 "sent_packets", "sent_bytes", "conforming_bytes", "borrowed_bytes", "lent_bytes",
+                 "overlimits")
+
+    def __init__(self, name, parent, rate, ceil, burst, cburst, prio):
+        self.name = name
+        self.parent = parent
+        self.rate = rate
+        self.ceil = ceil
+        self.burst = burst
+        self.cburst = cburst
+        self.prio = prio
+        self.level = 0                  # height in the tree: leaves are 0
+        self.tokens = burst             # bytes, refilled lazily at `rate`
+        self.ctokens = cburst           # bytes, refilled lazily at `ceil`
+        self.updated = None
+        self.children = 0
+        self.feed: List[tuple] = []     # (prio, seq, child) of children waiting to borrow
+        self.feed_count = 0             # live entries in feed
+        self.placed = None              # "row", "feed" (the parent's) or None
+        self.seq = 0                    # seq of the class's live row / feed entry
+        self.wseq = 0                   # seq of its live wait-queue entry
+        self.sent_packets = 0
+        self.sent_bytes = 0
+        self.conforming_bytes = 0       # sent on the class's own rate
+        self.borrowed_bytes = 0         # sent on an ancestor's spare rate
+        self.lent_bytes = 0             # spare rate given to descendants
+        self.overlimits = 0             # times it could not send for lack of tokens
+
+
+class HTBScheduler(StreamingScheduler):
+    """
+    Hierarchical token bucket shaper (after Linux HTB). Classes form a tree
+    built with add_class; packets are queued at leaves (classify(packet)
+    returns the leaf name). Every class has a guaranteed `rate` and a
+    `ceil` it may reach by borrowing spare rate from its ancestors, both
+    in bytes/s with token buckets of `burst` / `cburst` bytes.
+
+    As in Linux HTB, a class with tokens left can send, one without tokens
+    but under its ceil may borrow from its parent, and one over its ceil
+    cannot send. Sending classes sit in one heap per tree level; a class
+    that may borrow sits in its parent's feed heap. dequeue serves the
+    lowest level first (leaves sending on their own rate before anything
+    that borrows, nearer lenders before farther ones), so every class gets
+    its guaranteed rate and only spare rate is shared out; it then walks
+    down the feeds to a leaf. Within a heap the lowest `prio` goes first
+    (strict priority, as in priority_scheduler), then round robin per
+    packet. Sending a packet charges ceil tokens on the whole path and
+    rate tokens from the lender up; borrowers keep their own tokens.
+
+    Nothing polls: a class that cannot send on its own rate is put in a
+    wait queue keyed by the time its tokens refill, so dequeue is
+    O(depth x log classes) however many leaves there are. dequeue returns
+    None while packets wait only for tokens: next_eligible() tells when to
+    try again, and drain() sleeps until then. clock() supplies the current
+    time in seconds.
+    """
+    def __init__(self, classify: Callable[[Packet], Hashable] = packet_class,
+                 size: Callable[[Packet], int] = payload_size,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(classify, size)
+        self.clock = clock
+        self._classes: Dict[Hashable, _HTBClass] = {}
+        # Heap entries carry the class's seq / wseq when pushed; moving a
+        # class takes a new one, which leaves older entries stale
+        self._rows: List[List[tuple]] = [[]]    # per level: (prio, seq, class) that can send
+        self._waiting: List[tuple] = []         # (time its mode changes, wseq, class)
+        self._seq = 0
+
+    def add_class(self, name: Hashable, rate: float, ceil: Optional[float] = None,
+                  parent: Optional[Hashable] = None, burst: Optional[float] = None,
+                  cburst: Optional[float] = None, prio: int = 0):
+        """
+        Add a class under `parent` (None = a root). Rates are bytes/s;
+        ceil defaults to rate, burst / cburst to 1 ms of rate / ceil plus
+        one 1500-byte packet.
+        """
+        if name in self._classes:
+            raise ValueError(f"HTB class already exists: {name}")
+        parent_class = None
+        if parent is not None:
+            parent_class = self._classes.get(parent)
+            if parent_class is None:
+                raise KeyError(f"Unknown HTB class: {parent}")
+            if self._queues.get(parent):
+                raise ValueError(f"HTB class {parent} has queued packets and cannot become a parent")
+        ceil = rate if ceil is None else ceil
+        if ceil < rate:
+            raise ValueError(f"HTB class {name}: ceil {ceil} is below rate {rate}")
+        burst = rate / 1000 + 1500 if burst is None else burst
+        cburst = ceil / 1000 + 1500 if cburst is None else cburst
+        self._classes[name] = cls = _HTBClass(name, parent_class, rate, ceil, burst, cburst, prio)
+        if parent_class is not None:
+            parent_class.children += 1
+        while cls.parent is not None and cls.parent.level <= cls.level:
+            cls.parent.level = cls.level + 1
+            cls = cls.parent
+        while len(self._rows) <= cls.level:
+            self._rows.append([])
+
+    def _push(self, packet, cls: Hashable, size: int):
+        leaf = self._classes.get(cls)
+        if leaf is None or leaf.children:
+            raise KeyError(f"Not an HTB leaf class: {cls}")
+        queue = self._queue(cls)
+        queue.append((packet, size))
+        counters = self._counters[cls]
+        counters[0] += 1
+        counters[1] += size
+        self._backlog += 1
+        if len(queue) == 1:
+            self._update(leaf, self.clock())
+
+    @staticmethod
+    def _mode(cls: _HTBClass, now: float):
+        """Refill cls's buckets; return its mode and seconds until that changes."""
+        if cls.updated is None:
+            cls.updated = now
+        elapsed = now - cls.updated
+        if elapsed > 0:
+            cls.tokens = min(cls.burst, cls.tokens + cls.rate * elapsed)
+            cls.ctokens = min(cls.cburst, cls.ctokens + cls.ceil * elapsed)
+            cls.updated = now
+        # A deficit that refills in less than the clock's resolution (float
+        # rounding after a refill) counts as none: waiting for it would mean
+        # a wake-up at `now` that never comes due
+        if cls.ctokens < 0:
+            wait = -cls.ctokens / cls.ceil if cls.ceil else None
+            if wait is None or now + wait > now:
+                return _CANT_SEND, wait
+            cls.ctokens = 0.0
+        if cls.tokens < 0:
+            wait = -cls.tokens / cls.rate if cls.rate else None
+            if wait is None or now + wait > now:
+                # A root has nobody to borrow from
+                return (_MAY_BORROW if cls.parent is not None else _CANT_SEND), wait
+            cls.tokens = 0.0
+        return _CAN_SEND, None
+
+    def _update(self, cls: _HTBClass, now: float, rotate: bool = False):
+        """
+        Put cls where its backlog and mode say: in its level's row, in its
+        parent's feed or nowhere (waiting for tokens). rotate=True moves it
+        to the back of its heap even if it stays there (round robin).
+        """
+        demand = bool(self._queues.get(cls.name)) if not cls.children else cls.feed_count > 0
+        target = None
+        cls.wseq = 0                        # drop a pending wake-up
+        if demand:
+            mode, wait = self._mode(cls, now)
+            if mode == _CAN_SEND:
+                target = "row"
+            else:
+                if mode == _MAY_BORROW:
+                    target = "feed"
+                if wait is not None:
+                    self._seq += 1
+                    cls.wseq = self._seq
+                    heapq.heappush(self._waiting, (now + wait, cls.wseq, cls))
+        if target == cls.placed and not rotate:
+            return
+        was_feed = cls.placed == "feed"
+        cls.placed = target
+        self._seq += 1
+        cls.seq = self._seq
+        if target == "row":
+            heapq.heappush(self._rows[cls.level], (cls.prio, cls.seq, cls))
+        elif target == "feed":
+            heapq.heappush(cls.parent.feed, (cls.prio, cls.seq, cls))
+        if was_feed != (target == "feed"):
+            cls.parent.feed_count += 1 if target == "feed" else -1
+            self._update(cls.parent, now)
+
+    @staticmethod
+    def _top(heap: List[tuple]) -> Optional[_HTBClass]:
+        """First live class in a row or feed heap (stale entries are dropped)."""
+        while heap:
+            _, seq, cls = heap[0]
+            if seq == cls.seq:
+                return cls
+            heapq.heappop(heap)
+        return None
+
+    def _wake_due(self, now: float):
+        waiting, due = self._waiting, []
+        while waiting and waiting[0][0] <= now:
+            due.append(heapq.heappop(waiting))
+        # _mode only reports waits that end after `now`, so updating never
+        # pushes an entry that is already due
+        for _, wseq, cls in due:
+            if wseq == cls.wseq:
+                cls.overlimits += 1
+                self._update(cls, now)
+
+    def dequeue(self) -> Optional[Packet]:
+        if not self._backlog:
+            return None
+        now = self.clock()
+        self._wake_due(now)
+        for row in self._rows:
+            lender = self._top(row)
+            if lender is not None:
+                break
+        else:
+            return None
+        leaf = lender
+        while leaf.children:
+            leaf = self._top(leaf.feed)
+        queue = self._queues[leaf.name]
+        packet, size = queue.popleft()
+        # Classes below the lender borrowed the bytes (only their ceil is
+        # charged); the lender and its ancestors sent them on their own rate
+        borrowed = lender is not leaf
+        path = []
+        cls = leaf
+        while cls is not None:
+            self._mode(cls, now)            # refill before charging
+            if cls is lender:
+                borrowed = False
+                if cls is not leaf:
+                    cls.lent_bytes += size
+            if borrowed:
+                cls.borrowed_bytes += size
+            else:
+                cls.tokens -= size
+                cls.conforming_bytes += size
+            cls.ctokens -= size
+            cls.sent_packets += 1
+            cls.sent_bytes += size
+            path.append(cls)
+            cls = cls.parent
+        counters = self._counters[leaf.name]
+        counters[2] += 1
+        counters[3] += size
+        self._backlog -= 1
+        # Re-place the path; the classes the packet was picked through go
+        # to the back of their heaps
+        rotate = True
+        for cls in path:
+            self._update(cls, now, rotate)
+            if cls is lender:
+                rotate = False
+        return packet
+
+    def next_eligible(self) -> Optional[float]:
+        """
+        When dequeue may next return a packet: now if some class may send,
+        the earliest token-refill time if all are over limit, None if empty.
+        """
+        if not self._backlog:
+            return None
+        if any(self._top(row) is not None for row in self._rows):
+            return self.clock()
+        waiting = self._waiting
+        while waiting and waiting[0][1] != waiting[0][2].wseq:
+            heapq.heappop(waiting)
+        return waiting[0][0] if waiting else None
+
+    def drain(self, sleep: Callable[[float], None] = time.sleep) -> Iterator[Packet]:
+        """
+        Dequeue until empty. While every backlogged class waits for tokens,
+        sleep(seconds) until next_eligible(); with a simulated clock, pass a
+        sleep that advances it. Raises RuntimeError rather than spin if the
+        clock does not move or a class can never send (zero rate).
+        """
+        while self._backlog:
+            packet = self.dequeue()
+            if packet is not None:
+                yield packet
+                continue
+            now = self.clock()
+            at = self.next_eligible()
+            if at is None:
+                raise RuntimeError("HTB packets can never be sent: a class on their path has zero rate")
+            sleep(max(0.0, at - now))
+            if self.clock() <= now:
+                raise RuntimeError("HTB clock did not advance while packets wait for tokens")
+
+    def class_stats(self) -> Dict[Hashable, Dict[str, float]]:
+        """
+        Conformance per class (inner classes included) for capacity
+        planning: bytes sent within the class's own rate vs borrowed, bytes
+        lent to descendants, overlimit events and current bucket levels.
+        """
+        out = {}
+        for name, cls in self._classes.items():
+            out[name] = {"parent": cls.parent.name if cls.parent else None,
+                         "rate": cls.rate, "ceil": cls.ceil, "prio": cls.prio,
+                         "sent_packets": cls.sent_packets, "sent_bytes": cls.sent_bytes,
+                         "conforming_bytes": cls.conforming_bytes,
+                         "borrowed_bytes": cls.borrowed_bytes, "lent_bytes": cls.lent_bytes,
+                         "conformance": cls.conforming_bytes / cls.sent_bytes if cls.sent_bytes else 1.0,
+                         "overlimits": cls.overlimits,
+                         "tokens": cls.tokens, "ctokens": cls.ctokens}
+        return out
+
+
 # Optional self-test
 if __name__ == "__main__":
     packets = [
@@ -60,3 +759,37 @@ if __name__ == "__main__":
     priority_result = priority_scheduler(packets)
     print("FIFO:", [p.payload for p in fifo_result])
     print("Priority:", [p.payload for p in priority_result])
+
+    for scheduler in (StrictPriorityScheduler(), DRRScheduler(quantum=16, weights={0: 2}),
+                      WFQScheduler(weights={0: 2})):
+        for pkt in packets:
+            scheduler.enqueue(pkt)
+        print(f"{type(scheduler).__name__}:", [p.payload for p in scheduler.drain()])
+
+    if np is not None:
+        batch = PacketBatch.from_packets(packets)
+        scheduler = StrictPriorityScheduler()
+        scheduler.enqueue_batch(batch)
+        print("PacketBatch (strict priority):", [batch[row].payload.decode() for row in scheduler.drain()])
+        print("priority_order:", priority_order(batch).tolist())
+
+    # HTB: a 52 B/s link (packets are 13 bytes); voice capped at 13 B/s,
+    # data guaranteed 13 B/s and allowed to borrow the rest
+    clock = [0.0]
+    htb = HTBScheduler(clock=lambda: clock[0])
+    htb.add_class("link", rate=52, burst=26, cburst=26)
+    htb.add_class(0, rate=13, parent="link", burst=13, cburst=13, prio=0)
+    htb.add_class(2, rate=13, ceil=52, parent="link", burst=13, cburst=26, prio=1)
+    for pkt in packets * 2:
+        if pkt.priority != 1:
+            htb.enqueue(pkt)
+    order = []
+
+    def wait(seconds):
+        clock[0] += seconds
+
+    for pkt in htb.drain(sleep=wait):
+        order.append((round(clock[0], 3), pkt.payload))
+        clock[0] += len(pkt.payload) / 52       # transmission time at link rate
+    print("HTB:", order)
+    print("HTB conformance:", {name: round(s["conformance"], 2) for name, s in htb.class_stats().items()})
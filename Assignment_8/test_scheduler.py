@@ -0,0 +1,28 @@
+# test_scheduler.py
+"""
+DRRScheduler / WFQScheduler weight checks (run with `python -m pytest`
+from this directory).
+"""
+import pytest
+
+from scheduler import DRRScheduler, Packet, WFQScheduler
+
+
+@pytest.mark.parametrize("scheduler", [DRRScheduler, WFQScheduler])
+@pytest.mark.parametrize("weight", [0, -1, float("nan")])
+def test_non_positive_weight_rejected(scheduler, weight):
+    with pytest.raises(ValueError):
+        scheduler(weights={0: weight})
+
+
+def test_drr_zero_quantum_rejected():
+    with pytest.raises(ValueError):
+        DRRScheduler(quantum=0)
+
+
+def test_drr_never_spins_on_zero_credit():
+    drr = DRRScheduler(weights={0: 1})
+    drr.weights[0] = 0                  # changed after construction
+    drr.enqueue(Packet("10.0.0.1", "10.0.0.2", "payload", priority=0))
+    with pytest.raises(ValueError):
+        drr.dequeue()